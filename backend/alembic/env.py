@@ -12,6 +12,7 @@ sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
 
 from app.models import Base
 from app.config import DATABASE_URL
+from app.search import FTS_TABLE, SEARCH_COLUMN, SEARCH_INDEX
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -23,12 +24,24 @@ if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
 # Set the SQLAlchemy URL
-config.set_main_option("sqlalchemy.url", str(DATABASE_URL).replace("+aiosqlite", ""))
+config.set_main_option("sqlalchemy.url", str(DATABASE_URL).replace("+aiosqlite", "").replace("+asyncpg", ""))
 
 # add your model's MetaData object here
 # for 'autogenerate' support
 target_metadata = Base.metadata
 
+
+def include_name(name, type_, parent_names):
+    """Leave the full-text index (managed by app.search, not the models) out of autogenerate:
+    the FTS5 tables on SQLite, the tsvector column and its GIN index on Postgres"""
+    if type_ == "table":
+        return not name.startswith(FTS_TABLE)
+    if type_ == "column":
+        return not (parent_names.get("table_name") == "news_articles" and name == SEARCH_COLUMN)
+    if type_ == "index":
+        return name != SEARCH_INDEX
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -53,6 +66,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -74,7 +88,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_name=include_name
         )
 
         with context.begin_transaction():
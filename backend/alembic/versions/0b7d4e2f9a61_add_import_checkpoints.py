@@ -0,0 +1,39 @@
+"""add_import_checkpoints
+
+Revision ID: 0b7d4e2f9a61
+Revises: f3a91c5e7b08
+Create Date: 2026-10-17 21:18:02.447610
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7d4e2f9a61'
+down_revision: Union[str, None] = 'f3a91c5e7b08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('import_checkpoints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('file_size', sa.BigInteger(), nullable=False),
+    sa.Column('position', sa.BigInteger(), nullable=True),
+    sa.Column('articles', sa.Integer(), nullable=True),
+    sa.Column('imported', sa.Integer(), nullable=True),
+    sa.Column('skipped', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('source')
+    )
+    op.create_index('ix_news_articles_title_published_at', 'news_articles', ['title', 'published_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_news_articles_title_published_at', table_name='news_articles')
+    op.drop_table('import_checkpoints')
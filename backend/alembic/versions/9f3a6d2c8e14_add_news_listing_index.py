@@ -0,0 +1,26 @@
+"""add_news_listing_index
+
+Revision ID: 9f3a6d2c8e14
+Revises: 5b2e9c41d7a3
+Create Date: 2026-10-17 11:40:02.518934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f3a6d2c8e14'
+down_revision: Union[str, None] = '5b2e9c41d7a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_news_articles_category_published_at_id', 'news_articles', ['category', 'published_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_news_articles_category_published_at_id', table_name='news_articles')
@@ -0,0 +1,29 @@
+"""add_news_search_index
+
+Revision ID: a8c2f5d1e930
+Revises: 0b7d4e2f9a61
+Create Date: 2026-10-17 22:05:41.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.search import create_search_index, drop_search_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c2f5d1e930'
+down_revision: Union[str, None] = '0b7d4e2f9a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # FTS5 table and triggers on SQLite, tsvector column, trigger and GIN index on Postgres
+    create_search_index(op.get_bind())
+
+
+def downgrade() -> None:
+    drop_search_index(op.get_bind())
@@ -0,0 +1,27 @@
+"""add_import_checkpoint_head_hash
+
+Revision ID: b3d8f6a2c419
+Revises: c5e1a9d3f742
+Create Date: 2026-10-18 10:04:37.215904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d8f6a2c419'
+down_revision: Union[str, None] = 'c5e1a9d3f742'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing checkpoints have no hash and will start over on the next run
+    op.add_column('import_checkpoints', sa.Column('head_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('import_checkpoints', 'head_hash')
@@ -0,0 +1,51 @@
+"""add_near_duplicate_tables
+
+Revision ID: c5e1a9d3f742
+Revises: a8c2f5d1e930
+Create Date: 2026-10-17 23:12:09.804531
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e1a9d3f742'
+down_revision: Union[str, None] = 'a8c2f5d1e930'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('article_fingerprints',
+    sa.Column('article_id', sa.Integer(), nullable=False),
+    sa.Column('signature', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['article_id'], ['news_articles.id'], ),
+    sa.PrimaryKeyConstraint('article_id')
+    )
+    op.create_index(op.f('ix_article_fingerprints_created_at'), 'article_fingerprints', ['created_at'], unique=False)
+    op.create_table('article_duplicates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('guid', sa.String(), nullable=False),
+    sa.Column('article_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(), nullable=True),
+    sa.Column('link', sa.String(), nullable=True),
+    sa.Column('category', sa.String(), nullable=True),
+    sa.Column('similarity', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['article_id'], ['news_articles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_article_duplicates_article_id'), 'article_duplicates', ['article_id'], unique=False)
+    op.create_index(op.f('ix_article_duplicates_guid'), 'article_duplicates', ['guid'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_article_duplicates_guid'), table_name='article_duplicates')
+    op.drop_index(op.f('ix_article_duplicates_article_id'), table_name='article_duplicates')
+    op.drop_table('article_duplicates')
+    op.drop_index(op.f('ix_article_fingerprints_created_at'), table_name='article_fingerprints')
+    op.drop_table('article_fingerprints')
@@ -0,0 +1,27 @@
+"""add_article_fingerprint_shingles
+
+Revision ID: e2a7c4f9b816
+Revises: b3d8f6a2c419
+Create Date: 2026-10-18 11:37:52.630148
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c4f9b816'
+down_revision: Union[str, None] = 'b3d8f6a2c419'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing fingerprints have no shingles and are no longer matched; they expire with the window
+    op.add_column('article_fingerprints', sa.Column('shingles', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('article_fingerprints', 'shingles')
@@ -0,0 +1,28 @@
+"""add_audio_file_duration_ms_and_bitrate
+
+Revision ID: e6b83f1a4c27
+Revises: d41c7e0b9a52
+Create Date: 2026-10-17 19:12:08.530417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b83f1a4c27'
+down_revision: Union[str, None] = 'd41c7e0b9a52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('audio_files', sa.Column('duration_ms', sa.Integer(), nullable=True))
+    op.add_column('audio_files', sa.Column('bitrate', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('audio_files', 'bitrate')
+    op.drop_column('audio_files', 'duration_ms')
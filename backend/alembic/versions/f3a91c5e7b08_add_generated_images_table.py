@@ -0,0 +1,37 @@
+"""add_generated_images_table
+
+Revision ID: f3a91c5e7b08
+Revises: e6b83f1a4c27
+Create Date: 2026-10-17 20:31:44.902156
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a91c5e7b08'
+down_revision: Union[str, None] = 'e6b83f1a4c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('generated_images',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('prompt_hash', sa.String(length=64), nullable=False),
+    sa.Column('prompt', sa.Text(), nullable=False),
+    sa.Column('simhash', sa.BigInteger(), nullable=True),
+    sa.Column('image_path', sa.String(), nullable=False),
+    sa.Column('hits', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_generated_images_prompt_hash'), 'generated_images', ['prompt_hash'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_generated_images_prompt_hash'), table_name='generated_images')
+    op.drop_table('generated_images')
@@ -0,0 +1,154 @@
+import asyncio
+from typing import Dict, Optional, Set
+
+from loguru import logger
+from sqlalchemy import and_, exists, func, or_, select
+
+from .config import AUDIO_JOB_CHUNK_SIZE
+from .database import get_db, get_read_db
+from .models import AudioFile, AudioJob, NewsArticle
+from .tts_service import TTSService
+
+
+def missing_audio_condition():
+    """Articles lacking at least one of the audio types, as one NOT EXISTS anti-join per type.
+
+    Checked per type rather than by counting rows, since audio_files does not
+    enforce one row per (article_id, type).
+    """
+    return or_(*(
+        ~exists().where(and_(AudioFile.article_id == NewsArticle.id, AudioFile.type == audio_type))
+        for audio_type in TTSService.AUDIO_TYPES
+    ))
+
+
+class AudioJobRunner:
+    """Runs bulk audio generation as persistent background jobs.
+
+    Articles missing audio are processed in id order, in chunks of
+    `chunk_size`, each handed to the TTS service as one batch so the engine
+    sees as many texts per call as it accepts. After every chunk
+    the job row is checkpointed with the last article id, so a job that was
+    interrupted by a restart resumes from there via resume_pending().
+    """
+
+    def __init__(self, tts_service: TTSService, chunk_size: int = AUDIO_JOB_CHUNK_SIZE):
+        self.tts_service = tts_service
+        self.chunk_size = chunk_size
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    async def submit(self) -> AudioJob:
+        """Start a job, or return the one already pending/running"""
+        async with get_db() as db:
+            result = await db.execute(
+                select(AudioJob)
+                .where(AudioJob.status.in_(("pending", "running")))
+                .order_by(AudioJob.id)
+                .limit(1)
+            )
+            job = result.scalar_one_or_none()
+            if job is None:
+                total = await db.scalar(
+                    select(func.count(NewsArticle.id)).where(missing_audio_condition())
+                )
+                job = AudioJob(status="pending", total=total, processed=0, generated=0, failed=0, last_article_id=0)
+                db.add(job)
+                await db.flush()
+
+        self._start(job.id)
+        return job
+
+    async def get(self, job_id: int) -> Optional[AudioJob]:
+        async with get_read_db() as db:
+            return await db.get(AudioJob, job_id)
+
+    async def resume_pending(self):
+        """Restart jobs left pending or running by a previous process"""
+        async with get_db() as db:
+            result = await db.execute(
+                select(AudioJob.id).where(AudioJob.status.in_(("pending", "running")))
+            )
+            job_ids = result.scalars().all()
+
+        for job_id in job_ids:
+            logger.info(f"Resuming audio job {job_id}")
+            self._start(job_id)
+
+    async def stop(self):
+        """Cancel running jobs; their checkpoints let them resume on the next start"""
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+    def _start(self, job_id: int):
+        if job_id in self._tasks and not self._tasks[job_id].done():
+            return
+        self._tasks[job_id] = asyncio.create_task(self._run(job_id))
+
+    async def _run(self, job_id: int):
+        try:
+            async with get_db() as db:
+                job = await db.get(AudioJob, job_id)
+                job.status = "running"
+                last_article_id = job.last_article_id or 0
+
+            while True:
+                articles, existing = await self._next_chunk(last_article_id)
+                if not articles:
+                    break
+
+                results = await self.tts_service.generate_batch([
+                    (article.id, audio_type, self.tts_service.get_text_content(article, audio_type))
+                    for article in articles
+                    for audio_type in TTSService.AUDIO_TYPES
+                    if audio_type not in existing.get(article.id, set())
+                ])
+
+                generated = sum(results)
+                last_article_id = articles[-1].id
+                async with get_db() as db:
+                    job = await db.get(AudioJob, job_id)
+                    job.processed += len(articles)
+                    job.generated += generated
+                    job.failed += len(results) - generated
+                    job.last_article_id = last_article_id
+
+                logger.info(f"Audio job {job_id}: processed up to article {last_article_id}")
+
+            async with get_db() as db:
+                job = await db.get(AudioJob, job_id)
+                job.status = "completed"
+            logger.info(f"Audio job {job_id} completed")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Audio job {job_id} failed: {str(e)}")
+            async with get_db() as db:
+                job = await db.get(AudioJob, job_id)
+                job.status = "failed"
+                job.error = str(e)
+        finally:
+            self._tasks.pop(job_id, None)
+
+    async def _next_chunk(self, after_id: int):
+        """Load the next chunk of articles missing audio and the audio types they already have"""
+        async with get_db() as db:
+            result = await db.execute(
+                select(NewsArticle.id, NewsArticle.title, NewsArticle.description, NewsArticle.content)
+                .where(NewsArticle.id > after_id, missing_audio_condition())
+                .order_by(NewsArticle.id)
+                .limit(self.chunk_size)
+            )
+            articles = result.all()
+            if not articles:
+                return [], {}
+
+            result = await db.execute(
+                select(AudioFile.article_id, AudioFile.type)
+                .where(AudioFile.article_id.in_([article.id for article in articles]))
+            )
+            existing: Dict[int, Set[str]] = {}
+            for article_id, audio_type in result.all():
+                existing.setdefault(article_id, set()).add(audio_type)
+        return articles, existing
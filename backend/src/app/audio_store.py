@@ -0,0 +1,142 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+
+class AudioStore:
+    """Content-addressed store for synthesized audio with a disk-size cap.
+
+    Files are named by a hash of the normalized text, language, voice and
+    engine, so identical texts share one file across articles and edited
+    text never resolves to a stale file. When the directory grows beyond
+    max_bytes the least recently accessed files are removed; access time is
+    set explicitly on every hit so it works on noatime mounts too, while
+    mtime (and the ETag derived from it) stays untouched.
+    """
+
+    def __init__(self, audio_dir: str, max_bytes: int = 0, engine: str = "gtts", voice: str = "default"):
+        self.audio_dir = audio_dir
+        self.max_bytes = max_bytes
+        self.engine = engine
+        self.voice = voice
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(audio_dir, exist_ok=True)
+        self.total_bytes = sum(
+            entry.stat().st_size for entry in os.scandir(audio_dir)
+            if entry.is_file() and not entry.name.endswith(".part")
+        )
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    def filename_for(self, text: str, lang: str = "en") -> str:
+        key = "\0".join((self.normalize(text), lang, self.voice, self.engine))
+        return f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.mp3"
+
+    def path_for(self, filename: str) -> str:
+        return os.path.join(self.audio_dir, filename)
+
+    def touch(self, filename: str) -> bool:
+        """Mark a file as recently used; returns False if it does not exist"""
+        path = self.path_for(filename)
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def exists(self, filename: str) -> bool:
+        """Check for a file without counting it as a hit or use"""
+        return os.path.isfile(self.path_for(filename))
+
+    def adopt(self, old_filename: str, filename: str) -> bool:
+        """Rename audio stored under another name, such as a legacy {id}_{type}.mp3, to filename.
+
+        Only for files known to hold the audio filename stands for. Returns
+        whether filename exists afterwards.
+        """
+        if self.exists(filename):
+            return True
+        if not old_filename or os.path.basename(old_filename) != old_filename:
+            return False
+        try:
+            os.replace(self.path_for(old_filename), self.path_for(filename))
+        except FileNotFoundError:
+            return False
+        logger.info(f"Adopted audio file {old_filename} as {filename}")
+        return True
+
+    def lookup(self, filename: str) -> bool:
+        """Check for a cached file, counting the hit or miss"""
+        found = self.touch(filename)
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return found
+
+    def put(self, filename: str, data: bytes) -> str:
+        """Store audio bytes under filename, evicting old files if over the cap. Blocking."""
+        path = self.path_for(filename)
+        # Write to a unique temporary name first, so an interrupted run never leaves a
+        # truncated file and concurrent writers of the same file do not share one
+        fd, tmp_path = tempfile.mkstemp(dir=self.audio_dir, prefix=f"{filename}.", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.chmod(tmp_path, 0o644)  # mkstemp creates it private
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.total_bytes += len(data) - previous
+        self.evict(keep=filename)
+        return path
+
+    def evict(self, keep: Optional[str] = None):
+        if not self.max_bytes or self.total_bytes <= self.max_bytes:
+            return
+
+        with self._lock:
+            entries = sorted(
+                (
+                    entry for entry in os.scandir(self.audio_dir)
+                    if entry.is_file() and entry.name != keep and not entry.name.endswith(".part")
+                ),
+                key=lambda entry: entry.stat().st_atime
+            )
+            for entry in entries:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                try:
+                    size = entry.stat().st_size
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+                self.total_bytes -= size
+                self.evictions += 1
+                logger.debug(f"Evicted audio file {entry.name}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes
+        }
@@ -0,0 +1,67 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from .config import NEWS_CACHE_SIZE, NEWS_CACHE_TTL
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of serialized responses with a TTL.
+    
+    Entries are tagged with the data version they were built from; calling
+    invalidate() after an ingest bumps the version so older entries are never
+    served again. The version lives in this process only, so writers running
+    elsewhere (e.g. generate_db_from_json) become visible once the TTL expires.
+    """
+    
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Tuple[int, float, Any]]" = OrderedDict()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        version, expires_at, value = entry
+        if version != self.version or expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: Hashable, value: Any):
+        self._entries[key] = (self.version, time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def invalidate(self):
+        self.version += 1
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "version": self.version
+        }
+
+
+# Serialized /api/news pages, keyed by their query parameters
+news_cache = ResponseCache(NEWS_CACHE_SIZE, NEWS_CACHE_TTL)
@@ -14,6 +14,20 @@ LOGS_DIR.mkdir(exist_ok=True)
 
 # Database
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite+aiosqlite:///{DATA_DIR}/news.db")
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", "")  # optional replica for read-only requests
+
+# SQLite profile: WAL so readers never wait for writers, and fewer fsyncs
+SQLITE_PERFORMANCE_MODE = os.getenv("SQLITE_PERFORMANCE_MODE", "true").lower() == "true"
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # bytes of the file memory-mapped
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # pages, or KiB when negative
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # ms to wait for a lock before failing
+
+# Postgres (asyncpg) profile
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))  # connections kept open
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))  # extra connections under load
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds before a connection is replaced
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500"))  # prepared statements per connection
 
 # API settings
 API_HOST = os.getenv("API_HOST", "0.0.0.0")
@@ -22,4 +36,40 @@ API_RELOAD = os.getenv("API_RELOAD", "true").lower() == "true"
 
 # RSS Feed settings
 RSS_UPDATE_INTERVAL = int(os.getenv("RSS_UPDATE_INTERVAL", "3600"))  # 1 hour in seconds
-RSS_FETCH_TIMEOUT = int(os.getenv("RSS_FETCH_TIMEOUT", "30"))  # 30 seconds
\ No newline at end of file
+RSS_FETCH_TIMEOUT = int(os.getenv("RSS_FETCH_TIMEOUT", "30"))  # 30 seconds
+RSS_FETCH_CONCURRENCY = int(os.getenv("RSS_FETCH_CONCURRENCY", "10"))  # feeds fetched in parallel
+RSS_FETCH_PER_HOST = int(os.getenv("RSS_FETCH_PER_HOST", "2"))  # parallel requests to a single host
+RSS_PARSE_WORKERS = int(os.getenv("RSS_PARSE_WORKERS", "2"))  # processes running feedparser/BeautifulSoup
+RSS_PIPELINE_QUEUE_SIZE = int(os.getenv("RSS_PIPELINE_QUEUE_SIZE", "8"))  # feeds buffered between stages
+RSS_STREAM_BATCH_SIZE = int(os.getenv("RSS_STREAM_BATCH_SIZE", "500"))  # entries per batch for streamed feeds
+
+# Near-duplicate detection: the same story arriving through several feeds is stored once
+NEAR_DUPLICATES = os.getenv("NEAR_DUPLICATES", "true").lower() == "true"
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.4"))  # Jaccard similarity of title + lead shingles
+NEAR_DUPLICATE_MIN_SHINGLES = int(os.getenv("NEAR_DUPLICATE_MIN_SHINGLES", "12"))  # shorter entries are always stored
+NEAR_DUPLICATE_WINDOW_HOURS = float(os.getenv("NEAR_DUPLICATE_WINDOW_HOURS", "72"))  # how far back copies are looked for
+
+# Response cache for /api/news
+NEWS_CACHE_SIZE = int(os.getenv("NEWS_CACHE_SIZE", "256"))  # cached pages
+NEWS_CACHE_TTL = float(os.getenv("NEWS_CACHE_TTL", "30"))  # seconds
+
+# Full-text search: only the newest matches are ranked, so queries for common
+# words cost the same at any corpus size. 0 ranks every match.
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "5000"))
+
+# Seconds between flushes of buffered view/share increments
+COUNTER_FLUSH_INTERVAL = float(os.getenv("COUNTER_FLUSH_INTERVAL", "5"))
+
+# Background audio generation
+TTS_ENGINE = os.getenv("TTS_ENGINE", "gtts")  # see app/tts_engines.py; "silent" works offline
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "4"))  # concurrent gTTS requests
+AUDIO_JOB_CHUNK_SIZE = int(os.getenv("AUDIO_JOB_CHUNK_SIZE", "50"))  # articles per checkpoint
+AUDIO_CACHE_CONTROL = os.getenv("AUDIO_CACHE_CONTROL", "public, max-age=604800")  # 1 week, revalidated by ETag
+TTS_STREAM_CHUNK_CHARS = int(os.getenv("TTS_STREAM_CHUNK_CHARS", "300"))  # text per streamed synthesis call
+TTS_STREAM_LOOKAHEAD = int(os.getenv("TTS_STREAM_LOOKAHEAD", "2"))  # chunks synthesized ahead of playback
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))  # audio dir size cap, 0 = unbounded
+
+# Image derivatives
+IMAGE_WIDTHS = [int(w) for w in os.getenv("IMAGE_WIDTHS", "320,640,1024").split(",")]  # derivative widths in px
+IMAGE_CACHE_CONTROL = os.getenv("IMAGE_CACHE_CONTROL", "public, max-age=86400")  # negotiated /img responses
+IMAGE_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"  # content-hashed derivatives
@@ -0,0 +1,80 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, Optional
+
+from loguru import logger
+from sqlalchemy import text
+
+from .config import COUNTER_FLUSH_INTERVAL
+from .database import get_db
+
+FLUSH_SQL = text(
+    "UPDATE news_articles "
+    "SET views = COALESCE(views, 0) + :views, shares = COALESCE(shares, 0) + :shares "
+    "WHERE id = :id"
+)
+
+
+class CounterAggregator:
+    """Write-behind aggregator for article view and share counters.
+    
+    Increments are summed in memory and flushed every `interval` seconds as
+    one relative UPDATE per article, so a burst of clicks costs a single
+    write and concurrent increments can never overwrite each other.
+    """
+    
+    def __init__(self, interval: float = COUNTER_FLUSH_INTERVAL):
+        self.interval = interval
+        self._pending: Dict[int, Dict[str, int]] = defaultdict(lambda: {"views": 0, "shares": 0})
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+    
+    def increment(self, article_id: int, counter: str):
+        self._pending[article_id][counter] += 1
+    
+    async def flush(self) -> int:
+        """Write all pending increments, returning the number of articles updated"""
+        async with self._lock:
+            pending, self._pending = self._pending, defaultdict(lambda: {"views": 0, "shares": 0})
+            if not pending:
+                return 0
+            try:
+                async with get_db() as db:
+                    await db.execute(FLUSH_SQL, [
+                        {"id": article_id, **counts} for article_id, counts in pending.items()
+                    ])
+            except Exception:
+                # Put the increments back so the next flush retries them
+                for article_id, counts in pending.items():
+                    for counter, n in counts.items():
+                        self._pending[article_id][counter] += n
+                raise
+            return len(pending)
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                # Shielded so stop() cannot cancel a flush after it took the pending
+                # increments; stop() then waits for it on the lock
+                await asyncio.shield(self.flush())
+            except Exception as e:
+                logger.error(f"Failed to flush article counters: {str(e)}")
+    
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the periodic flush and write out whatever is still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+article_counters = CounterAggregator()
@@ -5,25 +5,111 @@ from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 from loguru import logger
 
-from .models import Base
-from .config import DATABASE_URL
+from sqlalchemy import event
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=False,  # Set to True only in development
-    future=True
+from .models import Base
+from .search import create_search_index
+from .config import (
+    DATABASE_URL, DATABASE_READ_URL, SQLITE_PERFORMANCE_MODE, SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE, SQLITE_BUSY_TIMEOUT,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_STATEMENT_CACHE_SIZE
 )
 
+def database_url(url: str) -> URL:
+    """Parse DATABASE_URL, defaulting plain postgres:// URLs to the asyncpg driver"""
+    parsed = make_url(url.replace("postgres://", "postgresql://", 1) if url.startswith("postgres://") else url)
+    if parsed.drivername == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed
+
+def engine_options(url: URL) -> dict:
+    """Pool and driver settings for the backend the URL selects"""
+    if url.get_backend_name() == "postgresql":
+        return {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_recycle": DB_POOL_RECYCLE,
+            "pool_pre_ping": True,
+            "connect_args": {"prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE},
+        }
+    return {}
+
+def sqlite_pragmas() -> list:
+    return [
+        "journal_mode=WAL",
+        "synchronous=NORMAL",
+        f"mmap_size={SQLITE_MMAP_SIZE}",
+        f"cache_size={SQLITE_CACHE_SIZE}",
+        f"busy_timeout={SQLITE_BUSY_TIMEOUT}",
+        "temp_store=MEMORY",
+    ]
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in sqlite_pragmas():
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+def create_engine(url: URL, **options):
+    created = create_async_engine(
+        url,
+        echo=False,  # Set to True only in development
+        future=True,
+        **engine_options(url),
+        **options
+    )
+    if created.dialect.name == "sqlite" and SQLITE_PERFORMANCE_MODE:
+        event.listen(created.sync_engine, "connect", set_sqlite_pragmas)
+    return created
+
+engine_url = database_url(DATABASE_URL)
+engine = create_engine(engine_url)
+
+def read_engine_options(url: URL) -> dict:
+    """Autocommit and a persistent pool for the read-only engine.
+
+    Autocommit connections never hold a transaction, so there is no BEGIN or
+    COMMIT per request and nothing to roll back when they return to the pool.
+    File-backed SQLite otherwise gets a NullPool, which reconnects (and reruns
+    the pragmas) on every request.
+    """
+    options = {"isolation_level": "AUTOCOMMIT", "pool_reset_on_return": None}
+    if url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:"):
+        options.update(poolclass=AsyncAdaptedQueuePool, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+    return options
+
+# With DATABASE_READ_URL set, reads go to that database (a replica) instead of the primary
+read_engine_url = database_url(DATABASE_READ_URL) if DATABASE_READ_URL else engine_url
+read_engine = create_engine(read_engine_url, **read_engine_options(read_engine_url))
+
 async_session = sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
 
+read_session = sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False
+)
+
+def insert_ignore(model, conflict_column: str):
+    """Build an INSERT ... ON CONFLICT (column) DO NOTHING for the configured backend"""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model).on_conflict_do_nothing(index_elements=[conflict_column])
+
 async def init_db():
     try:
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(create_search_index)
             logger.info("Database initialized successfully")
     except SQLAlchemyError as e:
         logger.error(f"Failed to initialize database: {str(e)}")
@@ -44,4 +130,20 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         logger.error(f"Unexpected error during database operation: {str(e)}")
         raise
     finally:
-        await session.close()
\ No newline at end of file
+        await session.close()
+
+@asynccontextmanager
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Session for requests that only read: never flushed or committed.
+
+    Pending ORM changes are dropped when it closes, and statements run in
+    autocommit with no rollback, so anything that may write belongs in get_db().
+    """
+    session = read_session()
+    try:
+        yield session
+    except SQLAlchemyError as e:
+        logger.error(f"Database error: {str(e)}")
+        raise
+    finally:
+        await session.close()
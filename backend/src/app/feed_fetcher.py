@@ -1,16 +1,37 @@
+import asyncio
+import hashlib
 import feedparser
 import httpx
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import urlparse
 from loguru import logger
 from dateutil.parser import parse as parse_date
 import re
 from bs4 import BeautifulSoup
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from .database import get_db
-from .models import NewsArticle
+from .cache import news_cache
+from .config import (
+    RSS_FETCH_TIMEOUT, RSS_FETCH_CONCURRENCY, RSS_FETCH_PER_HOST,
+    RSS_PARSE_WORKERS, RSS_PIPELINE_QUEUE_SIZE, RSS_STREAM_BATCH_SIZE, NEAR_DUPLICATES
+)
+from .database import get_db, insert_ignore
+from .feed_stream import FeedStreamParser
+from .models import NewsArticle, FeedState, ArticleDuplicate, ArticleFingerprint
+from .near_duplicates import BatchMatcher, Fingerprint, fingerprint, near_duplicates
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
 
 class FeedFetcher:
+    # Add "stream": True to a feed to ingest it incrementally (see stream_feed)
     RSS_FEEDS = [
         {
             "url": "https://rss.app/feeds/MLuDKqkwFtd2tuMr.xml",
@@ -27,101 +48,398 @@ class FeedFetcher:
     ]
     
     def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = httpx.AsyncClient(
+            timeout=float(RSS_FETCH_TIMEOUT),
+            limits=httpx.Limits(max_connections=RSS_FETCH_CONCURRENCY)
+        )
+        # Global cap on in-flight feeds plus a smaller cap per host, so a
+        # slow feed only holds up its own slot instead of the whole cycle
+        self._semaphore = asyncio.Semaphore(RSS_FETCH_CONCURRENCY)
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(RSS_FETCH_PER_HOST)
+        )
+    
+    @staticmethod
+    def conditional_headers(state: Optional[FeedState]) -> Dict[str, str]:
+        headers = {}
+        if state:
+            if state.etag:
+                headers["If-None-Match"] = state.etag
+            if state.last_modified:
+                headers["If-Modified-Since"] = state.last_modified
+        return headers
     
-    async def fetch_feed(self, url: str) -> Optional[Dict[str, Any]]:
+    async def fetch_feed(self, url: str, state: Optional[FeedState] = None) -> Optional[Dict[str, Any]]:
+        """Download a feed, using the stored validators for a conditional GET.
+        
+        Like feedparser's own URL handling, an unchanged feed comes back with
+        status 304. Changed feeds carry the raw body for the parse stage plus
+        the new etag, modified and content_hash values so they can be stored.
+        """
         try:
-            response = await self.client.get(url)
+            host = urlparse(url).netloc
+            async with self._semaphore, self._host_semaphores[host]:
+                response = await self.client.get(url, headers=self.conditional_headers(state))
+            if response.status_code == 304:
+                return feedparser.FeedParserDict(status=304)
             response.raise_for_status()
-            return feedparser.parse(response.text)
+            
+            # Some servers ignore validators, so also skip identical bodies
+            content_hash = hashlib.sha256(response.content).hexdigest()
+            if state and state.content_hash == content_hash:
+                return feedparser.FeedParserDict(status=304)
+            
+            return feedparser.FeedParserDict(
+                status=response.status_code,
+                body=response.text,
+                etag=response.headers.get("ETag"),
+                modified=response.headers.get("Last-Modified"),
+                content_hash=content_hash
+            )
         except Exception as e:
             logger.error(f"Error fetching feed {url}: {str(e)}")
             return None
     
-    def extract_image_url(self, entry: Dict[str, Any]) -> Optional[str]:
+    @staticmethod
+    def extract_image_url(entry: Dict[str, Any], *fallback_images: Optional[str]) -> Optional[str]:
         # Try media:content
         if hasattr(entry, 'media_content'):
             for media in entry.media_content:
                 if media.get('type', '').startswith('image/'):
                     return media['url']
         
-        # Try content
-        if hasattr(entry, 'content'):
-            for content in entry.content:
-                if 'value' in content:
-                    soup = BeautifulSoup(content['value'], 'html.parser')
-                    img = soup.find('img')
-                    if img and img.get('src'):
-                        return img['src']
-        
-        # Try description
-        if hasattr(entry, 'description'):
-            soup = BeautifulSoup(entry.description, 'html.parser')
-            img = soup.find('img')
-            if img and img.get('src'):
-                return img['src']
+        # Fall back to the first <img> found while parsing content/description
+        for src in fallback_images:
+            if src:
+                return src
         
         return None
     
-    def clean_html(self, html: str) -> str:
-        soup = BeautifulSoup(html, 'html.parser')
-        return soup.get_text(separator=' ', strip=True)
+    @staticmethod
+    def parse_html(html: str) -> Tuple[str, Optional[str]]:
+        """Parse an HTML fragment once, returning its text and the first image src"""
+        if not html:
+            return '', None
+        soup = BeautifulSoup(html, HTML_PARSER)
+        img = soup.find('img')
+        return soup.get_text(separator=' ', strip=True), (img.get('src') if img else None) or None
     
-    async def process_entry(self, entry: Dict[str, Any], category: str) -> Optional[NewsArticle]:
+    @classmethod
+    def clean_html(cls, html: str) -> str:
+        return cls.parse_html(html)[0]
+    
+    @staticmethod
+    def parse_published_at(entry: Dict[str, Any]) -> datetime:
+        # feedparser already normalises dates to UTC struct_time
+        parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+        if parsed:
+            return datetime(*parsed[:6])
+        
+        published = entry.get('published') or entry.get('updated')
+        if published:
+            return parse_date(published)
+        return datetime.utcnow()
+    
+    @classmethod
+    def entry_to_row(cls, entry: Dict[str, Any], category: str) -> Optional[Dict[str, Any]]:
+        """Turn a feed entry into a news_articles row. Safe to run in a worker process."""
         try:
-            # Extract and clean content
+            # Each distinct fragment is parsed once for both its text and image;
+            # content falls back to the description, which is often the same HTML
             content = entry.get('content', [{}])[0].get('value') or entry.get('description', '')
-            clean_content = self.clean_html(content)
-            
-            # Extract and clean description
             description = entry.get('summary', '') or entry.get('description', '')
-            clean_description = self.clean_html(description)
-            
-            # Parse publication date
-            published = entry.get('published') or entry.get('updated')
-            if published:
-                published_at = parse_date(published)
+            clean_content, content_image = cls.parse_html(content)
+            if description == content:
+                clean_description, description_image = clean_content, content_image
             else:
-                published_at = datetime.utcnow()
+                clean_description, description_image = cls.parse_html(description)
             
-            return NewsArticle(
-                guid=entry.get('id') or entry.get('link'),
-                title=entry.get('title'),
-                description=clean_description,
-                content=clean_content,
-                link=entry.get('link'),
-                image_url=self.extract_image_url(entry),
-                category=category,
-                published_at=published_at
-            )
+            return {
+                "guid": entry.get('id') or entry.get('link'),
+                "title": entry.get('title'),
+                "description": clean_description,
+                "content": clean_content,
+                "link": entry.get('link'),
+                "image_url": cls.extract_image_url(entry, content_image, description_image),
+                "category": category,
+                "published_at": cls.parse_published_at(entry),
+                # Not a column: matched against recent articles in persist_feed
+                "fingerprint": fingerprint(entry.get('title'), clean_content or clean_description) if NEAR_DUPLICATES else None
+            }
         except Exception as e:
             logger.error(f"Error processing entry: {str(e)}")
             return None
     
-    async def fetch_all(self):
-        async with get_db() as db:
-            for feed_info in self.RSS_FEEDS:
-                feed = await self.fetch_feed(feed_info["url"])
-                if not feed:
-                    logger.warning(f"Failed to fetch feed: {feed_info['url']}")
+    async def process_entry(self, entry: Dict[str, Any], category: str) -> Optional[NewsArticle]:
+        row = self.entry_to_row(entry, category)
+        if not row:
+            return None
+        row.pop("fingerprint")
+        return NewsArticle(**row)
+    
+    @staticmethod
+    async def split_near_duplicates(db: AsyncSession, rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Tuple]]:
+        """Separate new rows from near-duplicates of recent articles, returning (new, copies).
+        
+        Rows whose guid is already stored, as an article or as a known copy,
+        are dropped. Each copy comes as (row, original, similarity), where the
+        original is an article id or the guid of an earlier row in `rows`.
+        Matching is pure Python, so it runs in a thread, off the event loop.
+        """
+        guids = [row["guid"] for row in rows]
+        known = set((await db.execute(select(NewsArticle.guid).where(NewsArticle.guid.in_(guids)))).scalars())
+        known.update((await db.execute(select(ArticleDuplicate.guid).where(ArticleDuplicate.guid.in_(guids)))).scalars())
+        await near_duplicates.refresh(db)
+        
+        def split():
+            matcher = BatchMatcher(near_duplicates)
+            new, copies = [], []
+            for row in rows:
+                if row["guid"] in known:
                     continue
+                found = matcher.match(row["guid"], row["fingerprint"])
+                if found:
+                    copies.append((row, *found))
+                else:
+                    new.append(row)
+            return new, copies
+        
+        return await asyncio.get_running_loop().run_in_executor(None, split)
+    
+    async def persist_feed(
+        self,
+        feed_info: Dict[str, str],
+        state: Optional[FeedState],
+        fetched: Optional[Dict[str, Any]],
+        rows: List[Dict[str, Any]],
+        entry_count: int
+    ) -> Tuple[int, int, int]:
+        """Commit a parsed feed's articles and validators, returning (inserted, duplicates, skipped).
+        
+        Streamed feeds are persisted in batches; only the final batch carries
+        `fetched`, so validators are stored once the whole body was ingested.
+        Near-duplicates of articles ingested within NEAR_DUPLICATE_WINDOW_HOURS,
+        typically the same wire story from another feed, are recorded in
+        article_duplicates against the original instead of being inserted.
+        """
+        fingerprints = []
+        async with get_db() as db:
+            inserted = duplicates = 0
+            copies = []
+            if rows and NEAR_DUPLICATES:
+                rows, copies = await self.split_near_duplicates(db, rows)
+            row_fingerprints = {row["guid"]: row.pop("fingerprint") for row in rows}
+            
+            # One set-based insert per feed; existing guids are skipped by the
+            # unique index instead of being looked up one at a time
+            ids = {}
+            if rows:
+                stmt = insert_ignore(NewsArticle, "guid").returning(NewsArticle.id, NewsArticle.guid)
+                ids = {guid: article_id for article_id, guid in (await db.execute(stmt, rows)).all()}
+                inserted = len(ids)
                 
-                logger.info(f"Processing feed: {feed_info['url']}")
-                for entry in feed.entries:
-                    article = await self.process_entry(entry, feed_info["category"])
-                    if article:
-                        # Use select to check for existing article
-                        from sqlalchemy import select
-                        stmt = select(NewsArticle).where(NewsArticle.guid == article.guid)
-                        result = await db.execute(stmt)
-                        existing = result.scalar_one_or_none()
-                        
-                        if not existing:
-                            logger.info(f"Adding new article: {article.title}")
-                            db.add(article)
-                        else:
-                            logger.debug(f"Article already exists: {article.title}")
+                now = datetime.utcnow()
+                fingerprints = [
+                    {"article_id": ids[guid], "signature": fp.signature, "shingles": fp.shingles, "created_at": now}
+                    for guid, fp in row_fingerprints.items() if fp and guid in ids
+                ]
+                if fingerprints:
+                    await db.execute(insert(ArticleFingerprint), fingerprints)
+            
+            records = []
+            for row, original, score in copies:
+                # Originals from the same batch only got their id on insert
+                article_id = ids.get(original) if isinstance(original, str) else original
+                if article_id is not None:
+                    records.append({
+                        "guid": row["guid"], "article_id": article_id, "title": row["title"],
+                        "link": row["link"], "category": row["category"], "similarity": score
+                    })
+            if records:
+                stmt = insert_ignore(ArticleDuplicate, "guid").returning(ArticleDuplicate.id)
+                duplicates = len((await db.execute(stmt, records)).all())
+            skipped = entry_count - inserted - duplicates
+            
+            # Store validators in the same transaction as the articles, so a
+            # failed ingest is retried in full on the next run
+            if fetched is not None:
+                if state is None:
+                    state = FeedState(url=feed_info["url"])
+                state.etag = fetched.get("etag")
+                state.last_modified = fetched.get("modified")
+                state.content_hash = fetched.get("content_hash")
+                db.add(state)
+        
+        # Only indexed once committed, so the index never points at rolled back articles
+        if fingerprints:
+            await asyncio.get_running_loop().run_in_executor(None, near_duplicates.add_many, [
+                (row["article_id"], Fingerprint(row["signature"], row["shingles"]), row["created_at"])
+                for row in fingerprints
+            ])
+        if inserted:
+            news_cache.invalidate()
+        return inserted, duplicates, skipped
+    
+    async def stream_feed(
+        self,
+        feed_info: Dict[str, str],
+        state: Optional[FeedState],
+        pool: ProcessPoolExecutor,
+        persist_queue: asyncio.Queue
+    ):
+        """Download a feed incrementally and persist its entries in fixed-size batches.
+        
+        Used for feeds marked with "stream": True, typically multi-MB
+        aggregator feeds. The body is never held in full, so peak memory
+        depends on RSS_STREAM_BATCH_SIZE and the queue sizes, not feed size.
+        
+        The body hash is only known once the last byte has arrived. So when
+        the server ignores validators, an identical body is still parsed and
+        its batches persisted, but every guid is already stored and nothing
+        is inserted. Its validators are not rewritten either.
+        """
+        url = feed_info["url"]
+        loop = asyncio.get_running_loop()
+        parser = FeedStreamParser()
+        digest = hashlib.sha256()
+        batch = []
+        
+        async def flush(entries, fetched=None):
+            rows, entry_count = await loop.run_in_executor(
+                pool, entries_to_rows, entries, feed_info["category"]
+            )
+            await persist_queue.put((feed_info, state, fetched, rows, entry_count))
+        
+        host = urlparse(url).netloc
+        async with self._semaphore, self._host_semaphores[host]:
+            async with self.client.stream("GET", url, headers=self.conditional_headers(state)) as response:
+                if response.status_code == 304:
+                    logger.debug(f"Feed not modified: {url}")
+                    return
+                response.raise_for_status()
                 
-                await db.commit()
+                logger.info(f"Streaming feed: {url}")
+                async for chunk in response.aiter_bytes():
+                    digest.update(chunk)
+                    batch.extend(parser.feed(chunk))
+                    while len(batch) >= RSS_STREAM_BATCH_SIZE:
+                        await flush(batch[:RSS_STREAM_BATCH_SIZE])
+                        batch = batch[RSS_STREAM_BATCH_SIZE:]
+                batch.extend(parser.close())
+                
+                fetched = feedparser.FeedParserDict(
+                    status=response.status_code,
+                    etag=response.headers.get("ETag"),
+                    modified=response.headers.get("Last-Modified"),
+                    content_hash=digest.hexdigest()
+                )
+        
+        if state and state.content_hash == fetched["content_hash"]:
+            # Same body as last time: the stored validators stay as they are
+            logger.debug(f"Feed body unchanged: {url}")
+            fetched = None
+        await flush(batch, fetched)
+    
+    async def _fetch_stage(
+        self,
+        feed_info: Dict[str, str],
+        pool: ProcessPoolExecutor,
+        parse_queue: asyncio.Queue,
+        persist_queue: asyncio.Queue
+    ):
+        async with get_db() as db:
+            result = await db.execute(select(FeedState).where(FeedState.url == feed_info["url"]))
+            state = result.scalar_one_or_none()
+        
+        if feed_info.get("stream"):
+            await self.stream_feed(feed_info, state, pool, persist_queue)
+            return
+        
+        fetched = await self.fetch_feed(feed_info["url"], state)
+        if not fetched:
+            logger.warning(f"Failed to fetch feed: {feed_info['url']}")
+            return
+        if fetched.get("status") == 304:
+            logger.debug(f"Feed not modified: {feed_info['url']}")
+            return
+        
+        # Blocks when the parsers fall behind, so downloaded bodies cannot pile up
+        await parse_queue.put((feed_info, state, fetched))
+    
+    async def _parse_stage(self, pool: ProcessPoolExecutor, parse_queue: asyncio.Queue, persist_queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while (item := await parse_queue.get()) is not None:
+            feed_info, state, fetched = item
+            try:
+                logger.info(f"Processing feed: {feed_info['url']}")
+                rows, entry_count = await loop.run_in_executor(
+                    pool, parse_feed, fetched.pop("body"), feed_info["category"]
+                )
+                await persist_queue.put((feed_info, state, fetched, rows, entry_count))
+            except Exception as e:
+                logger.error(f"Error parsing feed {feed_info['url']}: {str(e)}")
+    
+    async def _persist_stage(self, persist_queue: asyncio.Queue):
+        while (item := await persist_queue.get()) is not None:
+            feed_info = item[0]
+            try:
+                inserted, duplicates, skipped = await self.persist_feed(*item)
+                logger.info(f"Feed {feed_info['url']}: {inserted} inserted, {duplicates} near-duplicates, {skipped} skipped")
+            except Exception as e:
+                logger.error(f"Error ingesting feed {feed_info['url']}: {str(e)}")
+    
+    async def fetch_all(self):
+        """Run the fetch -> parse -> persist pipeline over all feeds.
+        
+        Feeds are downloaded concurrently, parsed in a process pool so
+        feedparser and BeautifulSoup never block the event loop serving the
+        API, and committed one feed at a time as soon as they are parsed.
+        Bounded queues between the stages provide backpressure.
+        """
+        parse_queue: asyncio.Queue = asyncio.Queue(maxsize=RSS_PIPELINE_QUEUE_SIZE)
+        persist_queue: asyncio.Queue = asyncio.Queue(maxsize=RSS_PIPELINE_QUEUE_SIZE)
         
-        await self.client.aclose()
\ No newline at end of file
+        try:
+            with ProcessPoolExecutor(max_workers=RSS_PARSE_WORKERS) as pool:
+                parsers = [
+                    asyncio.create_task(self._parse_stage(pool, parse_queue, persist_queue))
+                    for _ in range(RSS_PARSE_WORKERS)
+                ]
+                persister = asyncio.create_task(self._persist_stage(persist_queue))
+                
+                results = await asyncio.gather(
+                    *(
+                        self._fetch_stage(feed_info, pool, parse_queue, persist_queue)
+                        for feed_info in self.RSS_FEEDS
+                    ),
+                    return_exceptions=True
+                )
+                for feed_info, result in zip(self.RSS_FEEDS, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"Error fetching feed {feed_info['url']}: {str(result)}")
+                
+                for _ in parsers:
+                    await parse_queue.put(None)
+                await asyncio.gather(*parsers)
+                await persist_queue.put(None)
+                await persister
+        finally:
+            await self.client.aclose()
+
+
+def parse_feed(body: str, category: str) -> Tuple[List[Dict[str, Any]], int]:
+    """Parse a feed body into unique article rows, returning (rows, entry_count).
+    
+    Runs in a worker process, so it only takes and returns picklable values.
+    """
+    return entries_to_rows(feedparser.parse(body).entries, category)
+
+
+def entries_to_rows(entries: List[Dict[str, Any]], category: str) -> Tuple[List[Dict[str, Any]], int]:
+    """Convert entries into rows unique by guid, returning (rows, entry_count)"""
+    rows = {}
+    for entry in entries:
+        row = FeedFetcher.entry_to_row(entry, category)
+        if row and row["guid"]:
+            rows.setdefault(row["guid"], row)
+    return list(rows.values()), len(entries)
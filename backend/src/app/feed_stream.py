@@ -0,0 +1,120 @@
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Optional
+from xml.etree.ElementTree import XMLPullParser, Element
+
+from dateutil.parser import parse as parse_date
+from feedparser import FeedParserDict
+
+NAMESPACES = {
+    "atom": "http://www.w3.org/2005/Atom",
+    "content": "http://purl.org/rss/1.0/modules/content/",
+    "media": "http://search.yahoo.com/mrss/",
+}
+
+ENTRY_TAGS = {"item", f"{{{NAMESPACES['atom']}}}entry"}
+
+
+def _parse_date(value: Optional[str]):
+    """Parse an RFC 822 or ISO date into a UTC struct_time, like feedparser does"""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = parse_date(value)
+        except (ValueError, OverflowError):
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc)
+    return parsed.timetuple()
+
+
+class FeedStreamParser:
+    """Incremental RSS/Atom parser for feeds too large to hold in memory.
+
+    Raw bytes are fed in as they arrive and complete entries come out as
+    FeedParserDicts with the keys FeedFetcher.entry_to_row reads. Finished
+    entry elements are detached from the tree, so memory stays bounded by
+    the largest single entry rather than the whole feed.
+    """
+
+    def __init__(self):
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._stack: List[Element] = []
+
+    def feed(self, data: bytes) -> List[FeedParserDict]:
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self) -> List[FeedParserDict]:
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> List[FeedParserDict]:
+        entries = []
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._stack.append(elem)
+                continue
+
+            self._stack.pop()
+            if elem.tag in ENTRY_TAGS:
+                entries.append(self._to_entry(elem))
+                if self._stack:
+                    self._stack[-1].remove(elem)
+        return entries
+
+    def _to_entry(self, elem: Element) -> FeedParserDict:
+        if elem.tag == "item":
+            return self._rss_entry(elem)
+        return self._atom_entry(elem)
+
+    def _rss_entry(self, item: Element) -> FeedParserDict:
+        entry = FeedParserDict(
+            title=item.findtext("title"),
+            link=item.findtext("link"),
+            id=item.findtext("guid"),
+            summary=item.findtext("description", ""),
+            published=item.findtext("pubDate"),
+        )
+        entry["description"] = entry["summary"]
+        entry["published_parsed"] = _parse_date(entry["published"])
+
+        content = item.findtext("content:encoded", namespaces=NAMESPACES)
+        if content:
+            entry["content"] = [{"value": content}]
+
+        media = [
+            {"url": m.get("url"), "type": m.get("type", "")}
+            for m in item.findall("media:content", NAMESPACES)
+            if m.get("url")
+        ]
+        if media:
+            entry["media_content"] = media
+        return entry
+
+    def _atom_entry(self, item: Element) -> FeedParserDict:
+        link = None
+        for candidate in item.findall("atom:link", NAMESPACES):
+            if candidate.get("rel", "alternate") == "alternate":
+                link = candidate.get("href")
+                break
+
+        entry = FeedParserDict(
+            title=item.findtext("atom:title", namespaces=NAMESPACES),
+            link=link,
+            id=item.findtext("atom:id", namespaces=NAMESPACES),
+            summary=item.findtext("atom:summary", "", namespaces=NAMESPACES),
+            published=item.findtext("atom:published", namespaces=NAMESPACES),
+            updated=item.findtext("atom:updated", namespaces=NAMESPACES),
+        )
+        entry["description"] = entry["summary"]
+        entry["published_parsed"] = _parse_date(entry["published"])
+        entry["updated_parsed"] = _parse_date(entry["updated"])
+
+        content = item.findtext("atom:content", namespaces=NAMESPACES)
+        if content:
+            entry["content"] = [{"value": content}]
+        return entry
@@ -0,0 +1,225 @@
+import os
+import secrets
+from email.utils import formatdate, parsedate_to_datetime
+from typing import List, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+# More ranges than this in one request are served as a plain 200
+MAX_RANGES = 16
+
+
+def resolve_file(directory: str, filename: str) -> str:
+    """Resolve a client-supplied filename inside directory, rejecting path traversal"""
+    if not filename or filename != os.path.basename(filename) or filename in (".", ".."):
+        raise ValueError(f"Invalid filename: {filename}")
+
+    root = os.path.realpath(directory)
+    path = os.path.realpath(os.path.join(root, filename))
+    if os.path.dirname(path) != root:
+        raise ValueError(f"Invalid filename: {filename}")
+    return path
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[List[Tuple[int, int]]]:
+    """Parse a Range header into sorted, merged (start, end) pairs, both inclusive.
+
+    Returns None when the whole file should be sent and an empty list when
+    no requested range can be satisfied.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+
+    ranges = []
+    for part in header[len("bytes="):].split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, sep, end = part.partition("-")
+        if not sep:
+            return None
+        try:
+            if start:
+                start, end = int(start), int(end) if end else size - 1
+            else:
+                # Suffix range: the last N bytes
+                start, end = max(size - int(end), 0), size - 1
+        except ValueError:
+            return None
+        if start >= size:
+            continue
+        if start > end:
+            return None
+        ranges.append((start, min(end, size - 1)))
+
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class RangeFileResponse(Response):
+    """File response with byte-range, validator and zero-copy support.
+
+    Handles single and multi-range requests (206, multipart/byteranges for
+    the latter), If-Range, and If-None-Match / If-Modified-Since (304). When
+    the server supports the ASGI zero-copy send extension the file is handed
+    over with sendfile; otherwise it is streamed in chunks from a thread.
+    Use file_response() to serve plain 200 responses with FileResponse instead.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        request_headers: Headers,
+        media_type: str,
+        cache_control: str,
+        filename: Optional[str] = None,
+    ):
+        stat = os.stat(path)
+        self.path = path
+        self.stat_result = stat
+        self.file_size = stat.st_size
+        self.media_type = media_type
+        self.background = None
+        self.body = b""
+        self.segments: List[Tuple[bytes, int, int]] = []  # (prefix, start, length)
+        self.suffix = b""
+
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+        headers = {
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "last-modified": last_modified,
+            "cache-control": cache_control,
+        }
+        if filename:
+            headers["content-disposition"] = f'inline; filename="{filename}"'
+
+        if self._not_modified(request_headers, etag, stat.st_mtime):
+            self.status_code = 304
+            self.raw_headers = self._encode_headers(headers)
+            return
+
+        ranges = parse_range(request_headers.get("range"), self.file_size)
+        if_range = request_headers.get("if-range")
+        if ranges is not None and if_range and if_range not in (etag, last_modified):
+            ranges = None
+
+        if ranges is None:
+            self.status_code = 200
+            self.segments = [(b"", 0, self.file_size)]
+            headers["content-type"] = media_type
+        elif not ranges:
+            self.status_code = 416
+            headers["content-range"] = f"bytes */{self.file_size}"
+        elif len(ranges) == 1:
+            start, end = ranges[0]
+            self.status_code = 206
+            self.segments = [(b"", start, end - start + 1)]
+            headers["content-type"] = media_type
+            headers["content-range"] = f"bytes {start}-{end}/{self.file_size}"
+        else:
+            boundary = secrets.token_hex(16)
+            self.status_code = 206
+            self.segments = [
+                (
+                    (b"\r\n" if i else b"") + (
+                        f"--{boundary}\r\n"
+                        f"Content-Type: {media_type}\r\n"
+                        f"Content-Range: bytes {start}-{end}/{self.file_size}\r\n\r\n"
+                    ).encode(),
+                    start,
+                    end - start + 1,
+                )
+                for i, (start, end) in enumerate(ranges)
+            ]
+            self.suffix = f"\r\n--{boundary}--\r\n".encode()
+            headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+
+        content_length = sum(len(prefix) + length for prefix, _, length in self.segments) + len(self.suffix)
+        headers["content-length"] = str(content_length)
+        self.raw_headers = self._encode_headers(headers)
+
+    @staticmethod
+    def _encode_headers(headers: dict) -> List[Tuple[bytes, bytes]]:
+        return [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()]
+
+    @staticmethod
+    def _not_modified(request_headers: Headers, etag: str, mtime: float) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match:
+            return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD" or not self.segments:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        zerocopy = "http.response.zerocopysend" in scope.get("extensions", {})
+        async with await anyio.open_file(self.path, "rb") as file:
+            for prefix, start, length in self.segments:
+                if prefix:
+                    await send({"type": "http.response.body", "body": prefix, "more_body": True})
+                if zerocopy:
+                    await send({
+                        "type": "http.response.zerocopysend",
+                        "file": file.wrapped,
+                        "offset": start,
+                        "count": length,
+                        "more_body": True,
+                    })
+                    continue
+
+                await file.seek(start)
+                remaining = length
+                while remaining:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+        await send({"type": "http.response.body", "body": self.suffix, "more_body": False})
+
+
+def file_response(
+    path: str,
+    request_headers: Headers,
+    media_type: str,
+    cache_control: str,
+    filename: Optional[str] = None,
+) -> Response:
+    """Response for a file request: RangeFileResponse for 206, 304 and 416, FileResponse for the whole file.
+
+    Whole-file downloads are the common case, and Starlette's FileResponse
+    sends them with less per-chunk overhead, or with the server's pathsend
+    extension where it is offered. The headers, validators included, are
+    the same either way.
+    """
+    response = RangeFileResponse(path, request_headers, media_type, cache_control, filename)
+    if response.status_code != 200:
+        return response
+    headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in response.raw_headers}
+    return FileResponse(path, headers=headers, media_type=media_type, stat_result=response.stat_result)
@@ -0,0 +1,120 @@
+import hashlib
+import io
+import json
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from .config import IMAGE_WIDTHS
+
+try:
+    from PIL import Image, features
+    # Preferred first; only formats this Pillow build can encode
+    FORMATS = [
+        (fmt, media_type) for fmt, media_type in (("avif", "image/avif"), ("webp", "image/webp"))
+        if features.check(fmt)
+    ]
+except ImportError:
+    Image = None
+    FORMATS = []
+
+DERIVED_DIR = "derived"
+ENCODE_OPTIONS = {
+    "avif": {"quality": 55},
+    "webp": {"quality": 78, "method": 4},
+}
+
+# {format: {width: filename}} for one source image
+Manifest = Dict[str, Dict[int, str]]
+
+
+def manifest_path(img_dir: str, filename: str) -> str:
+    return os.path.join(img_dir, DERIVED_DIR, f"{os.path.splitext(filename)[0]}.json")
+
+
+def create_derivatives(img_dir: str, filename: str, widths: List[int] = IMAGE_WIDTHS) -> Optional[Manifest]:
+    """Write resized AVIF/WebP copies of img_dir/filename and a manifest listing them. Blocking.
+
+    Derivatives are named by the hash of their own bytes, so their URLs can
+    be cached forever. Widths above the source width are capped to it.
+    Returns None when Pillow is not installed.
+    """
+    if Image is None:
+        return None
+
+    out_dir = os.path.join(img_dir, DERIVED_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest: Manifest = {}
+    with Image.open(os.path.join(img_dir, filename)) as source:
+        source = source.convert("RGBA" if source.mode in ("RGBA", "LA", "P") else "RGB")
+        for width in sorted({min(width, source.width) for width in widths}):
+            height = round(source.height * width / source.width)
+            resized = source if width == source.width else source.resize((width, height), Image.LANCZOS)
+            for fmt, _ in FORMATS:
+                buffer = io.BytesIO()
+                resized.save(buffer, fmt, **ENCODE_OPTIONS[fmt])
+                data = buffer.getvalue()
+                name = f"{hashlib.sha256(data).hexdigest()[:32]}.{fmt}"
+                path = os.path.join(out_dir, name)
+                if not os.path.exists(path):
+                    with open(f"{path}.part", "wb") as f:
+                        f.write(data)
+                    os.replace(f"{path}.part", path)
+                manifest.setdefault(fmt, {})[width] = name
+
+    path = manifest_path(img_dir, filename)
+    with open(f"{path}.part", "w") as f:
+        json.dump(manifest, f)
+    os.replace(f"{path}.part", path)
+    return manifest
+
+
+@lru_cache(maxsize=1024)
+def _read_manifest(path: str, mtime_ns: int) -> Manifest:
+    with open(path) as f:
+        return {fmt: {int(width): name for width, name in sizes.items()} for fmt, sizes in json.load(f).items()}
+
+
+def load_manifest(img_dir: str, filename: str) -> Optional[Manifest]:
+    path = manifest_path(img_dir, filename)
+    try:
+        return _read_manifest(path, os.stat(path).st_mtime_ns)
+    except (OSError, ValueError):
+        return None
+
+
+def accepted_types(accept: Optional[str]) -> set:
+    """Media types listed in an Accept header, minus those with q=0"""
+    types = set()
+    for part in (accept or "").split(","):
+        media_type, *params = [p.strip() for p in part.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    pass
+        if quality > 0:
+            types.add(media_type.lower())
+    return types
+
+
+def choose_variant(manifest: Manifest, accept: Optional[str], width: Optional[int]) -> Optional[Tuple[str, str]]:
+    """Pick the best (filename, media type) for a client, or None to serve the original.
+
+    The first format in FORMATS the client accepts wins; the width is the
+    smallest one at least as wide as requested, or the largest available.
+    """
+    types = accepted_types(accept)
+    for fmt, media_type in FORMATS:
+        sizes = manifest.get(fmt)
+        if not sizes or media_type not in types:
+            continue
+        candidates = sorted(sizes)
+        chosen = candidates[-1]
+        if width:
+            chosen = next((w for w in candidates if w >= width), chosen)
+        return sizes[chosen], media_type
+    return None
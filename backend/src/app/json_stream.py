@@ -0,0 +1,93 @@
+import codecs
+import json
+from typing import Any, Iterator, Tuple
+
+CHUNK_SIZE = 1 << 20
+WHITESPACE = " \t\r\n"
+# What may follow an array element; anything else means a number was cut off at the chunk end
+DELIMITERS = WHITESPACE + ",]"
+_MISSING = object()
+
+
+def _is_array(path: str) -> bool:
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(4096)
+            if not data:
+                return False
+            stripped = data.lstrip(codecs.BOM_UTF8).lstrip(b" \t\r\n")
+            if stripped:
+                return stripped[:1] == b"["
+
+
+def iter_json_records(path: str, offset: int = 0, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[Any, int]]:
+    """Yield (record, byte offset just past it) from a JSON array or NDJSON file.
+
+    The file is read in chunks, so memory stays bounded by the chunk size
+    and the largest single record. Passing a yielded offset back in
+    resumes with the record after it.
+    """
+    if _is_array(path):
+        yield from _iter_array(path, offset, chunk_size)
+        return
+
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            offset += len(line)
+            if line.strip():
+                yield json.loads(line), offset
+
+
+def _iter_array(path: str, offset: int, chunk_size: int) -> Iterator[Tuple[Any, int]]:
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    # buffer[:accounted] is already included in offset; pos is where parsing continues
+    buffer, pos, accounted = "", 0, 0
+    started = offset > 0  # a resume offset always points inside the array
+    eof = False
+
+    with open(path, "rb") as f:
+        if offset == 0 and f.read(3) == codecs.BOM_UTF8:
+            offset = 3
+        f.seek(offset)
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+
+            record = _MISSING
+            if pos < len(buffer):
+                char = buffer[pos]
+                if not started:
+                    if char != "[":
+                        raise json.JSONDecodeError("Expected a JSON array", buffer, pos)
+                    started = True
+                    pos += 1
+                    continue
+                if char == "]":
+                    return
+                if char == ",":
+                    pos += 1
+                    continue
+                try:
+                    record, end = decoder.raw_decode(buffer, pos)
+                    if not eof and (end == len(buffer) or buffer[end] not in DELIMITERS):
+                        record = _MISSING
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+
+            if record is not _MISSING:
+                offset += len(buffer[accounted:end].encode("utf-8"))
+                pos = accounted = end
+                yield record, offset
+                continue
+
+            if eof:
+                raise json.JSONDecodeError("Unterminated array", buffer, pos)
+            # Compact the buffer only when refilling it, so each record costs one slice
+            data = f.read(chunk_size)
+            eof = not data
+            offset += len(buffer[accounted:pos].encode("utf-8"))
+            buffer, pos, accounted = buffer[pos:] + text_decoder.decode(data, final=eof), 0, 0
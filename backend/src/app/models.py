@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, func, ForeignKey
+from sqlalchemy import BigInteger, Column, Float, Integer, LargeBinary, String, DateTime, Text, func, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -11,6 +11,8 @@ class AudioFile(Base):
     filename = Column(String, nullable=False)
     text_content = Column(Text, nullable=False)
     duration = Column(Integer)  # Duration in seconds
+    duration_ms = Column(Integer)  # Exact duration read from the MP3 frame headers
+    bitrate = Column(Integer)  # Average bitrate in bits per second
     article_id = Column(Integer, ForeignKey('news_articles.id'))
     type = Column(String, default='full')  # 'full' or 'description'
     created_at = Column(DateTime, server_default=func.now())
@@ -33,4 +35,79 @@ class NewsArticle(Base):
     shares = Column(Integer, default=0)
     created_at = Column(DateTime, server_default=func.now())
     
-    audio_file = relationship("AudioFile", back_populates="article", uselist=False)
\ No newline at end of file
+    audio_file = relationship("AudioFile", back_populates="article", uselist=False)
+    
+    __table_args__ = (
+        # Serves the /api/news listing and its keyset pagination
+        Index("ix_news_articles_category_published_at_id", "category", "published_at", "id"),
+        # Duplicate check of JSON imports
+        Index("ix_news_articles_title_published_at", "title", "published_at"),
+    )
+
+class FeedState(Base):
+    __tablename__ = "feed_states"
+    
+    id = Column(Integer, primary_key=True)
+    url = Column(String, unique=True, index=True, nullable=False)
+    etag = Column(String)
+    last_modified = Column(String)
+    content_hash = Column(String(64))  # sha256 of the last body we parsed
+    checked_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class AudioJob(Base):
+    __tablename__ = "audio_jobs"
+    
+    id = Column(Integer, primary_key=True)
+    status = Column(String, nullable=False, default='pending')  # pending, running, completed, failed
+    total = Column(Integer, default=0)  # articles missing audio when the job started
+    processed = Column(Integer, default=0)
+    generated = Column(Integer, default=0)  # audio files written
+    failed = Column(Integer, default=0)
+    last_article_id = Column(Integer, default=0)  # checkpoint: every article up to here is done
+    error = Column(Text)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class GeneratedImage(Base):
+    __tablename__ = "generated_images"
+    
+    id = Column(Integer, primary_key=True)
+    prompt_hash = Column(String(64), unique=True, index=True, nullable=False)  # sha256 of size + normalized prompt
+    prompt = Column(Text, nullable=False)
+    simhash = Column(BigInteger)  # 64-bit SimHash of the prompt, signed, for near-duplicate lookup
+    image_path = Column(String, nullable=False)  # /img/... path served to clients
+    hits = Column(Integer, default=0)  # imports that reused this image
+    created_at = Column(DateTime, server_default=func.now())
+
+class ImportCheckpoint(Base):
+    __tablename__ = "import_checkpoints"
+    
+    id = Column(Integer, primary_key=True)
+    source = Column(String, unique=True, nullable=False)  # absolute path of the imported file
+    file_size = Column(BigInteger, nullable=False)  # a different size or head hash means a different file; start over
+    head_hash = Column(String(64))  # SHA-256 of the file's first HEAD_HASH_BYTES
+    position = Column(BigInteger, default=0)  # byte offset just past the last committed article
+    articles = Column(Integer, default=0)  # articles before position
+    imported = Column(Integer, default=0)
+    skipped = Column(Integer, default=0)  # duplicates and articles without an image
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class ArticleFingerprint(Base):
+    __tablename__ = "article_fingerprints"
+    
+    article_id = Column(Integer, ForeignKey('news_articles.id'), primary_key=True)
+    signature = Column(LargeBinary, nullable=False)  # MinHash of the title and lead, see near_duplicates
+    shingles = Column(LargeBinary)  # their shingle hashes, to verify LSH candidates exactly
+    created_at = Column(DateTime, server_default=func.now(), index=True)  # rows older than the window are pruned
+
+class ArticleDuplicate(Base):
+    __tablename__ = "article_duplicates"
+    
+    id = Column(Integer, primary_key=True)
+    guid = Column(String, unique=True, index=True, nullable=False)  # so the copy is skipped on later fetches
+    article_id = Column(Integer, ForeignKey('news_articles.id'), index=True, nullable=False)  # the stored original
+    title = Column(String)
+    link = Column(String)
+    category = Column(String)  # of the feed the copy came from
+    similarity = Column(Float)  # Jaccard similarity of title + lead shingles to the original
+    created_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,146 @@
+import struct
+from typing import Dict, NamedTuple, Optional, Tuple
+
+
+class Mp3Info(NamedTuple):
+    duration: float  # seconds
+    bitrate: int  # average, bits per second
+
+
+# Bitrates in kbps by (MPEG-1?, layer), indexed by the header's bitrate index
+BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates by the header's version bits: 0 = MPEG-2.5, 2 = MPEG-2, 3 = MPEG-1
+SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+
+# (frame length in bytes, samples per frame, sample rate)
+Frame = Tuple[int, int, int]
+
+
+def parse_header(header: bytes) -> Optional[Frame]:
+    """Decode an MPEG audio frame header, or return None if it is not one"""
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = (header[1] >> 3) & 3
+    layer = 4 - ((header[1] >> 1) & 3)
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 3
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = SAMPLE_RATES[version][rate_index]
+    padding = (header[2] >> 1) & 1
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate
+    samples = 576 if layer == 3 and not mpeg1 else 1152
+    return samples // 8 * bitrate // sample_rate + padding, samples, sample_rate
+
+
+def _skip_id3v2(data: bytes) -> int:
+    if data[:3] != b"ID3" or len(data) < 10:
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _first_frame(data: bytes, pos: int) -> Optional[Tuple[int, Frame]]:
+    """Find the first frame header, confirmed by a valid header right after it"""
+    while True:
+        pos = data.find(b"\xff", pos)
+        if pos < 0:
+            return None
+        frame = parse_header(data[pos:pos + 4])
+        if frame and (pos + frame[0] >= len(data) or parse_header(data[pos + frame[0]:pos + frame[0] + 4])):
+            return pos, frame
+        pos += 1
+
+
+def _vbr_header(data: bytes, pos: int) -> Optional[Tuple[int, Optional[int]]]:
+    """Frame and byte counts from a Xing/Info or VBRI header in the first frame"""
+    mpeg1 = data[pos + 1] & 0x18 == 0x18
+    mono = data[pos + 3] >> 6 == 3
+    xing = pos + 4 + ((17 if mono else 32) if mpeg1 else (9 if mono else 17))
+    if data[xing:xing + 4] in (b"Xing", b"Info"):
+        flags, = struct.unpack_from(">I", data, xing + 4)
+        offset = xing + 8
+        frames = byte_count = None
+        if flags & 1:
+            frames, = struct.unpack_from(">I", data, offset)
+            offset += 4
+        if flags & 2:
+            byte_count, = struct.unpack_from(">I", data, offset)
+        if frames:
+            return frames, byte_count
+
+    vbri = pos + 4 + 32
+    if data[vbri:vbri + 4] == b"VBRI":
+        byte_count, frames = struct.unpack_from(">II", data, vbri + 10)
+        if frames:
+            return frames, byte_count
+    return None
+
+
+def parse_mp3_info(data: bytes) -> Optional[Mp3Info]:
+    """Exact duration and average bitrate of MP3 data, without decoding it.
+
+    Uses the Xing/Info or VBRI header when the encoder wrote one; otherwise
+    walks the frame headers and sums their sample counts. Headers are
+    decoded once per distinct 4-byte value, so a CBR file costs one dict
+    lookup per frame.
+    """
+    found = _first_frame(data, _skip_id3v2(data))
+    if found is None:
+        return None
+    start, (length, samples, sample_rate) = found
+
+    try:
+        counts = _vbr_header(data, start)
+    except struct.error:
+        counts = None
+    if counts:
+        frames, byte_count = counts
+        duration = frames * samples / sample_rate
+        byte_count = byte_count or len(data) - start - length
+        return Mp3Info(duration, round(byte_count * 8 / duration))
+
+    decoded: Dict[bytes, Optional[Frame]] = {}
+    total_samples = 0
+    total_seconds = 0.0
+    pos = start
+    end = len(data)
+    while pos + 4 <= end:
+        header = data[pos:pos + 4]
+        frame = decoded.get(header, False)
+        if frame is False:
+            frame = decoded[header] = parse_header(header)
+        if frame is None or pos + frame[0] > end:
+            break
+        if frame[2] != sample_rate:
+            # Mixed sample rates only happen in spliced files; keep the sum exact
+            total_seconds += total_samples / sample_rate
+            total_samples, sample_rate = 0, frame[2]
+        pos += frame[0]
+        total_samples += frame[1]
+
+    duration = total_seconds + total_samples / sample_rate
+    if not duration:
+        return None
+    return Mp3Info(duration, round((pos - start) * 8 / duration))
+
+
+def read_mp3_info(path: str) -> Optional[Mp3Info]:
+    """Read an MP3 file and return its duration and bitrate. Blocking."""
+    try:
+        with open(path, "rb") as f:
+            return parse_mp3_info(f.read())
+    except OSError:
+        return None
@@ -0,0 +1,258 @@
+import asyncio
+import hashlib
+import re
+import struct
+import threading
+import unicodedata
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, FrozenSet, Hashable, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import NEAR_DUPLICATE_MIN_SHINGLES, NEAR_DUPLICATE_THRESHOLD, NEAR_DUPLICATE_WINDOW_HOURS
+from .models import ArticleFingerprint
+
+# MinHash signature of NUM_BINS 32-bit values, split into BANDS bands for LSH.
+# Two articles become candidates when any band matches, which happens with
+# probability 1 - (1 - J^ROWS)^BANDS for Jaccard similarity J: ~0.99 at
+# J = 0.6 and ~0.2 at J = 0.3. Candidates are then checked against the
+# threshold on their exact Jaccard similarity, computed from the stored
+# shingle hashes: the estimate from a short text's densified signature is
+# too noisy to decide on.
+NUM_BINS = 128
+BANDS = 32
+ROWS = NUM_BINS // BANDS
+SHINGLE_WORDS = 3
+# Feeds truncate bodies at different lengths; the headline and lead are what copies share
+LEAD_WORDS = 120
+
+_SIGNATURE = struct.Struct(f"<{NUM_BINS}I")
+_SHINGLE = struct.Struct("<Q")
+_BAND = struct.Struct(f"<{ROWS}I")
+_BIN_SHIFT = 64 - (NUM_BINS.bit_length() - 1)
+_MASK32 = 0xFFFFFFFF
+
+
+def words(text: Optional[str]) -> List[str]:
+    return re.findall(r"\w+", unicodedata.normalize("NFKC", text or "").lower())
+
+
+def shingle_hashes(tokens: List[str]) -> Set[int]:
+    """64-bit hashes of the word n-grams of a text"""
+    if not tokens:
+        return set()
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(tokens[i:i + SHINGLE_WORDS]).encode("utf-8"), digest_size=8).digest(), "big")
+        for i in range(max(1, len(tokens) - SHINGLE_WORDS + 1))
+    }
+
+
+class Fingerprint(NamedTuple):
+    signature: bytes  # MinHash, for LSH candidate lookup
+    shingles: bytes  # the shingle hashes as packed 64-bit integers, for the exact similarity
+
+
+def fingerprint(
+    title: Optional[str], content: Optional[str], min_shingles: int = NEAR_DUPLICATE_MIN_SHINGLES
+) -> Optional[Fingerprint]:
+    """Fingerprint of an article's cleaned title and lead, or None if it is too short to compare.
+
+    Below min_shingles a few shared words between unrelated templated
+    entries already make a large share of the text, so short entries are
+    never treated as copies.
+    """
+    hashes = shingle_hashes(words(title) + words(content)[:LEAD_WORDS])
+    if len(hashes) < max(1, min_shingles):
+        return None
+    return Fingerprint(minhash(hashes), pack_shingles(hashes))
+
+
+def pack_shingles(hashes: Set[int]) -> bytes:
+    return b"".join(_SHINGLE.pack(value) for value in sorted(hashes))
+
+
+def unpack_shingles(data: bytes) -> FrozenSet[int]:
+    return frozenset(value for value, in _SHINGLE.iter_unpack(data))
+
+
+def minhash(hashes: Set[int]) -> bytes:
+    """MinHash signature of a non-empty set of shingle hashes.
+
+    Uses one-permutation hashing: each shingle hash goes to the bin its top
+    bits select and each bin keeps its minimum, so the cost is linear in
+    the text rather than in NUM_BINS times the text. Empty bins borrow the
+    next filled bin's value (rotation densification), which keeps short
+    texts comparable.
+    """
+    bins: List[Optional[int]] = [None] * NUM_BINS
+    for value in hashes:
+        index, low = value >> _BIN_SHIFT, value & _MASK32
+        if bins[index] is None or low < bins[index]:
+            bins[index] = low
+
+    filled = [i for i, value in enumerate(bins) if value is not None]
+    if len(filled) < NUM_BINS:
+        for i in range(NUM_BINS):
+            if bins[i] is None:
+                # Distance to the next filled bin, circularly
+                source = next((j for j in filled if j > i), filled[0])
+                distance = (source - i) % NUM_BINS
+                bins[i] = (bins[source] + distance * 0x9E3779B1) & _MASK32
+    return _SIGNATURE.pack(*bins)
+
+
+def unpack(signature: bytes) -> Tuple[int, ...]:
+    return _SIGNATURE.unpack(signature)
+
+
+def jaccard(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    """Exact Jaccard similarity of two shingle sets"""
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def band_keys(values: Tuple[int, ...]) -> List[bytes]:
+    """LSH bucket keys of a signature: the band number and that band's values"""
+    return [bytes([band]) + _BAND.pack(*values[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+
+
+def best_match(
+    values: Tuple[int, ...],
+    shingles: FrozenSet[int],
+    buckets: Dict[bytes, Set[Hashable]],
+    shingles_of: Callable[[Hashable], FrozenSet[int]],
+    threshold: float
+) -> Optional[Tuple[Hashable, float]]:
+    """The candidate sharing a bucket with values that is most similar, if it reaches the threshold"""
+    candidates: Set[Hashable] = set()
+    for key in band_keys(values):
+        candidates |= buckets.get(key, set())
+    best = None
+    for candidate in candidates:
+        score = jaccard(shingles, shingles_of(candidate))
+        if score >= threshold and (best is None or score > best[1]):
+            best = (candidate, score)
+    return best
+
+
+class NearDuplicateIndex:
+    """LSH index over the fingerprints of recently ingested articles.
+
+    Fingerprints are persisted in article_fingerprints; refresh() loads the
+    ones written since the last call (by this or another process) and
+    drops those older than the window, in memory and in the table, so
+    both stay bounded by the ingest rate times the window. Shingles stay
+    packed in memory and are only unpacked for LSH candidates.
+
+    The CPU-bound methods are called from worker threads, so they take a lock.
+    """
+
+    def __init__(self, threshold: float = NEAR_DUPLICATE_THRESHOLD, window_hours: float = NEAR_DUPLICATE_WINDOW_HOURS):
+        self.threshold = threshold
+        self.window = timedelta(hours=window_hours)
+        self._buckets: Dict[bytes, Set[int]] = defaultdict(set)
+        # article_id -> (signature, packed shingles, created_at), oldest first
+        self._articles: "OrderedDict[int, Tuple[Tuple[int, ...], bytes, datetime]]" = OrderedDict()
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._articles)
+
+    def add(self, article_id: int, fingerprint: Fingerprint, created_at: Optional[datetime] = None):
+        with self._lock:
+            self._add(article_id, fingerprint, created_at)
+
+    def add_many(self, items: Iterable[Tuple[int, Fingerprint, Optional[datetime]]]):
+        with self._lock:
+            for article_id, fingerprint, created_at in items:
+                self._add(article_id, fingerprint, created_at)
+
+    def _add(self, article_id: int, fingerprint: Fingerprint, created_at: Optional[datetime]):
+        if article_id in self._articles:
+            return
+        values = unpack(fingerprint.signature)
+        self._articles[article_id] = (values, fingerprint.shingles, created_at or datetime.utcnow())
+        for key in band_keys(values):
+            self._buckets[key].add(article_id)
+        self._last_id = max(self._last_id, article_id)
+
+    def expire(self, cutoff: datetime):
+        with self._lock:
+            while self._articles:
+                article_id, (values, _, created_at) = next(iter(self._articles.items()))
+                if created_at >= cutoff:
+                    break
+                del self._articles[article_id]
+                for key in band_keys(values):
+                    bucket = self._buckets[key]
+                    bucket.discard(article_id)
+                    if not bucket:
+                        del self._buckets[key]
+
+    def find(self, fingerprint: Fingerprint) -> Optional[Tuple[int, float]]:
+        """The most similar indexed article at or above the threshold, as (article_id, similarity)"""
+        return self._find(unpack(fingerprint.signature), unpack_shingles(fingerprint.shingles))
+
+    def _find(self, values: Tuple[int, ...], shingles: FrozenSet[int]) -> Optional[Tuple[int, float]]:
+        with self._lock:
+            return best_match(
+                values, shingles, self._buckets, lambda i: unpack_shingles(self._articles[i][1]), self.threshold
+            )
+
+    async def refresh(self, db: AsyncSession):
+        cutoff = datetime.utcnow() - self.window
+        result = await db.execute(
+            select(
+                ArticleFingerprint.article_id, ArticleFingerprint.signature,
+                ArticleFingerprint.shingles, ArticleFingerprint.created_at
+            )
+            .where(
+                ArticleFingerprint.article_id > self._last_id,
+                ArticleFingerprint.created_at >= cutoff,
+                ArticleFingerprint.shingles.isnot(None)
+            )
+            .order_by(ArticleFingerprint.article_id)
+        )
+        rows = [
+            (article_id, Fingerprint(signature, shingles), created_at)
+            for article_id, signature, shingles, created_at in result
+        ]
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.add_many, rows)
+        await loop.run_in_executor(None, self.expire, cutoff)
+        await db.execute(delete(ArticleFingerprint).where(ArticleFingerprint.created_at < cutoff))
+
+
+class BatchMatcher:
+    """Matches a batch of new articles against the index and against each other.
+
+    Rows duplicating an indexed article point at its id; rows duplicating an
+    earlier row of the same batch point at that row's guid, since it has no
+    id until inserted.
+    """
+
+    def __init__(self, index: NearDuplicateIndex):
+        self.index = index
+        self._buckets: Dict[bytes, Set[str]] = defaultdict(set)
+        self._shingles: Dict[str, FrozenSet[int]] = {}
+
+    def match(self, guid: str, fingerprint: Optional[Fingerprint]) -> Optional[Tuple[object, float]]:
+        """(article id or batch guid, similarity) of the row's original, or None if it is new"""
+        if fingerprint is None:
+            return None
+        values, shingles = unpack(fingerprint.signature), unpack_shingles(fingerprint.shingles)
+        found = self.index._find(values, shingles)
+        if found:
+            return found
+        found = best_match(values, shingles, self._buckets, self._shingles.__getitem__, self.index.threshold)
+        if found:
+            return found
+        self._shingles[guid] = shingles
+        for key in band_keys(values):
+            self._buckets[key].add(guid)
+        return None
+
+
+near_duplicates = NearDuplicateIndex()
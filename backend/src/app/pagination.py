@@ -0,0 +1,34 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+from sqlalchemy import tuple_
+
+from .models import NewsArticle
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(article: NewsArticle) -> str:
+    """Build an opaque cursor pointing just after the given article"""
+    payload = json.dumps([article.published_at.isoformat(), article.id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor into (published_at, id), raising ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        published_at, article_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(published_at), int(article_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def after_cursor(query, cursor: str):
+    """Restrict a newest-first news query to rows after the cursor (keyset paging)"""
+    published_at, article_id = decode_cursor(cursor)
+    return query.where(
+        tuple_(NewsArticle.published_at, NewsArticle.id) < tuple_(published_at, article_id)
+    )
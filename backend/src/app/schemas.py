@@ -7,6 +7,8 @@ class AudioFileResponse(BaseModel):
     filename: str
     text_content: str
     duration: Optional[int] = None
+    duration_ms: Optional[int] = None
+    bitrate: Optional[int] = None
     type: str = 'full'
     created_at: datetime
     
@@ -29,6 +31,41 @@ class NewsResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class NewsSummaryResponse(BaseModel):
+    """Feed card fields only; the article body is served by /news/{id}"""
+    id: int
+    title: str
+    description: Optional[str] = None
+    link: Optional[str] = None
+    image_url: Optional[str] = None
+    category: Optional[str] = None
+    published_at: datetime
+    views: int
+    shares: int
+    
+    class Config:
+        from_attributes = True
+
+class SearchResultResponse(NewsSummaryResponse):
+    """A feed card for a search hit, with its relevance and a highlighted excerpt"""
+    score: float
+    snippet: str
+
+class AudioJobResponse(BaseModel):
+    id: int
+    status: str
+    total: int
+    processed: int
+    generated: int
+    failed: int
+    last_article_id: int
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
 class HealthResponse(BaseModel):
     status: str
     timestamp: datetime
\ No newline at end of file
@@ -0,0 +1,245 @@
+import base64
+import html
+import json
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import DateTime, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import SEARCH_MAX_CANDIDATES
+
+FTS_TABLE = "news_articles_fts"
+SEARCH_COLUMN = "search_vector"
+SEARCH_INDEX = "ix_news_articles_search_vector"
+HIGHLIGHT = ("<mark>", "</mark>")
+# Private-use characters the database wraps matches in, so the excerpt can be
+# HTML-escaped before they are replaced with HIGHLIGHT
+SENTINELS = ("\ue000", "\ue001")
+SNIPPET_TOKENS = 24
+# Title matches count most, then the description, then the body
+WEIGHTS = (10.0, 4.0, 1.0)
+
+# SQLite: an external-content FTS5 table, so article text is stored once.
+# The update trigger only fires for the indexed columns; view and share
+# counter writes never touch the index.
+SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, content,
+        content='news_articles', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS news_articles_fts_ai AFTER INSERT ON news_articles BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, content)
+        VALUES (new.id, new.title, new.description, new.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS news_articles_fts_ad AFTER DELETE ON news_articles BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, content)
+        VALUES ('delete', old.id, old.title, old.description, old.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS news_articles_fts_au AFTER UPDATE OF title, description, content ON news_articles BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, content)
+        VALUES ('delete', old.id, old.title, old.description, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, content)
+        VALUES (new.id, new.title, new.description, new.content);
+    END""",
+]
+
+# Postgres: a weighted tsvector column kept current by a trigger (rather than
+# a generated column, which would be recomputed on every counter update)
+# and a GIN index over it
+PG_VECTOR = (
+    "setweight(to_tsvector('english', coalesce({row}title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({row}description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce({row}content, '')), 'D')"
+)
+POSTGRES_DDL = [
+    f"ALTER TABLE news_articles ADD COLUMN IF NOT EXISTS {SEARCH_COLUMN} tsvector",
+    f"""CREATE OR REPLACE FUNCTION news_articles_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.{SEARCH_COLUMN} := {PG_VECTOR.format(row="NEW.")};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS news_articles_search_vector_trigger ON news_articles",
+    """CREATE TRIGGER news_articles_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, content ON news_articles
+    FOR EACH ROW EXECUTE FUNCTION news_articles_search_vector_update()""",
+    f"CREATE INDEX IF NOT EXISTS {SEARCH_INDEX} ON news_articles USING gin ({SEARCH_COLUMN})",
+]
+
+
+def create_search_index(conn: Connection):
+    """Create the full-text index and its triggers if missing, indexing existing articles. Idempotent."""
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+        ).first()
+        for statement in SQLITE_DDL:
+            conn.exec_driver_sql(statement)
+        if not exists:
+            conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    elif dialect == "postgresql":
+        for statement in POSTGRES_DDL:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql(
+            f"UPDATE news_articles SET {SEARCH_COLUMN} = {PG_VECTOR.format(row='')} WHERE {SEARCH_COLUMN} IS NULL"
+        )
+
+
+def drop_search_index(conn: Connection):
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        for trigger in ("ai", "ad", "au"):
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS news_articles_fts_{trigger}")
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif dialect == "postgresql":
+        conn.exec_driver_sql("DROP TRIGGER IF EXISTS news_articles_search_vector_trigger ON news_articles")
+        conn.exec_driver_sql("DROP FUNCTION IF EXISTS news_articles_search_vector_update()")
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {SEARCH_INDEX}")
+        conn.exec_driver_sql(f"ALTER TABLE news_articles DROP COLUMN IF EXISTS {SEARCH_COLUMN}")
+
+
+def fts5_query(q: str) -> str:
+    """Turn user input into an FTS5 query: "quoted phrases" and words, all required.
+
+    Every term is quoted, so FTS5 operators and punctuation in the input
+    are matched as text instead of raising syntax errors.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', q):
+        tokens = re.findall(r"\w+", phrase or word)
+        if tokens:
+            terms.append('"' + " ".join(tokens) + '"')
+    return " ".join(terms)
+
+
+def encode_search_cursor(score: float, article_id: int) -> str:
+    """Build an opaque cursor pointing just after the result with this score and id"""
+    payload = json.dumps([score, article_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    """Decode a cursor into (score, id), raising ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, article_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(score), int(article_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+SUMMARY_SELECT = (
+    "a.id, a.title, a.description, a.link, a.image_url, a.category, a.published_at, a.views, a.shares"
+)
+
+# bm25() is lower for better matches; negated so that higher scores rank first on both
+# backends. FTS5 walks matches newest first, so only the candidates get scored. Only the
+# page's rows get a snippet, looked up again by rowid, rather than every match
+SQLITE_SEARCH = f"""
+    SELECT {SUMMARY_SELECT}, page.score,
+           snippet({FTS_TABLE}, -1, :open, :close, '…', {SNIPPET_TOKENS}) AS snippet
+    FROM (
+        SELECT * FROM (
+            SELECT a.id, -bm25({FTS_TABLE}, {', '.join(map(str, WEIGHTS))}) AS score
+            FROM {FTS_TABLE} JOIN news_articles a ON a.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH :query {{category}}
+            ORDER BY {FTS_TABLE}.rowid DESC
+            LIMIT :candidates
+        )
+        {{after}}
+        ORDER BY score DESC, id
+        LIMIT :limit
+    ) page
+    JOIN news_articles a ON a.id = page.id
+    JOIN {FTS_TABLE} ON {FTS_TABLE}.rowid = page.id
+    WHERE {FTS_TABLE} MATCH :query
+    ORDER BY page.score DESC, page.id
+"""
+
+# websearch_to_tsquery accepts the same "quoted phrase" input and never raises on syntax;
+# ts_rank_cd is cover density ranking, the closest built-in to BM25. As on SQLite, only
+# the newest candidates are ranked and only the page gets snippets
+POSTGRES_SEARCH = f"""
+    SELECT id, title, description, link, image_url, category, published_at, views, shares, score,
+           ts_headline('english', coalesce(description, '') || ' ' || coalesce(content, ''),
+                       websearch_to_tsquery('english', :query), :headline) AS snippet
+    FROM (
+        SELECT * FROM (
+            SELECT *, ts_rank_cd(search_vector, websearch_to_tsquery('english', :query)) AS score
+            FROM (
+                SELECT {SUMMARY_SELECT}, a.content, a.search_vector
+                FROM news_articles a
+                WHERE a.search_vector @@ websearch_to_tsquery('english', :query) {{category}}
+                ORDER BY a.id DESC
+                LIMIT :candidates
+            ) candidates
+        ) matches
+        {{after}}
+        ORDER BY score DESC, id
+        LIMIT :limit
+    ) page
+    ORDER BY score DESC, id
+"""
+
+
+def highlight(snippet: Optional[str]) -> Optional[str]:
+    """HTML-escape a snippet and turn its sentinels into HIGHLIGHT tags"""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(SENTINELS[0], HIGHLIGHT[0]).replace(SENTINELS[1], HIGHLIGHT[1])
+
+
+async def search_articles(
+    db: AsyncSession,
+    q: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    category: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """Rank articles matching q, best first, returning (rows, next cursor).
+
+    Rows are the summary columns plus `score` and `snippet`, an
+    HTML-escaped excerpt with the matched terms wrapped in HIGHLIGHT.
+    Only the newest SEARCH_MAX_CANDIDATES matches are
+    ranked. The cursor is None on the last page. Pages follow (score, id),
+    so they stay consistent while no article is added or edited; new
+    articles shift the candidates and the statistics scores come from.
+    """
+    dialect = db.get_bind().dialect.name
+    params = {"limit": limit, "candidates": SEARCH_MAX_CANDIDATES or None}
+    if dialect == "sqlite":
+        params.update(query=fts5_query(q), open=SENTINELS[0], close=SENTINELS[1])
+        params["candidates"] = params["candidates"] or -1
+        template = SQLITE_SEARCH
+    elif dialect == "postgresql":
+        params.update(
+            query=q,
+            headline=f"StartSel={SENTINELS[0]}, StopSel={SENTINELS[1]}, MaxWords={SNIPPET_TOKENS}, MinWords=8"
+        )
+        template = POSTGRES_SEARCH
+    else:
+        raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+    if not params["query"].strip():
+        return [], None
+
+    category_filter = after = ""
+    if category:
+        category_filter = "AND a.category = :category"
+        params["category"] = category
+    if cursor:
+        params["after_score"], params["after_id"] = decode_search_cursor(cursor)
+        after = "WHERE score < :after_score OR (score = :after_score AND id > :after_id)"
+
+    query = text(template.format(category=category_filter, after=after)).columns(published_at=DateTime)
+    result = await db.execute(query, params)
+    rows = [dict(row) for row in result.mappings()]
+    for row in rows:
+        row["snippet"] = highlight(row["snippet"])
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = encode_search_cursor(rows[-1]["score"], rows[-1]["id"])
+    return rows, next_cursor
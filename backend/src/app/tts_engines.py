@@ -0,0 +1,80 @@
+import io
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, List, Type
+
+from gtts import gTTS
+
+from .config import TTS_WORKERS
+
+
+class TTSEngine(ABC):
+    """A text-to-speech backend producing MP3 bytes.
+
+    `name` and `voice` are part of the audio store key, so changing either
+    never serves audio made by another engine. `concurrency` bounds the
+    synthesis threads the service runs for this engine, and `batch_size`
+    how many texts are handed to synthesize_batch() at once.
+    """
+
+    name = ""
+    voice = "default"
+    concurrency = 1
+    batch_size = 1
+
+    @abstractmethod
+    def synthesize(self, text: str, lang: str = "en") -> bytes:
+        """Synthesize text to MP3 bytes. Blocking, so run it in a thread."""
+
+    def synthesize_batch(self, texts: List[str], lang: str = "en") -> List[bytes]:
+        """Synthesize several texts in one call; engines with per-call setup cost override this"""
+        return [self.synthesize(text, lang) for text in texts]
+
+
+class GTTSEngine(TTSEngine):
+    """Google Translate TTS: remote, rate limited, one request per clip"""
+
+    name = "gtts"
+    voice = "com"  # top-level domain, which selects the accent
+    concurrency = TTS_WORKERS
+
+    def synthesize(self, text: str, lang: str = "en") -> bytes:
+        fp = io.BytesIO()
+        gTTS(text=text, lang=lang, tld=self.voice).write_to_fp(fp)
+        return fp.getvalue()
+
+
+class SilentEngine(TTSEngine):
+    """Offline, deterministic engine emitting silence as long as the text takes to read.
+
+    Output is valid MPEG-2 Layer III (24 kHz mono, 32 kbps) made of frames
+    with empty side info, so it plays, streams and parses like real audio
+    without any network or encoder. Meant for tests, development and
+    benchmarking the rest of the audio pipeline.
+    """
+
+    name = "silent"
+    concurrency = os.cpu_count() or 1
+    batch_size = 64
+
+    WORDS_PER_MINUTE = 150
+    # 96-byte frames of 576 samples at 24 kHz: 24 ms each
+    FRAME = bytes([0xFF, 0xF3, 0x44, 0xC0]) + bytes(92)
+    FRAME_SECONDS = 576 / 24000
+
+    def synthesize(self, text: str, lang: str = "en") -> bytes:
+        seconds = len(text.split()) * 60 / self.WORDS_PER_MINUTE
+        return self.FRAME * max(1, round(seconds / self.FRAME_SECONDS))
+
+
+ENGINES: Dict[str, Type[TTSEngine]] = {
+    GTTSEngine.name: GTTSEngine,
+    SilentEngine.name: SilentEngine,
+}
+
+
+def get_engine(name: str) -> TTSEngine:
+    try:
+        return ENGINES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown TTS engine: {name}") from None
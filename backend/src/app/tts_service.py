@@ -1,45 +1,330 @@
+import asyncio
 import os
-from gtts import gTTS
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import uuid
 from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from . import models
+from .audio_store import AudioStore
+from .mp3_info import read_mp3_info
+from .config import TTS_ENGINE, TTS_STREAM_CHUNK_CHARS, TTS_STREAM_LOOKAHEAD, AUDIO_CACHE_MAX_BYTES
+from .database import get_db
+from .tts_engines import TTSEngine, get_engine
+
+class AudioBroadcast:
+    """MP3 chunks of one streamed synthesis, kept so listeners that join late can replay them"""
+    
+    def __init__(self, article_id: int, audio_type: str):
+        self.article_id = article_id
+        self.audio_type = audio_type
+        self.chunks: List[bytes] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        # Set and replaced on every change, so each wait sees the next one
+        self._changed = asyncio.Event()
+    
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+    
+    def append(self, data: bytes):
+        self.chunks.append(data)
+        self._notify()
+    
+    def close(self, error: Optional[BaseException] = None):
+        self.done, self.error = True, error
+        self._notify()
+    
+    async def listen(self) -> AsyncIterator[bytes]:
+        """Yield every chunk from the first, waiting for new ones until the synthesis ends"""
+        sent = 0
+        while True:
+            while sent < len(self.chunks):
+                sent += 1
+                yield self.chunks[sent - 1]
+            if self.done:
+                if self.error is not None:
+                    raise RuntimeError("Audio synthesis failed") from self.error
+                return
+            await self._changed.wait()
 
 class TTSService:
-    def __init__(self, audio_dir: str = "audio"):
+    AUDIO_TYPES = ("description", "content")
+    
+    def __init__(
+        self,
+        audio_dir: str = "audio",
+        engine: Optional[TTSEngine] = None,
+        max_bytes: int = AUDIO_CACHE_MAX_BYTES
+    ):
         self.audio_dir = audio_dir
-        os.makedirs(audio_dir, exist_ok=True)
+        self.engine = engine or get_engine(TTS_ENGINE)
+        self.store = AudioStore(audio_dir, max_bytes, engine=self.engine.name, voice=self.engine.voice)
+        # Engines block, so synthesis runs off the event loop in a pool sized for the engine
+        self._executor = ThreadPoolExecutor(max_workers=self.engine.concurrency, thread_name_prefix="tts")
+        # In-flight work shared by concurrent callers, keyed by (article_id, audio_type) for
+        # generations and by filename for the syntheses behind them
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        # Texts being streamed, by filename; their synthesis task is in _inflight too
+        self._streams: Dict[str, AudioBroadcast] = {}
     
-    def get_audio_filename(self, article_id: int, audio_type: str) -> str:
-        """Get the standardized audio filename"""
-        return f"{article_id}_{audio_type}.mp3"
+    def get_audio_filename(self, text_content: str, lang: str = "en") -> str:
+        """Get the content-addressed filename for a text"""
+        return self.store.filename_for(text_content, lang)
 
+    def get_text_content(self, article: models.NewsArticle, audio_type: str) -> str:
+        """Get the text that is read out for an article and audio type"""
+        if audio_type == "description":
+            return article.description if article.description else "No description available."
+        return f"{article.title}. {article.content if article.content else article.description}"
+    
+    def synthesize_bytes(self, text: str, lang: str = "en") -> bytes:
+        """Synthesize text to MP3 bytes. Blocking, so run it in a thread."""
+        return self.engine.synthesize(text, lang)
+    
+    def synthesize_batch(self, texts: List[str], filenames: List[str], lang: str = "en") -> None:
+        """Synthesize several texts in one engine call into the audio store. Blocking."""
+        for filename, data in zip(filenames, self.engine.synthesize_batch(texts, lang)):
+            self.store.put(filename, data)
+    
+    def synthesize(self, text: str, filename: str, lang: str = "en") -> str:
+        """Synthesize text to an MP3 in the audio store. Blocking, so run it in a thread."""
+        return self.store.put(filename, self.synthesize_bytes(text, lang))
+    
+    def split_text(self, text: str, max_chars: int = TTS_STREAM_CHUNK_CHARS) -> List[str]:
+        """Split text into sentence-aligned chunks for progressive synthesis.
+        
+        The first chunk is a single sentence so playback can start quickly;
+        later sentences are grouped up to max_chars to keep request counts low.
+        """
+        sentences = [s for s in re.split(r'(?<=[.!?])\s+', text.strip()) if s]
+        chunks: List[str] = []
+        for sentence in sentences:
+            if len(chunks) > 1 and len(chunks[-1]) + len(sentence) < max_chars:
+                chunks[-1] = f"{chunks[-1]} {sentence}"
+            else:
+                chunks.append(sentence)
+        return chunks
+    
+    async def stream_audio(self, article_id: int, audio_type: str, text_content: str) -> AsyncIterator[bytes]:
+        """Yield MP3 data chunk by chunk while the rest of the text is synthesized.
+        
+        One synthesis per text is shared by every listener: a request that
+        arrives while the text is being streamed replays the chunks made so
+        far and then follows along, and one that arrives during a plain
+        generate() waits for the file. The synthesis finishes and is stored
+        even if its listeners disconnect.
+        """
+        filename = self.get_audio_filename(text_content)
+        broadcast = self._streams.get(filename)
+        if broadcast is None and filename in self._inflight:
+            loop = asyncio.get_running_loop()
+            await asyncio.shield(self._inflight[filename])
+            yield await loop.run_in_executor(None, self._read_audio, filename)
+        else:
+            if broadcast is None:
+                broadcast = self._start_stream(article_id, audio_type, text_content, filename)
+            async for data in broadcast.listen():
+                yield data
+            if (broadcast.article_id, broadcast.audio_type) == (article_id, audio_type):
+                return  # the synthesis stored this row
+        
+        async with get_db() as db:
+            await self.save_audio_file(db, article_id, audio_type, text_content)
+    
+    def _read_audio(self, filename: str) -> bytes:
+        with open(self.store.path_for(filename), "rb") as f:
+            return f.read()
+    
+    def _start_stream(self, article_id: int, audio_type: str, text_content: str, filename: str) -> AudioBroadcast:
+        """Start synthesizing a text for streaming, registered as the in-flight synthesis of its file"""
+        broadcast = AudioBroadcast(article_id, audio_type)
+        task = asyncio.ensure_future(self._stream_synthesis(broadcast, text_content, filename))
+        self._streams[filename] = broadcast
+        self._inflight[filename] = task
+        
+        def done(task: asyncio.Task):
+            self._streams.pop(filename, None)
+            self._inflight.pop(filename, None)
+            if not task.cancelled() and task.exception():
+                logger.error(f"Error streaming audio for article {article_id}: {str(task.exception())}")
+        
+        task.add_done_callback(done)
+        return broadcast
+    
+    async def _stream_synthesis(self, broadcast: AudioBroadcast, text_content: str, filename: str):
+        """Synthesize the chunks of a text in order into broadcast.
+        
+        Up to TTS_STREAM_LOOKAHEAD chunks are in flight ahead of the one being
+        awaited. gTTS output is plain MPEG frames, so the chunks concatenate
+        into one valid file, which is stored with the row before the
+        broadcast is closed.
+        """
+        loop = asyncio.get_running_loop()
+        chunks = deque(self.split_text(text_content))
+        pending: deque = deque()
+        
+        def schedule():
+            while chunks and len(pending) <= TTS_STREAM_LOOKAHEAD:
+                pending.append(loop.run_in_executor(self._executor, self.synthesize_bytes, chunks.popleft()))
+        
+        try:
+            schedule()
+            while pending:
+                data = await pending.popleft()
+                schedule()
+                broadcast.append(data)
+            await loop.run_in_executor(self._executor, self.store.put, filename, b"".join(broadcast.chunks))
+            async with get_db() as db:
+                await self.save_audio_file(db, broadcast.article_id, broadcast.audio_type, text_content)
+        except BaseException as e:
+            for future in pending:
+                future.cancel()
+            broadcast.close(e)
+            raise
+        broadcast.close()
+    
+    async def save_audio_file(
+        self, db: AsyncSession, article_id: int, audio_type: str, text_content: str
+    ) -> models.AudioFile:
+        """Create or update the AudioFile row for a synthesized file"""
+        result = await db.execute(
+            select(models.AudioFile).filter(
+                models.AudioFile.article_id == article_id,
+                models.AudioFile.type == audio_type
+            )
+        )
+        audio_file = result.scalar_one_or_none()
+        if not audio_file:
+            audio_file = models.AudioFile(article_id=article_id, type=audio_type)
+            db.add(audio_file)
+        audio_file.filename = self.get_audio_filename(text_content)
+        audio_file.text_content = text_content
+        await self.set_audio_info(audio_file)
+        return audio_file
+    
+    async def set_audio_info(self, audio_file: models.AudioFile):
+        """Set duration and bitrate from the MP3 frame headers, or estimate them if there is no file yet"""
+        loop = asyncio.get_running_loop()
+        info = await loop.run_in_executor(None, read_mp3_info, self.store.path_for(audio_file.filename))
+        if info is None:
+            audio_file.duration = self.get_audio_duration(audio_file.text_content)
+            audio_file.duration_ms = None
+            audio_file.bitrate = None
+        else:
+            audio_file.duration = round(info.duration)
+            audio_file.duration_ms = round(info.duration * 1000)
+            audio_file.bitrate = info.bitrate
+    
+    async def _single_flight(self, key: Hashable, factory: Callable[[], Awaitable]):
+        """Run factory() once per key; concurrent callers await the same task"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so a caller that disconnects does not cancel it for the others
+        return await asyncio.shield(task)
+    
+    async def generate(self, article_id: int, audio_type: str, text_content: str) -> models.AudioFile:
+        """Synthesize audio in the worker pool, unless the store has it, and store its metadata.
+        
+        Concurrent calls for the same article and type are coalesced, and so
+        are syntheses of the same text for different articles, so a burst of
+        plays on a new article costs a single synthesis and a single row.
+        """
+        return await self._single_flight(
+            (article_id, audio_type), lambda: self._generate(article_id, audio_type, text_content)
+        )
+    
+    async def _generate(self, article_id: int, audio_type: str, text_content: str) -> models.AudioFile:
+        filename = self.get_audio_filename(text_content)
+        if not self.store.lookup(filename):
+            loop = asyncio.get_running_loop()
+            await self._single_flight(
+                filename, lambda: loop.run_in_executor(self._executor, self.synthesize, text_content, filename)
+            )
+        async with get_db() as db:
+            audio_file = await self.save_audio_file(db, article_id, audio_type, text_content)
+            await db.flush()
+            await db.refresh(audio_file)
+        return audio_file
+    
+    async def generate_batch(self, items: List[Tuple[int, str, str]]) -> List[bool]:
+        """Generate audio for many (article_id, audio_type, text) items, batching engine calls.
+        
+        Texts missing from the store are synthesized in groups of the
+        engine's batch_size, concurrently on its pool. Pending files are
+        registered as in flight, so a generate() for the same text waits for
+        the batch instead of synthesizing it again. Returns per item whether
+        its audio and row were stored.
+        """
+        loop = asyncio.get_running_loop()
+        filenames = [self.get_audio_filename(text) for _, _, text in items]
+        pending: Dict[str, asyncio.Future] = {}
+        missing: Dict[str, str] = {}
+        for filename, (_, _, text) in zip(filenames, items):
+            if filename in pending or filename in missing:
+                continue
+            if filename in self._inflight:
+                pending[filename] = self._inflight[filename]
+            elif not self.store.lookup(filename):
+                missing[filename] = text
+        
+        names = list(missing)
+        for i in range(0, len(names), self.engine.batch_size):
+            batch = names[i:i + self.engine.batch_size]
+            future = loop.run_in_executor(
+                self._executor, self.synthesize_batch, [missing[name] for name in batch], batch
+            )
+            for name in batch:
+                self._inflight[name] = pending[name] = future
+            future.add_done_callback(lambda f, batch=batch: [
+                self._inflight.pop(name) for name in batch if self._inflight.get(name) is f
+            ])
+        
+        results = await asyncio.gather(*map(asyncio.shield, pending.values()), return_exceptions=True)
+        failed = set()
+        for filename, result in zip(pending, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error synthesizing {filename}: {str(result)}")
+                failed.add(filename)
+        
+        async with get_db() as db:
+            for (article_id, audio_type, text_content), filename in zip(items, filenames):
+                if filename not in failed:
+                    await self.save_audio_file(db, article_id, audio_type, text_content)
+        return [filename not in failed for filename in filenames]
+    
+    async def create_audio(self, db: AsyncSession, article_id: int, audio_type: str) -> models.AudioFile:
+        """Synthesize audio for an article and store its metadata"""
+        result = await db.execute(
+            select(models.NewsArticle).filter(models.NewsArticle.id == article_id)
+        )
+        article = result.scalar_one_or_none()
+        if not article:
+            raise ValueError(f"Article with id {article_id} not found")
+        
+        return await self.generate(article_id, audio_type, self.get_text_content(article, audio_type))
+    
+    async def create_audio_for_article(self, db: AsyncSession, article_id: int) -> models.AudioFile:
+        return await self.create_audio(db, article_id, "content")
+    
+    async def create_audio_for_article_description(self, db: AsyncSession, article_id: int) -> models.AudioFile:
+        return await self.create_audio(db, article_id, "description")
+    
     def get_audio_duration(self, text: str) -> int:
-        """Calculate approximate audio duration based on text length"""
+        """Calculate approximate audio duration based on text length, for audio not synthesized yet"""
         words = len(text.split())
         return int((words / 150) * 60)  # Assuming 150 words per minute
 
-    def check_audio_exists(self, article_id: int, audio_type: str) -> tuple[str, int]:
-        """Check if audio file exists and return filename and duration"""
-        filename = self.get_audio_filename(article_id, audio_type)
-        filepath = os.path.join(self.audio_dir, filename)
-        
-        if not os.path.exists(filepath):
-            return None, 0
-            
-        # Calculate duration from text length
-        if audio_type == "description":
-            text = article.description
-        else:  # content
-            text = f"{article.title}. {article.content if article.content else article.description}"
-            
-        duration = self.get_audio_duration(text)
-        return filename, duration
-    
-    async def get_audio_for_article(self, db: AsyncSession, article_id: int, audio_type: str = "content") -> models.AudioFile:
-        """Get audio metadata for an article"""
-        # Get article
+    async def _load_audio_record(self, db: AsyncSession, article_id: int, audio_type: str) -> Tuple[str, str, Optional[models.AudioFile]]:
+        """The article's current text, its audio filename and the stored AudioFile row, if any"""
         result = await db.execute(
             select(models.NewsArticle).filter(models.NewsArticle.id == article_id)
         )
@@ -47,35 +332,57 @@ class TTSService:
         if not article:
             raise ValueError(f"Article with id {article_id} not found")
         
-        # Get text content based on type
-        if audio_type == "description":
-            text_content = article.description if article.description else "No description available."
-        else:  # content
-            text_content = f"{article.title}. {article.content if article.content else article.description}"
+        text_content = self.get_text_content(article, audio_type)
         
-        # Get filename and duration
-        filename = self.get_audio_filename(article_id, audio_type)
-        duration = self.get_audio_duration(text_content)
+        filename = self.get_audio_filename(text_content)
         
-        # Create or get audio file record
         result = await db.execute(
             select(models.AudioFile).filter(
                 models.AudioFile.article_id == article_id,
                 models.AudioFile.type == audio_type
             )
         )
-        audio_file = result.scalar_one_or_none()
+        return text_content, filename, result.scalar_one_or_none()
+    
+    async def find_audio_for_article(self, db: AsyncSession, article_id: int, audio_type: str = "content") -> Optional[models.AudioFile]:
+        """Get audio metadata for an article without writing: None if the row is missing or stale.
         
-        if not audio_file:
-            audio_file = models.AudioFile(
-                filename=filename,
-                text_content=text_content,
-                duration=duration,
-                article_id=article_id,
-                type=audio_type
-            )
-            db.add(audio_file)
-            await db.commit()
-            await db.refresh(audio_file)
+        A row is stale when it names another file than the current text's, or
+        when its file is gone, for example evicted from the store.
+        """
+        _, filename, audio_file = await self._load_audio_record(db, article_id, audio_type)
+        if audio_file and audio_file.filename == filename and self.store.exists(filename):
+            return audio_file
+        return None
+    
+    async def get_audio_for_article(self, db: AsyncSession, article_id: int, audio_type: str = "content") -> models.AudioFile:
+        """Get audio metadata for an article, creating or repointing its row. The caller commits.
+        
+        A row is only pointed at a file that exists: audio for the current
+        text if the store has it, or a legacy-named file for the same text,
+        which is renamed to its content-addressed name. While the text was
+        edited and its audio is not made yet, the row keeps serving the old
+        audio. With no playable file at all, the audio is synthesized.
+        """
+        text_content, filename, audio_file = await self._load_audio_record(db, article_id, audio_type)
+        
+        if audio_file and audio_file.filename != filename and not self.store.exists(filename):
+            same_text = self.store.normalize(audio_file.text_content or "") == self.store.normalize(text_content)
+            if not (same_text and self.store.adopt(audio_file.filename, filename)):
+                if self.store.exists(audio_file.filename):
+                    return audio_file
+                return await self.generate(article_id, audio_type, text_content)
+        
+        if not audio_file or not self.store.exists(filename):
+            # Also when the store already has the file, made for another article or by
+            # a generation that has not committed its row yet: the row is only created
+            # through generate(), whose single-flight keeps concurrent callers to one
+            return await self.generate(article_id, audio_type, text_content)
+        
+        if audio_file.filename != filename:
+            audio_file.filename = filename
+            audio_file.text_content = text_content
+            await self.set_audio_info(audio_file)
+            await db.flush()
         
-        return audio_file
\ No newline at end of file
+        return audio_file
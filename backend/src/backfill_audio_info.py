@@ -0,0 +1,60 @@
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import select, update
+from app.database import get_db
+from app.models import AudioFile
+from app.mp3_info import read_mp3_info
+
+AUDIO_DIR = os.path.join(os.path.dirname(__file__), "..", "audio")
+BATCH_SIZE = 1000
+
+def measure(filename: str):
+    info = read_mp3_info(os.path.join(AUDIO_DIR, filename))
+    if info is None:
+        return None
+    return round(info.duration), round(info.duration * 1000), info.bitrate
+
+async def backfill(recompute: bool = False):
+    """Fill in exact duration and bitrate for audio rows from their MP3 frame headers"""
+    loop = asyncio.get_running_loop()
+    updated = missing = 0
+    last_id = 0
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor() as pool:
+        while True:
+            async with get_db() as db:
+                query = select(AudioFile.id, AudioFile.filename).where(AudioFile.id > last_id)
+                if not recompute:
+                    query = query.where(AudioFile.duration_ms.is_(None))
+                result = await db.execute(query.order_by(AudioFile.id).limit(BATCH_SIZE))
+                rows = result.all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+
+                # Parsing is CPU-bound, so spread each batch over the process pool
+                infos = await loop.run_in_executor(
+                    None, lambda: list(pool.map(measure, [row.filename for row in rows], chunksize=64))
+                )
+                values = [
+                    {"id": row.id, "duration": info[0], "duration_ms": info[1], "bitrate": info[2]}
+                    for row, info in zip(rows, infos)
+                    if info is not None
+                ]
+                missing += len(rows) - len(values)
+                if values:
+                    await db.execute(update(AudioFile), values)
+                updated += len(values)
+
+            elapsed = time.perf_counter() - started
+            print(f"Updated {updated} rows ({updated / elapsed:.0f}/s), {missing} files missing or unreadable")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=backfill.__doc__)
+    parser.add_argument("--all", action="store_true", help="recompute rows that already have a duration")
+    args = parser.parse_args()
+    asyncio.run(backfill(recompute=args.all))
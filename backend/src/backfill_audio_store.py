@@ -0,0 +1,72 @@
+import argparse
+import asyncio
+import os
+import re
+import time
+from sqlalchemy import select, update
+from app.audio_store import AudioStore
+from app.database import get_db
+from app.models import AudioFile
+from app.tts_engines import ENGINES
+
+AUDIO_DIR = os.path.join(os.path.dirname(__file__), "..", "audio")
+BATCH_SIZE = 1000
+
+async def backfill(engine: str, dry_run: bool = False):
+    """Rename audio files made before the content-addressed store to their content hash.
+
+    Each row's file holds the audio for its text_content, so it is renamed
+    to the name that text resolves to, and the row updated. Later requests
+    then find it instead of synthesizing the text again, and no file is
+    left unreferenced. Run it with the engine that made the files (gTTS).
+    """
+    engine_class = ENGINES[engine]
+    store = AudioStore(AUDIO_DIR, engine=engine_class.name, voice=engine_class.voice)
+    adopted = missing = 0
+    last_id = 0
+    started = time.perf_counter()
+
+    while True:
+        async with get_db() as db:
+            result = await db.execute(
+                select(AudioFile.id, AudioFile.filename, AudioFile.text_content)
+                .where(AudioFile.id > last_id)
+                .order_by(AudioFile.id)
+                .limit(BATCH_SIZE)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            values = []
+            for row in rows:
+                filename = store.filename_for(row.text_content or "")
+                if row.filename == filename:
+                    continue
+                if dry_run:
+                    found = store.exists(filename) or store.exists(row.filename)
+                else:
+                    found = store.adopt(row.filename, filename)
+                if found:
+                    values.append({"id": row.id, "filename": filename})
+                else:
+                    missing += 1
+            if values and not dry_run:
+                await db.execute(update(AudioFile), values)
+            adopted += len(values)
+
+        elapsed = time.perf_counter() - started
+        print(f"{'Would adopt' if dry_run else 'Adopted'} {adopted} files ({adopted / elapsed:.0f}/s), {missing} rows without a file")
+
+    if not dry_run:
+        orphans = [name for name in os.listdir(AUDIO_DIR) if name.endswith(".mp3") and not re.fullmatch(r"[0-9a-f]{64}\.mp3", name)]
+        if orphans:
+            print(f"{len(orphans)} legacy files have no row and were left alone: {', '.join(orphans[:10])}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=backfill.__doc__.splitlines()[0])
+    parser.add_argument("--engine", default="gtts", choices=sorted(ENGINES), help="engine the existing files were made with")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be renamed")
+    args = parser.parse_args()
+    asyncio.run(backfill(args.engine, args.dry_run))
@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmark_common import percentile
+
+CLIP = "clip.mp3"
+
+def serve(directory: str, port: int):
+    """Serve CLIP from directory under uvicorn, via the app's file_response and plain Starlette FileResponse"""
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.responses import FileResponse
+    from starlette.routing import Route
+    from app.file_response import file_response, resolve_file
+
+    async def ranged(request):
+        path = resolve_file(directory, request.path_params["filename"])
+        return file_response(path, request.headers, media_type="audio/mpeg", cache_control="public, max-age=86400")
+
+    async def plain(request):
+        return FileResponse(resolve_file(directory, request.path_params["filename"]), media_type="audio/mpeg")
+
+    app = Starlette(routes=[Route("/range/{filename}", ranged), Route("/plain/{filename}", plain)])
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+async def wait_until_up(client, url: str, timeout: float = 10):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            await client.get(url)
+            return
+        except Exception:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+async def measure(base: str, args) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base, limits=limits) as client:
+        await wait_until_up(client, f"/range/{CLIP}")
+
+        async def worker(url: str, count: int):
+            for _ in range(count):
+                (await client.get(url)).raise_for_status()
+
+        results = {}
+        for route in ("range", "plain"):
+            url = f"/{route}/{CLIP}"
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                worker(url, len(range(n, args.requests, args.concurrency))) for n in range(args.concurrency)
+            ))
+            full_rate = args.requests / (time.perf_counter() - started)
+
+            seeks = []
+            headers = {"Range": f"bytes={args.offset}-{args.offset + 64 * 1024 - 1}"}
+            for _ in range(args.seeks):
+                started = time.perf_counter()
+                response = await client.get(url, headers=headers)
+                seeks.append(time.perf_counter() - started)
+            results[route] = (full_rate, percentile(seeks, 0.5), response.status_code, len(response.content))
+        return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Full-file throughput and seek latency of audio served with and without byte ranges")
+    parser.add_argument("--words", type=int, default=94, help="text length of the SilentEngine clip (94 words is ~150KB)")
+    parser.add_argument("--requests", type=int, default=400, help="full-file requests per response type")
+    parser.add_argument("--concurrency", type=int, default=32, help="connections for the full-file requests")
+    parser.add_argument("--seeks", type=int, default=100, help="sequential 64KB range requests per response type")
+    parser.add_argument("--offset", type=int, default=100_000, help="byte offset the range requests start at")
+    parser.add_argument("--child", nargs=2, metavar=("DIRECTORY", "PORT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        serve(args.child[0], int(args.child[1]))
+        sys.exit(0)
+
+    from app.tts_engines import SilentEngine
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, CLIP), "wb") as f:
+            size = f.write(SilentEngine().synthesize("word " * args.words))
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        # The server gets its own process so the client does not share its event loop
+        server = subprocess.Popen(
+            [sys.executable, __file__, "--child", tmp, str(port)], cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        try:
+            results = asyncio.run(measure(f"http://127.0.0.1:{port}", args))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{size} byte clip, {args.requests} full-file requests at {args.concurrency} connections, "
+          f"64KB seeks from offset {args.offset}")
+    for route, (full_rate, seek_ms, status, length) in results.items():
+        name = "file_response" if route == "range" else "FileResponse"
+        print(f"{name:17}: full file {full_rate:6.0f} req/s | seek median {seek_ms:5.1f} ms, {status} with {length} bytes")
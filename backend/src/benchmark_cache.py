@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmark_common import SyntheticText, percentile
+
+CATEGORIES = ["Technology", "Automotive", "General"]
+MODES = {
+    "uncached": {"NEWS_CACHE_SIZE": "0"},
+    "cached": {},
+}
+
+async def run_load(articles: int, workers: int, duration: float, pages: int) -> dict:
+    """Concurrent /api/news requests for random category pages against the ASGI app"""
+    import httpx
+    from sqlalchemy import insert
+    from app.cache import news_cache
+    from app.database import init_db, get_db
+    from app.models import NewsArticle
+    import main
+
+    await init_db()
+    text = SyntheticText()
+    now = datetime.utcnow()
+    async with get_db() as db:
+        await db.execute(insert(NewsArticle), [
+            {"guid": f"article-{i}", "title": text(8).capitalize(), "description": text(40), "content": text(300),
+             "link": f"https://example.com/{i}", "category": CATEGORIES[i % len(CATEGORIES)],
+             "published_at": now - timedelta(minutes=i)}
+            for i in range(articles)
+        ])
+
+    rng = random.Random(3)
+    latencies, hits = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(client):
+        nonlocal hits
+        while time.perf_counter() < deadline:
+            params = {"limit": 30, "skip": 30 * rng.randrange(pages)}
+            category = rng.choice(CATEGORIES + [None])
+            if category:
+                params["category"] = category
+            started = time.perf_counter()
+            response = await client.get("/api/news", params=params)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+            hits += response.headers.get("X-Cache") == "HIT"
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(workers)))
+        elapsed = time.perf_counter() - started
+    return {
+        "requests_per_s": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.5),
+        "p99_ms": percentile(latencies, 0.99),
+        "hit_rate": hits / len(latencies) if latencies else 0.0,
+        "evictions": news_cache.stats()["evictions"],
+    }
+
+def run_mode(env: dict, args) -> dict:
+    """Run the load in a fresh process, since the cache is configured at import time"""
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", "--articles", str(args.articles), "--workers", str(args.workers),
+         "--duration", str(args.duration), "--pages", str(args.pages)],
+        env={**os.environ, **env}, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test /api/news with and without the response cache")
+    parser.add_argument("--articles", type=int, default=1000, help="articles seeded before the run")
+    parser.add_argument("--workers", type=int, default=16, help="concurrent request loops")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per mode")
+    parser.add_argument("--pages", type=int, default=5, help="requests pick one of the first this many pages")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(run_load(args.articles, args.workers, args.duration, args.pages))))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, env in MODES.items():
+            env = {"DATABASE_URL": f"sqlite+aiosqlite:///{tmp}/{name}.db", "TTS_ENGINE": "silent", **env}
+            try:
+                r = run_mode(env, args)
+            except RuntimeError as e:
+                print(f"{name}: failed: {e}")
+                continue
+            print(
+                f"{name:8}: {r['requests_per_s']:.0f} req/s, p50 {r['p50_ms']:.1f} ms, p99 {r['p99_ms']:.1f} ms, "
+                f"hit rate {r['hit_rate']:.1%}, {r['evictions']} evictions"
+            )
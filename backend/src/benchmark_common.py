@@ -0,0 +1,209 @@
+"""Helpers shared by the benchmark_*.py scripts and tests: synthetic text and stub feed and image servers"""
+import asyncio
+import itertools
+import random
+import time
+from typing import Iterator, List, Optional
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "ta", "shi", "po", "de", "va", "gu", "ze", "bo", "fi", "ja", "no"]
+
+def percentile(values, fraction):
+    """The given percentile of durations in seconds, in milliseconds"""
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)] * 1000 if values else 0.0
+
+def make_vocabulary(rng: random.Random, size: int = 20000, suffixes: str = "") -> List[str]:
+    """Distinct made-up words in random order, optionally ending in one of suffixes"""
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) + (rng.choice(suffixes) if suffixes else ""))
+    return sorted(sorted(words), key=lambda w: rng.random())
+
+def zipf_weights(size: int) -> List[float]:
+    """Cumulative weights for rng.choices giving the word of rank r a frequency of 1/r"""
+    return list(itertools.accumulate(1 / rank for rank in range(1, size + 1)))
+
+class SyntheticText:
+    """Zipf-distributed text over a made-up vocabulary, reproducible from the seed"""
+
+    def __init__(self, seed: int = 7, vocabulary: int = 20000):
+        self.rng = random.Random(seed)
+        self.words = make_vocabulary(self.rng, vocabulary)
+        self.cum_weights = zipf_weights(vocabulary)
+
+    def __call__(self, n: int) -> str:
+        return " ".join(self.rng.choices(self.words, cum_weights=self.cum_weights, k=n))
+
+def article_html(feed: int, i: int, text: SyntheticText, paragraphs: int = 6) -> str:
+    """A full article body as publishers put it in content:encoded: a lead image and paragraphs"""
+    body = "".join(f"<p>{text(60)} <a href=\"https://feed{feed}.example.com/{i}/{n}\">{text(3)}</a>.</p>" for n in range(paragraphs))
+    return f'<figure><img src="https://cdn.example.com/{feed}/{i}.jpg" alt="{text(4)}"><figcaption>{text(10)}</figcaption></figure>{body}'
+
+def rss_chunks(feed: int, items: int, text: SyntheticText, items_per_chunk: int = 100, content: bool = False) -> Iterator[bytes]:
+    """An RSS document of distinct ~1KB items, produced piece by piece so it is never held in full.
+
+    With content, each item also carries a full HTML body in content:encoded.
+    """
+    yield (
+        '<?xml version="1.0" encoding="utf-8"?><rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">'
+        f'<channel><title>Feed {feed}</title>'
+    ).encode()
+    for start in range(0, items, items_per_chunk):
+        yield "".join(
+            f"<item><title>{text(8).capitalize()}</title><link>https://feed{feed}.example.com/{i}</link>"
+            f"<guid>feed{feed}-{i}</guid><pubDate>Mon, 06 Jan 2025 10:{i % 60:02d}:00 GMT</pubDate>"
+            f"<description>&lt;p&gt;{text(140)}&lt;/p&gt;</description>"
+            + (f"<content:encoded><![CDATA[{article_html(feed, i, text)}]]></content:encoded>" if content else "")
+            + "</item>"
+            for i in range(start, min(start + items_per_chunk, items))
+        ).encode()
+    yield b"</channel></rss>"
+
+class StubFeedServer:
+    """Local HTTP/1.1 server answering GET /feed/{n} with a synthetic feed after a fixed latency.
+
+    Bodies are sent with chunked transfer encoding as they are generated, like
+    a large aggregator feed. Each server listens on its own port, so several
+    of them look like several hosts to per-host limits.
+    """
+
+    def __init__(self, items: int = 20, latency: float = 0.0, seed: int = 7):
+        self.items = items
+        self.latency = latency
+        self.text = SyntheticText(seed)
+        self.requests = 0
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def start(self) -> "StubFeedServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                path = request.split(b" ", 2)[1].decode()
+                self.requests += 1
+                await asyncio.sleep(self.latency)
+                if not path.startswith("/feed/"):
+                    writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+                    continue
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/rss+xml; charset=utf-8\r\n"
+                    b"Transfer-Encoding: chunked\r\n\r\n"
+                )
+                for chunk in rss_chunks(int(path.rsplit("/", 1)[1]), self.items, self.text):
+                    writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                    await writer.drain()
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+def noise_png(width: int, height: int, seed: int = 7) -> bytes:
+    """A PNG of random pixels, which barely compresses: about width * height * 3 bytes"""
+    import io
+    from PIL import Image
+
+    rng = random.Random(seed)
+    buffer = io.BytesIO()
+    Image.frombytes("RGB", (width, height), rng.randbytes(width * height * 3)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+class StubImageAPI:
+    """Local stand-in for the image generation API and the CDN serving its images.
+
+    POST /v1/images/generations answers after `latency` seconds, with a 429
+    and a Retry-After header for a `rate_limited` share of requests and a
+    503 for a `server_errors` share. Successful requests point at /images/{n},
+    which streams `image` in `piece_size` chunks and drops the connection
+    halfway through for a `truncated` share of downloads. Which attempts
+    fail depends only on the seed, the prompt and the attempt number.
+    Every request is logged as (prompt, kind, status, received_at, sent_at),
+    kind being generate, download or truncated, in time.monotonic() seconds.
+    """
+
+    def __init__(self, image: bytes, latency: float = 0.3, rate_limited: float = 0.1, server_errors: float = 0.0,
+                 truncated: float = 0.0, retry_after: float = 1.0, piece_size: int = 32 * 1024, seed: int = 7):
+        self.image = image
+        self.latency = latency
+        self.rate_limited = rate_limited
+        self.server_errors = server_errors
+        self.truncated = truncated
+        self.retry_after = retry_after
+        self.piece_size = piece_size
+        self.seed = seed
+        self.log: List[tuple] = []
+        self._attempts: dict = {}
+        self._prompts: List[str] = []
+        self._runner = None
+        self.url = None
+
+    def _roll(self, kind: str, key: str) -> float:
+        attempt = self._attempts[kind, key] = self._attempts.get((kind, key), 0) + 1
+        return random.Random(f"{self.seed}\0{kind}\0{key}\0{attempt}").random()
+
+    async def _generate(self, request):
+        from aiohttp import web
+
+        received_at = time.monotonic()
+        prompt = (await request.json())["prompt"]
+        await asyncio.sleep(self.latency)
+        roll = self._roll("generate", prompt)
+        if roll < self.rate_limited:
+            response = web.Response(status=429, headers={"Retry-After": str(self.retry_after)})
+        elif roll < self.rate_limited + self.server_errors:
+            response = web.Response(status=503)
+        else:
+            self._prompts.append(prompt)
+            response = web.json_response({"data": [{"url": f"{self.url}/images/{len(self._prompts) - 1}"}]})
+        self.log.append((prompt, "generate", response.status, received_at, time.monotonic()))
+        return response
+
+    async def _download(self, request):
+        from aiohttp import web
+
+        received_at = time.monotonic()
+        prompt = self._prompts[int(request.match_info["n"])]
+        truncate = self._roll("download", prompt) < self.truncated
+        response = web.StreamResponse(headers={"Content-Type": "image/png"})
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        end = len(self.image) // 2 if truncate else len(self.image)
+        for start in range(0, end, self.piece_size):
+            await response.write(self.image[start:min(start + self.piece_size, end)])
+        if truncate:
+            # Without the final chunk the client sees an incomplete payload
+            request.transport.close()
+        else:
+            await response.write_eof()
+        self.log.append((prompt, "truncated" if truncate else "download", 200, received_at, time.monotonic()))
+        return response
+
+    async def start(self) -> "StubImageAPI":
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_post("/v1/images/generations", self._generate)
+        app.router.add_get("/images/{n}", self._download)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = site._server.sockets[0].getsockname()[:2]
+        self.url = f"http://{host}:{port}"
+        return self
+
+    async def stop(self):
+        await self._runner.cleanup()
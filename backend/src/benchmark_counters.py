@@ -0,0 +1,119 @@
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from benchmark_common import SyntheticText, percentile
+
+def read_modify_write_app():
+    """The view/share endpoints before buffering: load the article, bump the counter, commit"""
+    from fastapi import FastAPI, HTTPException
+    from sqlalchemy import select
+    from app.database import get_db
+    from app.models import NewsArticle
+
+    app = FastAPI()
+
+    @app.post("/news/{article_id}/{counter}")
+    async def increment(article_id: int, counter: str):
+        async with get_db() as db:
+            article = (await db.execute(select(NewsArticle).filter(NewsArticle.id == article_id))).scalar_one_or_none()
+            if not article:
+                raise HTTPException(status_code=404, detail="Article not found")
+            column = "views" if counter == "view" else "shares"
+            setattr(article, column, (getattr(article, column) or 0) + 1)
+            await db.commit()
+            return {"success": True}
+
+    return app
+
+async def add_articles(count: int, text: SyntheticText) -> list:
+    from app.database import get_db
+    from app.models import NewsArticle
+
+    async with get_db() as db:
+        articles = [
+            NewsArticle(guid=f"counters-{time.time_ns()}-{i}", title=text(8).capitalize(), description=text(40),
+                        content=text(200), category="Benchmark", published_at=datetime.utcnow(), views=0, shares=0)
+            for i in range(count)
+        ]
+        db.add_all(articles)
+        await db.flush()
+        return [article.id for article in articles]
+
+async def load(app, article_ids: list, views: int, shares: int, concurrency: int) -> tuple:
+    """POST the views and shares in random order from concurrent loops; returns (seconds, latencies, errors)"""
+    import httpx
+
+    requests = [("view", i) for i in range(views)] + [("share", i) for i in range(shares)]
+    random.Random(1).shuffle(requests)
+    queue = asyncio.Queue()
+    for counter, n in requests:
+        queue.put_nowait(f"/news/{article_ids[n % len(article_ids)]}/{counter}")
+    latencies, errors = [], 0
+
+    async def worker(client):
+        nonlocal errors
+        while not queue.empty():
+            url = queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.post(url)
+            latencies.append(time.perf_counter() - started)
+            errors += response.status_code != 200
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        return time.perf_counter() - started, latencies, errors
+
+async def persisted(article_ids: list) -> tuple:
+    from sqlalchemy import func, select
+    from app.database import get_read_db
+    from app.models import NewsArticle
+
+    async with get_read_db() as db:
+        views, shares = (await db.execute(
+            select(func.sum(NewsArticle.views), func.sum(NewsArticle.shares)).where(NewsArticle.id.in_(article_ids))
+        )).one()
+    return views or 0, shares or 0
+
+async def run(args):
+    from app.counters import article_counters
+    from app.database import init_db
+    import main
+
+    await init_db()
+    text = SyntheticText()
+    print(f"{args.views} views and {args.shares} shares over {args.articles} articles at {args.concurrency} concurrent")
+    for name in ("read-modify-write", "buffered"):
+        article_ids = await add_articles(args.articles, text)
+        if name == "buffered":
+            # What the app's lifespan does around serving
+            article_counters.start()
+            try:
+                elapsed, latencies, errors = await load(main.app, article_ids, args.views, args.shares, args.concurrency)
+            finally:
+                await article_counters.stop()
+        else:
+            elapsed, latencies, errors = await load(read_modify_write_app(), article_ids, args.views, args.shares, args.concurrency)
+        views, shares = await persisted(article_ids)
+        print(
+            f"{name:17}: {len(latencies) / elapsed:5.0f} req/s, p99 {percentile(latencies, 0.99):6.1f} ms, "
+            f"{errors} errors | persisted {views}/{args.views} views, {shares}/{args.shares} shares"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput and lost updates of the view/share counter endpoints")
+    parser.add_argument("--articles", type=int, default=5, help="articles the POSTs are spread over")
+    parser.add_argument("--views", type=int, default=1000, help="view POSTs")
+    parser.add_argument("--shares", type=int, default=500, help="share POSTs")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent request loops")
+    args = parser.parse_args()
+
+    # The engine is configured from the environment at import time
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark_counters.db')}"
+    os.environ.setdefault("TTS_ENGINE", "silent")
+    asyncio.run(run(args))
@@ -0,0 +1,130 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmark_common import percentile
+
+PROFILES = {
+    "sqlite-default": {"SQLITE_PERFORMANCE_MODE": "false"},
+    "sqlite-tuned": {"SQLITE_PERFORMANCE_MODE": "true"},
+}
+
+async def run_workload(articles: int, workers: int, duration: float) -> dict:
+    """Mixed load against DATABASE_URL: listing reads, view-counter writes and a bulk ingest writer"""
+    from sqlalchemy import delete, select, update
+    from app.database import init_db, get_db
+    from app.models import NewsArticle
+
+    await init_db()
+    now = datetime.utcnow()
+    async with get_db() as db:
+        await db.execute(delete(NewsArticle))
+        db.add_all(
+            NewsArticle(guid=f"seed-{i}", title=f"Seed {i}", description="x" * 200, content="y" * 2000,
+                        category=random.choice(["tech", "business", "sports"]), published_at=now - timedelta(minutes=i),
+                        views=0, shares=0)
+            for i in range(articles)
+        )
+
+    stats = {"reads": [], "writes": [], "ingest": [], "errors": 0}
+    deadline = time.perf_counter() + duration
+
+    async def reader_writer():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                async with get_db() as db:
+                    if random.random() < 0.8:
+                        await db.execute(
+                            select(NewsArticle.id, NewsArticle.title)
+                            .where(NewsArticle.category == random.choice(["tech", "business", "sports"]))
+                            .order_by(NewsArticle.published_at.desc(), NewsArticle.id.desc())
+                            .limit(20)
+                        )
+                        kind = "reads"
+                    else:
+                        await db.execute(
+                            update(NewsArticle)
+                            .where(NewsArticle.id == random.randint(1, articles))
+                            .values(views=NewsArticle.views + 1)
+                        )
+                        kind = "writes"
+                stats[kind].append(time.perf_counter() - started)
+            except Exception:
+                stats["errors"] += 1
+
+    async def ingester():
+        batch = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                async with get_db() as db:
+                    db.add_all(
+                        NewsArticle(guid=f"ingest-{batch}-{i}", title=f"Ingest {batch} {i}", description="x" * 200,
+                                    content="y" * 2000, category="tech", published_at=datetime.utcnow())
+                        for i in range(200)
+                    )
+                stats["ingest"].append(time.perf_counter() - started)
+            except Exception:
+                stats["errors"] += 1
+            batch += 1
+
+    await asyncio.gather(ingester(), *(reader_writer() for _ in range(workers)))
+    return {
+        "reads_per_s": len(stats["reads"]) / duration,
+        "writes_per_s": len(stats["writes"]) / duration,
+        "ingest_batches_per_s": len(stats["ingest"]) / duration,
+        "read_p99_ms": percentile(stats["reads"], 0.99),
+        "write_p99_ms": percentile(stats["writes"], 0.99),
+        "errors": stats["errors"],
+    }
+
+def run_profile(name: str, env: dict, args) -> dict:
+    """Run the workload in a fresh process, since the engine is configured at import time"""
+    child_env = {**os.environ, **env}
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", "--articles", str(args.articles),
+         "--workers", str(args.workers), "--duration", str(args.duration)],
+        env=child_env, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare mixed read/write throughput across database profiles")
+    parser.add_argument("--articles", type=int, default=5000, help="articles seeded before the run")
+    parser.add_argument("--workers", type=int, default=16, help="concurrent request loops")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per profile")
+    parser.add_argument("--postgres-url", default=os.getenv("BENCHMARK_POSTGRES_URL"), help="also run against this database")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(run_workload(args.articles, args.workers, args.duration))))
+        sys.exit(0)
+
+    profiles = dict(PROFILES)
+    if args.postgres_url:
+        profiles["postgres"] = {"DATABASE_URL": args.postgres_url}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, env in profiles.items():
+            env = {"DATABASE_URL": f"sqlite+aiosqlite:///{tmp}/{name}.db", **env}
+            try:
+                r = run_profile(name, env, args)
+            except RuntimeError as e:
+                print(f"{name}: failed: {e}")
+                continue
+            print(
+                f"{name}: {r['reads_per_s']:.0f} reads/s (p99 {r['read_p99_ms']:.0f} ms), "
+                f"{r['writes_per_s']:.0f} writes/s (p99 {r['write_p99_ms']:.0f} ms), "
+                f"{r['ingest_batches_per_s']:.1f} ingest batches/s, {r['errors']} errors"
+            )
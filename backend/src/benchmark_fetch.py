@@ -0,0 +1,60 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmark_common import StubFeedServer
+
+async def cycle(servers: list, feeds: int, sequential: bool) -> float:
+    """One fetch_all over feeds spread round-robin across the stub hosts; returns seconds"""
+    from app.database import engine
+    from app.feed_fetcher import FeedFetcher
+    from app.models import Base
+
+    async with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            await conn.execute(table.delete())
+
+    fetcher = FeedFetcher()
+    fetcher.RSS_FEEDS = [
+        {"url": f"{servers[n % len(servers)].url}/feed/{n}", "category": "Benchmark"}
+        for n in range(feeds)
+    ]
+    if sequential:
+        # One feed at a time, as before feeds were fetched concurrently
+        fetcher._semaphore = asyncio.Semaphore(1)
+    started = time.perf_counter()
+    await fetcher.fetch_all()
+    return time.perf_counter() - started
+
+async def run(args):
+    from app.config import RSS_FETCH_CONCURRENCY, RSS_FETCH_PER_HOST
+    from app.database import init_db
+
+    await init_db()
+    servers = [await StubFeedServer(args.items, args.latency).start() for _ in range(args.hosts)]
+    print(
+        f"{args.hosts} host(s), {args.latency}s latency, {args.items} items per feed, "
+        f"concurrency {RSS_FETCH_CONCURRENCY}, per host {RSS_FETCH_PER_HOST}"
+    )
+    try:
+        for feeds in args.feeds:
+            sequential = await cycle(servers, feeds, sequential=True)
+            concurrent = await cycle(servers, feeds, sequential=False)
+            print(f"{feeds:4} feeds: sequential {sequential:6.2f}s | concurrent {concurrent:6.2f}s | {sequential / concurrent:4.1f}x")
+    finally:
+        for server in servers:
+            await server.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure fetch cycle time against feed count on local stub feed servers")
+    parser.add_argument("--feeds", type=int, nargs="+", default=[5, 10, 20, 40], help="feed counts to run")
+    parser.add_argument("--hosts", type=int, default=1, help="stub servers the feeds are spread over")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds before each response starts")
+    parser.add_argument("--items", type=int, default=20, help="entries per feed")
+    args = parser.parse_args()
+
+    # The engine is configured from the environment at import time
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark_fetch.db')}"
+    asyncio.run(run(args))
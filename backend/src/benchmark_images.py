@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmark_common import StubImageAPI, noise_png
+
+async def run(args):
+    import generate_db_from_json
+
+    if args.skip_derivatives:
+        # Derivatives cost ~0.3s of CPU per image here, which hides the network stage on few cores
+        generate_db_from_json.create_derivatives = lambda img_dir, filename: None
+
+    # A ~300KB PNG, so derivatives are built from a real image
+    api = await StubImageAPI(
+        noise_png(320, 320), latency=args.latency, rate_limited=args.rate_limited,
+        retry_after=args.retry_after, piece_size=32 * 1024
+    ).start()
+    generate_db_from_json.OPENAI_API_ENDPOINT = f"{api.url}/v1/images/generations"
+    print(f"{len(api.image)} byte images, {args.latency}s per generation, "
+          f"{args.rate_limited:.0%} of requests answered 429 with Retry-After {args.retry_after}s")
+    try:
+        for concurrency in args.concurrency:
+            output_dir = tempfile.mkdtemp(dir=os.getcwd())
+            prompts = [f"Article {n} at concurrency {concurrency}" for n in range(args.articles)]
+            api.log.clear()
+            started = time.perf_counter()
+            paths = await generate_db_from_json.generate_images(prompts, output_dir, concurrency, args.rate)
+            elapsed = time.perf_counter() - started
+            complete = sum(
+                1 for path in paths
+                if path and os.path.getsize(os.path.join(output_dir, os.path.basename(path))) == len(api.image)
+            )
+            limited = sum(1 for _, kind, status, _, _ in api.log if status == 429)
+            print(f"concurrency {concurrency:3}: {len(prompts) / elapsed * 60:6.0f} articles/min, "
+                  f"{complete}/{len(prompts)} images complete, {limited} rate-limited requests retried")
+    finally:
+        await api.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Articles per minute of the JSON import's image stage against a stub image API")
+    parser.add_argument("--articles", type=int, default=40, help="images generated per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per generation request")
+    parser.add_argument("--rate-limited", type=float, default=0.1, help="share of requests answered 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of those answers, in seconds")
+    parser.add_argument("--skip-derivatives", action="store_true", help="measure only generation and download")
+    parser.add_argument("--rate", type=float, default=100_000, help="client token bucket in requests per minute")
+    args = parser.parse_args()
+
+    # The script reads its key and creates img/ in the working directory on import
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.chdir(tempfile.mkdtemp())
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(os.getcwd(), 'benchmark_images.db')}"
+    asyncio.run(run(args))
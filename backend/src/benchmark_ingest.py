@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmark_common import SyntheticText
+
+def make_rows(prefix: str, count: int, text: SyntheticText, now: datetime) -> list:
+    return [
+        {"guid": f"{prefix}-{i}", "title": text(8).capitalize(), "description": text(40), "content": text(200),
+         "link": f"https://example.com/{prefix}/{i}", "image_url": None, "category": "Benchmark",
+         "published_at": now - timedelta(minutes=i), "fingerprint": None}
+        for i in range(count)
+    ]
+
+async def persist_per_entry(feed_info: dict, rows: list) -> tuple:
+    """The ingest before bulk inserts: one guid lookup and one ORM add per entry"""
+    from sqlalchemy import select
+    from app.database import get_db
+    from app.models import NewsArticle
+
+    inserted = 0
+    async with get_db() as db:
+        for row in rows:
+            existing = await db.execute(select(NewsArticle).where(NewsArticle.guid == row["guid"]))
+            if existing.scalar_one_or_none():
+                continue
+            db.add(NewsArticle(**{k: v for k, v in row.items() if k != "fingerprint"}))
+            inserted += 1
+    return inserted, 0, len(rows) - inserted
+
+async def run(args):
+    from sqlalchemy import func, insert, select
+    from app.config import NEAR_DUPLICATES
+    from app.database import init_db, get_db, get_read_db
+    from app.feed_fetcher import FeedFetcher
+    from app.models import NewsArticle
+    from app.near_duplicates import fingerprint
+
+    text = SyntheticText()
+    now = datetime.utcnow()
+    await init_db()
+    stored = make_rows("stored", args.existing, text, now)
+    for start in range(0, len(stored), 5000):
+        async with get_db() as db:
+            await db.execute(insert(NewsArticle), [
+                {k: v for k, v in row.items() if k != "fingerprint"} for row in stored[start:start + 5000]
+            ])
+    print(f"{args.existing} articles stored, {args.entries} entries per run in feeds of {args.feed_size}, "
+          f"{args.overlap:.0%} already stored")
+
+    fetcher = FeedFetcher()
+    repeats = int(args.entries * args.overlap)
+    for name, persist in (("per-entry", persist_per_entry), ("bulk", None)):
+        # Fresh guids for every run, so each one inserts the same number of rows
+        entries = stored[:repeats] + make_rows(name, args.entries - repeats, text, now)
+        entries = [
+            dict(row, fingerprint=fingerprint(row["title"], row["content"]) if NEAR_DUPLICATES and not persist else None)
+            for row in entries
+        ]
+        inserted = skipped = 0
+        started = time.perf_counter()
+        for start in range(0, len(entries), args.feed_size):
+            feed_info = {"url": f"https://example.com/{name}/{start}", "category": "Benchmark"}
+            batch = entries[start:start + args.feed_size]
+            if persist:
+                counts = await persist(feed_info, batch)
+            else:
+                counts = await fetcher.persist_feed(feed_info, None, None, batch, len(batch))
+            inserted += counts[0]
+            skipped += counts[2]
+        elapsed = time.perf_counter() - started
+        print(f"{name:9}: {len(entries) / elapsed:7.0f} entries/s ({elapsed:.2f}s), {inserted} inserted, {skipped} skipped")
+    await fetcher.client.aclose()
+
+    async with get_read_db() as db:
+        total = (await db.execute(select(func.count(NewsArticle.id)))).scalar()
+    print(f"{total} articles stored afterwards", file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure persisting feed entries into a populated news_articles table")
+    parser.add_argument("--existing", type=int, default=100_000, help="articles stored before the runs")
+    parser.add_argument("--entries", type=int, default=10_000, help="entries persisted per run")
+    parser.add_argument("--overlap", type=float, default=0.5, help="share of entries whose guid is already stored")
+    parser.add_argument("--feed-size", type=int, default=100, help="entries per feed")
+    parser.add_argument("--near-duplicates", action="store_true", help="also run near-duplicate detection on the bulk path")
+    args = parser.parse_args()
+
+    # The engine and ingest options are configured from the environment at import time
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark_ingest.db')}"
+    os.environ["NEAR_DUPLICATES"] = "true" if args.near_duplicates else "false"
+    asyncio.run(run(args))
@@ -0,0 +1,174 @@
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from benchmark_common import make_vocabulary, zipf_weights
+
+BOILERPLATE = ["LONDON (Reuters) -", "(AP) —", "BERLIN, dpa -", "Updated:", "Read more on our website.", "Advertisement"]
+
+class Corpus:
+    """Synthetic wire stories and the copies feeds make of them.
+
+    Copies get an edited headline, an outlet prefix, a few substituted
+    words and a body truncated at a random length, like summary-only
+    feeds. Some stories only have a short summary to begin with.
+    Follow-ups reuse a story's headline pattern and part of its lead, and
+    templated entries share all but a number and a few words; both are
+    different articles, so they must not be flagged.
+    """
+
+    def __init__(self, seed: int = 11, vocabulary: int = 20000):
+        self.rng = random.Random(seed)
+        self.words = make_vocabulary(self.rng, vocabulary)
+        self.cum_weights = zipf_weights(vocabulary)
+
+    def text(self, n: int) -> list:
+        return self.rng.choices(self.words, cum_weights=self.cum_weights, k=n)
+
+    def story(self, short: bool = False) -> dict:
+        length = self.rng.randint(10, 30) if short else self.rng.randint(150, 400)
+        return {"title": self.text(self.rng.randint(6, 12)), "content": self.text(length)}
+
+    def copy(self, story: dict) -> dict:
+        rng = self.rng
+        title = list(story["title"])
+        for _ in range(rng.randint(0, 2)):
+            title[rng.randrange(len(title))] = self.text(1)[0]
+        content = list(story["content"][:rng.randint(min(40, len(story["content"])), len(story["content"]))])
+        for i in rng.sample(range(len(content)), k=len(content) // 30):
+            content[i] = self.text(1)[0]
+        if rng.random() < 0.5:
+            content = rng.choice(BOILERPLATE).split() + content
+        return {"title": title, "content": content}
+
+    def follow_up(self, story: dict) -> dict:
+        shared = self.rng.randint(20, 60)
+        title = story["title"][:len(story["title"]) // 2] + self.text(len(story["title"]) // 2 + 1)
+        return {"title": title, "content": story["content"][:shared] + self.text(self.rng.randint(150, 400))}
+
+    def templated(self, number: int) -> dict:
+        """A short entry from a feed that fills the same template for every item"""
+        return {
+            "title": f"Streamed {number} headline number".split(),
+            "content": f"unique body text number {number} with words".split() + self.text(self.rng.randint(3, 8)),
+        }
+
+    def generate(self, stories: int, max_copies: int, follow_up_rate: float, short_rate: float, templated: int) -> list:
+        """(cluster, article) pairs in ingest order; copies and follow-ups arrive after their story"""
+        items = []
+        for number in range(templated):
+            items.append((f"templated-{number}", self.templated(number)))
+        for cluster in range(stories):
+            story = self.story(short=self.rng.random() < short_rate)
+            arrivals = [(cluster, story)] + [(cluster, self.copy(story)) for _ in range(self.rng.randint(0, max_copies))]
+            if self.rng.random() < follow_up_rate:
+                arrivals.append((f"{cluster}-follow-up", self.follow_up(story)))
+            position = self.rng.randint(max(0, len(items) - 200), len(items))
+            for offset, arrival in enumerate(arrivals):
+                items.insert(min(position + offset * self.rng.randint(1, 20), len(items)), arrival)
+        return [(cluster, {"title": " ".join(a["title"]).capitalize(), "content": " ".join(a["content"])})
+                for cluster, a in items]
+
+def evaluate(items: list, threshold: float):
+    """Run the corpus through the index in ingest order and score the decisions"""
+    from app.near_duplicates import NearDuplicateIndex, fingerprint
+
+    index = NearDuplicateIndex(threshold=threshold)
+    stored_cluster = {}
+    seen_clusters = set()
+    true_positives = false_positives = false_negatives = 0
+    fingerprint_seconds = match_seconds = 0.0
+    for article_id, (cluster, article) in enumerate(items, 1):
+        started = time.perf_counter()
+        fp = fingerprint(article["title"], article["content"])
+        fingerprint_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        found = index.find(fp) if fp else None
+        if fp and not found:
+            index.add(article_id, fp)
+        match_seconds += time.perf_counter() - started
+
+        if found:
+            if stored_cluster[found[0]] == cluster:
+                true_positives += 1
+            else:
+                false_positives += 1
+        else:
+            stored_cluster[article_id] = cluster
+            if cluster in seen_clusters:
+                false_negatives += 1
+        seen_clusters.add(cluster)
+
+    flagged = true_positives + false_positives
+    copies = true_positives + false_negatives
+    return {
+        "precision": true_positives / flagged if flagged else 1.0,
+        "recall": true_positives / copies if copies else 1.0,
+        "false_positives": false_positives,
+        "false_negatives": false_negatives,
+        "fingerprints_per_s": len(items) / fingerprint_seconds,
+        "lookups_per_s": len(items) / match_seconds,
+        "indexed": len(index),
+    }
+
+async def ingest(items: list, feed_size: int) -> dict:
+    """Persist the corpus feed by feed through FeedFetcher.persist_feed on a scratch database"""
+    from sqlalchemy import func, select
+    from app.database import init_db, get_db
+    from app.feed_fetcher import FeedFetcher
+    from app.models import ArticleDuplicate, NewsArticle
+    from app.near_duplicates import fingerprint
+
+    await init_db()
+    fetcher = FeedFetcher()
+    rows = [
+        {"guid": f"item-{i}", "title": article["title"], "description": article["content"][:200],
+         "content": article["content"], "link": f"https://example.com/{i}", "image_url": None,
+         "category": "bench", "published_at": datetime.utcnow(),
+         "fingerprint": fingerprint(article["title"], article["content"])}
+        for i, (_, article) in enumerate(items)
+    ]
+    started = time.perf_counter()
+    for start in range(0, len(rows), feed_size):
+        batch = rows[start:start + feed_size]
+        await fetcher.persist_feed({"url": "bench"}, None, None, batch, len(batch))
+    elapsed = time.perf_counter() - started
+    await fetcher.client.aclose()
+    async with get_db() as db:
+        articles = (await db.execute(select(func.count(NewsArticle.id)))).scalar()
+        duplicates = (await db.execute(select(func.count(ArticleDuplicate.id)))).scalar()
+    return {"rows_per_s": len(rows) / elapsed, "articles": articles, "duplicates": duplicates}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precision, recall and throughput of near-duplicate detection on a synthetic corpus")
+    parser.add_argument("--stories", type=int, default=5000, help="distinct stories")
+    parser.add_argument("--max-copies", type=int, default=4, help="copies per story from other feeds, 0 to this")
+    parser.add_argument("--follow-ups", type=float, default=0.3, help="share of stories with a related but distinct follow-up")
+    parser.add_argument("--short", type=float, default=0.2, help="share of stories that only have a 10-30 word summary")
+    parser.add_argument("--templated", type=int, default=1200, help="distinct short entries filled into one template")
+    parser.add_argument("--thresholds", type=float, nargs="*", default=[0.3, 0.4, 0.5, 0.6, 0.7])
+    parser.add_argument("--ingest", action="store_true", help="also persist the corpus through FeedFetcher on a scratch database")
+    parser.add_argument("--feed-size", type=int, default=50, help="entries per persisted feed with --ingest")
+    args = parser.parse_args()
+    # The engine is configured from the environment at import time
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/near_duplicates.db"
+
+    items = Corpus().generate(args.stories, args.max_copies, args.follow_ups, args.short, args.templated)
+    clusters = len({cluster for cluster, _ in items})
+    print(f"{len(items)} articles, {clusters} distinct, {len(items) - clusters} copies")
+    for threshold in args.thresholds:
+        r = evaluate(items, threshold)
+        print(
+            f"threshold {threshold:.2f}: precision {r['precision']:.3f}, recall {r['recall']:.3f} "
+            f"({r['false_positives']} false positives, {r['false_negatives']} missed), "
+            f"{r['fingerprints_per_s']:.0f} fingerprints/s, {r['lookups_per_s']:.0f} lookups/s over {r['indexed']} indexed"
+        )
+
+    if args.ingest:
+        r = asyncio.run(ingest(items, args.feed_size))
+        print(f"ingest: {r['rows_per_s']:.0f} entries/s, {r['articles']} articles and {r['duplicates']} duplicates stored")
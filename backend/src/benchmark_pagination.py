@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmark_common import SyntheticText, percentile
+
+CATEGORIES = ["Technology", "Automotive", "General", "Science", "Business"]
+
+async def seed(count: int, batch_size: int = 5000) -> float:
+    """Insert synthetic articles one minute apart, categories round-robin; returns articles/s"""
+    from sqlalchemy import insert
+    from app.database import get_db
+    from app.models import NewsArticle
+
+    text = SyntheticText()
+    now = datetime.utcnow()
+    started = time.perf_counter()
+    for start in range(0, count, batch_size):
+        rows = []
+        for i in range(start, min(start + batch_size, count)):
+            description = text(30)
+            rows.append({
+                "guid": f"article-{i}", "title": text(8).capitalize(), "description": description,
+                "content": description, "link": f"https://example.com/{i}",
+                "category": CATEGORIES[i % len(CATEGORIES)], "published_at": now - timedelta(minutes=i),
+            })
+        async with get_db() as db:
+            await db.execute(insert(NewsArticle), rows)
+        if start and start % (batch_size * 20) == 0:
+            print(f"  seeded {start}", file=sys.stderr)
+    return count / (time.perf_counter() - started)
+
+async def cursor_before(page: int, limit: int, category: str = None) -> str:
+    """The cursor the previous page's X-Next-Cursor header would carry"""
+    from sqlalchemy import select
+    from app.database import get_read_db
+    from app.models import NewsArticle
+    from app.pagination import encode_cursor
+
+    query = select(NewsArticle)
+    if category:
+        query = query.where(NewsArticle.category == category)
+    query = query.order_by(NewsArticle.published_at.desc(), NewsArticle.id.desc()) \
+                 .offset((page - 1) * limit - 1).limit(1)
+    async with get_read_db() as db:
+        return encode_cursor((await db.execute(query)).scalar_one())
+
+async def run(args):
+    import httpx
+    from sqlalchemy import func, select
+    from app.database import init_db, get_read_db
+    from app.models import NewsArticle
+    import main
+
+    await init_db()
+    async with get_read_db() as db:
+        existing = (await db.execute(select(func.count(NewsArticle.id)))).scalar()
+    if existing < args.articles:
+        rate = await seed(args.articles - existing)
+        print(f"seeded {args.articles - existing} articles at {rate:.0f}/s")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        for category in (None, CATEGORIES[0]):
+            base = {"limit": args.limit, "view": args.view, **({"category": category} if category else {})}
+            variants = {
+                "offset": {**base, "skip": (args.page - 1) * args.limit},
+                "cursor": {**base, "cursor": await cursor_before(args.page, args.limit, category)},
+            }
+            results = {}
+            for name, params in variants.items():
+                timings, ids = [], None
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    response = await client.get("/api/news", params=params)
+                    timings.append(time.perf_counter() - started)
+                    response.raise_for_status()
+                    ids = [article["id"] for article in response.json()]
+                results[name] = (timings, ids)
+            same = results["offset"][1] == results["cursor"][1]
+            print(
+                f"{category or 'all':10} page {args.page}: "
+                + " | ".join(f"{name} p50 {percentile(t, 0.5):6.1f} ms p99 {percentile(t, 0.99):6.1f} ms" for name, (t, _) in results.items())
+                + ("" if same else " | pages differ!")
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare offset and cursor paging latency deep into /api/news")
+    parser.add_argument("--articles", type=int, default=1_000_000, help="table size (seeded once, reused after)")
+    parser.add_argument("--database", default=os.path.join(tempfile.gettempdir(), "benchmark_pagination.db"),
+                        help="SQLite file to use")
+    parser.add_argument("--page", type=int, default=1000, help="page to fetch")
+    parser.add_argument("--limit", type=int, default=30, help="articles per page")
+    parser.add_argument("--view", default="full", choices=["full", "summary"])
+    parser.add_argument("--repeat", type=int, default=50, help="requests per variant")
+    args = parser.parse_args()
+
+    # Configured from the environment at import time; the response cache is off
+    # so every request reaches the database
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{args.database}"
+    os.environ["NEWS_CACHE_SIZE"] = "0"
+    os.environ.setdefault("TTS_ENGINE", "silent")
+    asyncio.run(run(args))
@@ -0,0 +1,88 @@
+import argparse
+import os
+import time
+from datetime import datetime
+
+from benchmark_common import SyntheticText, rss_chunks
+
+def entry_to_row_before(entry, category: str) -> dict:
+    """Entry processing before single-pass parsing: up to four html.parser soups and dateutil dates"""
+    from bs4 import BeautifulSoup
+    from dateutil.parser import parse as parse_date
+
+    clean_html = lambda html: BeautifulSoup(html, "html.parser").get_text(separator=" ", strip=True)
+
+    def extract_image_url():
+        if hasattr(entry, "media_content"):
+            for media in entry.media_content:
+                if media.get("type", "").startswith("image/"):
+                    return media["url"]
+        for html in [content["value"] for content in entry.get("content", []) if "value" in content] + [entry.get("description")]:
+            img = BeautifulSoup(html, "html.parser").find("img") if html else None
+            if img and img.get("src"):
+                return img["src"]
+        return None
+
+    content = entry.get("content", [{}])[0].get("value") or entry.get("description", "")
+    description = entry.get("summary", "") or entry.get("description", "")
+    published = entry.get("published") or entry.get("updated")
+    return {
+        "guid": entry.get("id") or entry.get("link"),
+        "title": entry.get("title"),
+        "description": clean_html(description),
+        "content": clean_html(content),
+        "link": entry.get("link"),
+        "image_url": extract_image_url(),
+        "category": category,
+        "published_at": parse_date(published) if published else datetime.utcnow(),
+    }
+
+def rate(process, entries: list, repeat: int) -> float:
+    """Best entries/s over `repeat` passes of process over all entries"""
+    best = 0.0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for entry in entries:
+            process(entry, "Benchmark")
+        best = max(best, len(entries) / (time.perf_counter() - started))
+    return best
+
+def run(args):
+    import feedparser
+    from bs4 import BeautifulSoup, FeatureNotFound
+    from app import feed_fetcher
+    from app.feed_fetcher import FeedFetcher
+
+    body = b"".join(rss_chunks(0, args.entries, SyntheticText(), content=True))
+    entries = feedparser.parse(body).entries
+    print(f"{len(entries)} entries with content:encoded bodies, {len(body) // 1024} KB feed, best of {args.repeat}")
+
+    variants = [("before", entry_to_row_before, None)]
+    for parser in ("html.parser", "lxml"):
+        try:
+            BeautifulSoup("", parser)
+        except FeatureNotFound:
+            print(f"after, {parser}: not installed")
+            continue
+        variants.append((f"after, {parser}", FeedFetcher.entry_to_row, parser))
+
+    fields = ("guid", "title", "description", "content", "image_url")
+    expected = None
+    for name, process, parser in variants:
+        if parser:
+            # parse_html reads the module's choice at call time
+            feed_fetcher.HTML_PARSER = parser
+        rows = [tuple(row[field] for field in fields) for row in (process(entry, "Benchmark") for entry in entries)]
+        expected = expected or rows
+        print(f"{name:18}: {rate(process, entries, args.repeat):5.0f} entries/s" + ("" if rows == expected else " | rows differ!"))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entries per second turning parsed feed entries into article rows")
+    parser.add_argument("--entries", type=int, default=200, help="entries in the synthetic feed")
+    parser.add_argument("--repeat", type=int, default=5, help="passes per variant")
+    parser.add_argument("--near-duplicates", action="store_true", help="include the near-duplicate fingerprint in each row")
+    args = parser.parse_args()
+
+    # Read at import time; fingerprints came later than single-pass parsing, so they are off by default
+    os.environ["NEAR_DUPLICATES"] = "true" if args.near_duplicates else "false"
+    run(args)
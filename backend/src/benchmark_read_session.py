@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmark_common import SyntheticText, percentile
+
+async def seed(count: int):
+    from sqlalchemy import insert
+    from app.database import get_db
+    from app.models import NewsArticle
+
+    text = SyntheticText()
+    now = datetime.utcnow()
+    async with get_db() as db:
+        await db.execute(insert(NewsArticle), [
+            {"guid": f"article-{i}", "title": text(8).capitalize(), "description": text(40), "content": text(300),
+             "link": f"https://example.com/{i}", "category": "Technology", "published_at": now - timedelta(minutes=i)}
+            for i in range(count)
+        ])
+
+async def measure(client, urls: list) -> tuple:
+    """Request the urls one after another; returns (req/s, latencies)"""
+    latencies = []
+    started = time.perf_counter()
+    for url in urls:
+        request_started = time.perf_counter()
+        response = await client.get(url)
+        latencies.append(time.perf_counter() - request_started)
+        response.raise_for_status()
+    return len(urls) / (time.perf_counter() - started), latencies
+
+async def run(args):
+    import httpx
+    from app import database
+    from app.database import init_db
+    import main
+
+    await init_db()
+    await seed(args.articles)
+    rng = random.Random(5)
+    endpoints = {
+        "GET /news/{id}": [f"/news/{rng.randint(1, args.articles)}" for _ in range(args.requests)],
+        "GET /api/news?view=summary": [
+            f"/api/news?view=summary&limit=30&skip={30 * rng.randrange(args.articles // 30)}" for _ in range(args.requests)
+        ],
+    }
+    print(f"{args.articles} articles, {args.requests} sequential requests per endpoint and session, response cache off")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        for label, urls in endpoints.items():
+            results = {}
+            # The endpoints look get_read_db up in main, so swapping it there serves them from get_db
+            for name, session in (("get_db", database.get_db), ("get_read_db", database.get_read_db)):
+                main.get_read_db = session
+                await measure(client, urls[:args.requests // 10])  # warm up pools and caches
+                results[name] = await measure(client, urls)
+            main.get_read_db = database.get_read_db
+            print(f"{label:27} " + " | ".join(
+                f"{name}: {rate:4.0f} req/s, p50 {percentile(latencies, 0.5):4.1f} ms, p99 {percentile(latencies, 0.99):5.1f} ms"
+                for name, (rate, latencies) in results.items()
+            ))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare GET latency with the read/write session and the read-only session")
+    parser.add_argument("--articles", type=int, default=2000, help="articles seeded before the run")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per endpoint and session")
+    args = parser.parse_args()
+
+    # Configured from the environment at import time; the response cache is off
+    # so every request reaches the database
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark_read_session.db')}"
+    os.environ["NEWS_CACHE_SIZE"] = "0"
+    os.environ.setdefault("TTS_ENGINE", "silent")
+    asyncio.run(run(args))
@@ -0,0 +1,93 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmark_common import make_vocabulary, percentile, zipf_weights
+
+VOCABULARY = 20000
+
+async def seed(count: int, rng: random.Random, words: list, batch_size: int = 5000) -> float:
+    """Insert synthetic articles with Zipf-distributed words; returns articles/s with the index maintained"""
+    from sqlalchemy import insert
+    from app.database import get_db
+    from app.models import NewsArticle
+
+    cum_weights = zipf_weights(len(words))
+    text = lambda n: " ".join(rng.choices(words, cum_weights=cum_weights, k=n))
+    now = datetime.utcnow()
+    started = time.perf_counter()
+    for start in range(0, count, batch_size):
+        rows = [
+            {"guid": f"bench-{i}", "title": text(8).capitalize(), "description": text(30), "content": text(150),
+             "category": rng.choice(["tech", "business", "sports", "world"]),
+             "published_at": now - timedelta(minutes=i), "views": 0, "shares": 0}
+            for i in range(start, min(start + batch_size, count))
+        ]
+        async with get_db() as db:
+            await db.execute(insert(NewsArticle), rows)
+        if start and start % (batch_size * 20) == 0:
+            print(f"  seeded {start}", file=sys.stderr)
+    return count / (time.perf_counter() - started)
+
+async def run(args):
+    from sqlalchemy import func, select
+    from app.database import init_db, get_read_db
+    from app.models import NewsArticle
+    from app.search import search_articles
+
+    rng = random.Random(7)
+    words = make_vocabulary(rng, VOCABULARY, suffixes="xqz")
+    await init_db()
+    async with get_read_db() as db:
+        existing = (await db.execute(select(func.count(NewsArticle.id)))).scalar()
+    if existing < args.articles:
+        rate = await seed(args.articles - existing, rng, words)
+        print(f"seeded {args.articles - existing} articles at {rate:.0f}/s with the search index maintained")
+
+    queries = {
+        "common word": words[3],
+        "mid word": words[300],
+        "rare word": words[15000],
+        "two words": f"{words[40]} {words[900]}",
+        "phrase": f'"{words[10]} {words[20]}"',
+        "no match": "zzzzzz",
+    }
+    for label, q in queries.items():
+        first, deep, hits = [], [], 0
+        for _ in range(args.repeat):
+            async with get_read_db() as db:
+                started = time.perf_counter()
+                rows, cursor = await search_articles(db, q, args.limit)
+                first.append(time.perf_counter() - started)
+                hits = len(rows)
+                for _ in range(args.pages - 1):
+                    if not cursor:
+                        break
+                    started = time.perf_counter()
+                    rows, cursor = await search_articles(db, q, args.limit, cursor)
+                    deep.append(time.perf_counter() - started)
+        print(
+            f"{label:12} {q!r:28} first page p50 {percentile(first, 0.5):7.1f} ms p99 {percentile(first, 0.99):7.1f} ms"
+            + (f" | later pages p50 {percentile(deep, 0.5):7.1f} ms" if deep else "")
+            + f" | {hits} results"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure /api/news/search query latency on a synthetic corpus")
+    parser.add_argument("--articles", type=int, default=1_000_000, help="corpus size (seeded once, reused after)")
+    parser.add_argument("--database", default=os.path.join(tempfile.gettempdir(), "benchmark_search.db"),
+                        help="SQLite file to use, ignored with --postgres-url")
+    parser.add_argument("--postgres-url", default=os.getenv("BENCHMARK_POSTGRES_URL"), help="benchmark this database instead")
+    parser.add_argument("--limit", type=int, default=20, help="results per page")
+    parser.add_argument("--pages", type=int, default=5, help="pages fetched per query via the cursor")
+    parser.add_argument("--repeat", type=int, default=10, help="runs per query")
+    args = parser.parse_args()
+
+    # The engine is configured from the environment at import time
+    os.environ["DATABASE_URL"] = args.postgres_url or f"sqlite+aiosqlite:///{args.database}"
+    asyncio.run(run(args))
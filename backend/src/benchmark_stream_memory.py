@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from benchmark_common import StubFeedServer
+
+async def ingest(url: str, stream: bool) -> dict:
+    """Ingest one feed in this process and report peak RSS of it and its parse workers"""
+    from sqlalchemy import func, select
+    from app.database import init_db, get_read_db
+    from app.feed_fetcher import FeedFetcher
+    from app.models import NewsArticle
+
+    await init_db()
+    fetcher = FeedFetcher()
+    fetcher.RSS_FEEDS = [{"url": url, "category": "Benchmark", "stream": stream}]
+    started = time.perf_counter()
+    await fetcher.fetch_all()
+    elapsed = time.perf_counter() - started
+    async with get_read_db() as db:
+        stored = (await db.execute(select(func.count(NewsArticle.id)))).scalar()
+    # ru_maxrss is in KiB on Linux; the pool's workers have exited and been reaped by now
+    return {
+        "seconds": elapsed,
+        "stored": stored,
+        "parent_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "workers_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+
+async def run_mode(url: str, stream: bool, tmp: str) -> dict:
+    """Run the ingest in a fresh process, so peak RSS covers only this mode"""
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite+aiosqlite:///{tmp}/{'streamed' if stream else 'buffered'}.db",
+        "NEAR_DUPLICATES": "false",
+        # SQLite's own defaults, so the page cache and mapped file do not grow with the table
+        "SQLITE_MMAP_SIZE": "0",
+        "SQLITE_CACHE_SIZE": "-2000",
+    }
+    child = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.abspath(__file__), "--child", url, *(["--stream"] if stream else []),
+        env=env, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    stdout, stderr = await child.communicate()
+    if child.returncode != 0:
+        raise RuntimeError(stderr.decode().strip().splitlines()[-1] if stderr else "failed")
+    return json.loads(stdout.decode().strip().splitlines()[-1])
+
+async def run(args):
+    # The server runs here, not in the measured process
+    server = await StubFeedServer(items=args.items).start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for stream in (True, False):
+                r = await run_mode(f"{server.url}/feed/0", stream, tmp)
+                print(
+                    f"{args.items} items {'streamed' if stream else 'buffered'}: peak RSS parent {r['parent_mb']:.0f} MB, "
+                    f"parse workers {r['workers_mb']:.0f} MB, {r['stored']} stored in {r['seconds']:.1f}s"
+                )
+    finally:
+        await server.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare peak memory of streamed and buffered ingestion of one large feed")
+    parser.add_argument("--items", type=int, default=50_000, help="~1KB entries in the feed")
+    parser.add_argument("--child", metavar="URL", help=argparse.SUPPRESS)
+    parser.add_argument("--stream", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(ingest(args.child, args.stream))))
+        sys.exit(0)
+    asyncio.run(run(args))
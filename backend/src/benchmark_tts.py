@@ -0,0 +1,50 @@
+import argparse
+import resource
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.mp3_info import parse_mp3_info
+from app.tts_engines import ENGINES, get_engine
+
+SAMPLE_TEXT = (
+    "Markets opened higher on Monday after a week of volatile trading. "
+    "Analysts expect the central bank to hold rates steady at its next meeting. "
+    "Meanwhile, technology shares led the gains as investors returned to growth stocks."
+)
+
+def cpu_seconds() -> float:
+    """CPU time of this process and its finished children, so subprocess engines are counted too"""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+def benchmark(name: str, clips: int, concurrency: int = 0):
+    """Synthesize `clips` texts on an engine's pool, in its batch size, and report throughput"""
+    engine = get_engine(name)
+    workers = concurrency or engine.concurrency
+    texts = [f"Story {i}. {SAMPLE_TEXT}" for i in range(clips)]
+    batches = [texts[i:i + engine.batch_size] for i in range(0, clips, engine.batch_size)]
+
+    started, cpu_started = time.perf_counter(), cpu_seconds()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        outputs = [data for batch in pool.map(engine.synthesize_batch, batches) for data in batch]
+    elapsed, cpu = time.perf_counter() - started, cpu_seconds() - cpu_started
+
+    audio_seconds = sum(info.duration for info in map(parse_mp3_info, outputs) if info)
+    print(
+        f"{name}: {clips} clips, {workers} workers, batch {engine.batch_size}: "
+        f"{clips / elapsed:.1f} clips/s, {audio_seconds / elapsed:.1f} s audio/s, "
+        f"{audio_seconds / cpu if cpu else float('inf'):.1f} s audio per CPU-second"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure TTS engine throughput to size the audio workers")
+    parser.add_argument("engines", nargs="*", default=list(ENGINES), help="engines to run (default: all)")
+    parser.add_argument("--clips", type=int, default=50, help="texts to synthesize per engine")
+    parser.add_argument("--concurrency", type=int, default=0, help="override the engine's concurrency")
+    args = parser.parse_args()
+
+    for name in args.engines:
+        try:
+            benchmark(name, args.clips, args.concurrency)
+        except Exception as e:
+            print(f"{name}: failed: {str(e)}")
@@ -1,28 +1,21 @@
 import asyncio
 import os
-from gtts import gTTS
 from sqlalchemy import select
 from app.database import get_db
 from app.models import NewsArticle
+from app.tts_service import TTSService
 
 AUDIO_DIR = os.path.join(os.path.dirname(__file__), "..", "audio")
 
+tts_service = TTSService(audio_dir=AUDIO_DIR)
+
 async def generate_audio_for_article(article_id: int, text: str, audio_type: str) -> str:
-    """Generate audio file for an article with specific naming convention"""
-    filename = f"{article_id}_{audio_type}.mp3"
-    filepath = os.path.join(AUDIO_DIR, filename)
-    
-    # Skip if file already exists
-    if os.path.exists(filepath):
-        print(f"Audio file {filename} already exists, skipping...")
-        return filename
-    
-    # Generate audio file
+    """Generate audio file for an article, reusing stored audio for identical text"""
+    # Generate audio file in the service's thread pool; texts already in the store are not synthesized again
     try:
-        tts = gTTS(text=text, lang='en')
-        tts.save(filepath)
-        print(f"Generated {filename}")
-        return filename
+        audio_file = await tts_service.generate(article_id, audio_type, text)
+        print(f"Generated {audio_file.filename}")
+        return audio_file.filename
     except Exception as e:
         print(f"Error generating audio for article {article_id}: {str(e)}")
         return None
@@ -40,25 +33,31 @@ async def generate_all_audio():
             
             print(f"Found {len(articles)} articles")
             
+            jobs = []
             for article in articles:
                 # Generate description audio
                 if article.description:
-                    await generate_audio_for_article(
+                    jobs.append(generate_audio_for_article(
                         article.id,
                         article.description,
                         "description"
-                    )
+                    ))
                 
                 # Generate full content audio
                 full_text = f"{article.title}. {article.content if article.content else article.description}"
-                await generate_audio_for_article(
+                jobs.append(generate_audio_for_article(
                     article.id,
                     full_text,
                     "content"
-                )
+                ))
+        
+        # Run concurrently; the pool bounds how many syntheses run at once
+        await asyncio.gather(*jobs)
                 
     except Exception as e:
         print(f"Error during audio generation: {str(e)}")
+    
+    print(f"Audio store: {tts_service.store.stats()}")
 
 if __name__ == "__main__":
     asyncio.run(generate_all_audio())
\ No newline at end of file
@@ -1,16 +1,25 @@
 import os
 import json
 import asyncio
+import random
+import time
+import hashlib
+import re
+import unicodedata
 import aiohttp
+import anyio
 import uuid
-from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from itertools import islice
+from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
 from app.database import init_db, get_db
-from app.models import NewsArticle
-from sqlalchemy import text
+from app.models import NewsArticle, GeneratedImage, ImportCheckpoint
+from app.json_stream import iter_json_records
+from app.images import create_derivatives
+from sqlalchemy import select, tuple_
 
 
-OPENAI_API_ENDPOINT = "https://api.openai.com/v1/images/generations"
+OPENAI_API_ENDPOINT = os.getenv("OPENAI_API_ENDPOINT", "https://api.openai.com/v1/images/generations")
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
@@ -19,6 +28,21 @@ if not OPENAI_API_KEY:
 IMG_DIR = "img"
 os.makedirs(IMG_DIR, exist_ok=True) 
 
+# Image generation limits
+IMAGE_CONCURRENCY = int(os.getenv("IMAGE_CONCURRENCY", "5"))  # images generated at once
+IMAGE_RATE_PER_MINUTE = float(os.getenv("IMAGE_RATE_PER_MINUTE", "50"))  # API requests per minute
+IMAGE_RETRIES = int(os.getenv("IMAGE_RETRIES", "4"))  # retries after a failed request
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+IMAGE_SIZE = "1024x1024"
+DEFAULT_PROMPT = "Default prompt: a beautiful landscape"
+
+# Image cache: also reuse images for near-identical prompts, within this many differing SimHash bits
+IMAGE_NEAR_DUPLICATES = os.getenv("IMAGE_NEAR_DUPLICATES", "false").lower() == "true"
+IMAGE_NEAR_DUPLICATE_BITS = int(os.getenv("IMAGE_NEAR_DUPLICATE_BITS", "8"))
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "100"))  # articles per transaction and checkpoint
+HEAD_HASH_BYTES = 64 * 1024  # hashed with the size to recognize the file a checkpoint belongs to
+
 # Function to parse and validate `published_at`
 def parse_published_at(date_str):
     if not date_str:
@@ -34,113 +58,346 @@ def parse_published_at(date_str):
     return datetime.utcnow()
 
 
-# Asynchronous function to generate an image using OpenAI DALL-E API
-async def generate_image_from_description(description, output_dir):
+class TokenBucket:
+    """Async token bucket: `rate` requests per second on average, bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RetryableError(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def retry_after_seconds(response):
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+# Request an image from the OpenAI API and stream it to disk
+async def request_image(session, bucket, description, output_dir):
     headers = {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {OPENAI_API_KEY}"
     }
     payload = {
-        "prompt": description or "Default prompt: a beautiful landscape",
+        "prompt": description or DEFAULT_PROMPT,
         "n": 1,
-        "size": "1024x1024"
+        "size": IMAGE_SIZE
     }
 
+    await bucket.acquire()
+    async with session.post(OPENAI_API_ENDPOINT, headers=headers, json=payload) as response:
+        if response.status in RETRYABLE_STATUSES:
+            raise RetryableError(f"status {response.status}", retry_after_seconds(response))
+        if response.status != 200:
+            print(f"Error generating image: {response.status}, {await response.text()}")
+            return None
+
+        response_data = await response.json()
+        if "data" not in response_data or len(response_data["data"]) == 0:
+            print("No image data returned from OpenAI API.")
+            return None
+
+        image_url = response_data["data"][0]["url"]
+
+    unique_id = str(uuid.uuid4())
+    image_name = f"{unique_id}.png" 
+    image_path = os.path.join(output_dir, image_name)  # img/<filename>
+    tmp_path = f"{image_path}.part"
+    async with session.get(image_url) as img_response:
+        if img_response.status in RETRYABLE_STATUSES:
+            raise RetryableError(f"download status {img_response.status}", retry_after_seconds(img_response))
+        img_response.raise_for_status()
+        # Stream to a temporary file in chunks; anyio runs the writes in a thread
+        try:
+            async with await anyio.open_file(tmp_path, "wb") as img_file:
+                async for chunk in img_response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    await img_file.write(chunk)
+        except BaseException:
+            # An interrupted download is retried under a new name, so drop the partial file
+            os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, image_path)
+
+    # Resized AVIF/WebP copies for feed cards; CPU-bound, so off the event loop
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(OPENAI_API_ENDPOINT, headers=headers, json=payload) as response:
-                if response.status != 200:
-                    print(f"Error generating image: {response.status}, {await response.text()}")
-                    return None
-                
-                response_data = await response.json()
-                if "data" not in response_data or len(response_data["data"]) == 0:
-                    print("No image data returned from OpenAI API.")
-                    return None
-                
-                image_url = response_data["data"][0]["url"]
-
-                
-                unique_id = str(uuid.uuid4())
-                image_name = f"{unique_id}.png" 
-                image_path = os.path.join(output_dir, image_name)  # img/<filename>
-                async with session.get(image_url) as img_response:
-                    img_data = await img_response.read()
-                    with open(image_path, "wb") as img_file:
-                        img_file.write(img_data)
-
-                return f"/img/{image_name}".replace("\\", "/")  
+        await anyio.to_thread.run_sync(create_derivatives, output_dir, image_name)
     except Exception as e:
-        print(f"Error generating image: {e}")
-        return None
+        print(f"Error creating derivatives for {image_name}: {e}")
+
+    return f"/img/{image_name}".replace("\\", "/")  
+
+
+# Asynchronous function to generate an image using OpenAI DALL-E API, with retries and backoff
+async def generate_image_from_description(session, bucket, description, output_dir):
+    for attempt in range(IMAGE_RETRIES + 1):
+        try:
+            return await request_image(session, bucket, description, output_dir)
+        except (RetryableError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt == IMAGE_RETRIES:
+                print(f"Error generating image after {attempt + 1} attempts: {e}")
+                return None
+            # Exponential backoff with jitter, unless the server said how long to wait
+            delay = getattr(e, "retry_after", None) or min(2 ** attempt, 30) * (0.5 + random.random())
+            print(f"Image request failed ({e}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        except Exception as e:
+            print(f"Error generating image: {e}")
+            return None
+
+
+# Generate images for all articles concurrently over one pooled session
+async def generate_images(descriptions, output_dir, concurrency=IMAGE_CONCURRENCY, rate_per_minute=IMAGE_RATE_PER_MINUTE):
+    bucket = TokenBucket(rate_per_minute / 60, capacity=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency * 2)
+    timeout = aiohttp.ClientTimeout(total=300, sock_connect=30)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async def generate(description):
+            async with semaphore:
+                return await generate_image_from_description(session, bucket, description, output_dir)
+
+        return await asyncio.gather(*(generate(description) for description in descriptions))
+
+
+def normalize_prompt(prompt):
+    return " ".join(unicodedata.normalize("NFKC", prompt).lower().split())
+
+
+def prompt_hash(prompt):
+    return hashlib.sha256(f"{IMAGE_SIZE}\0{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+
+def simhash(prompt):
+    """64-bit SimHash over the prompt's words, as a signed integer so it fits a BIGINT column"""
+    weights = [0] * 64
+    for feature in re.findall(r"\w+", normalize_prompt(prompt)):
+        value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    value = sum(1 << bit for bit in range(64) if weights[bit] > 0)
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class ImageCache:
+    """Generated images by prompt, backed by the generated_images table.
+
+    Each batch of prompts is matched with one query on the hash of their
+    normalized text and, if IMAGE_NEAR_DUPLICATES is on, on SimHash
+    distance (the signatures are then kept in memory for the import).
+    Prompts queued for generation in the same batch are matched the same
+    way, so repeats are generated once.
+    """
+
+    def __init__(self):
+        self.hits = {"exact": 0, "near": 0, "import": 0}
+        self.signatures = None
+
+    @staticmethod
+    def is_close(a, b):
+        return ((a ^ b) & (1 << 64) - 1).bit_count() <= IMAGE_NEAR_DUPLICATE_BITS
+
+    @staticmethod
+    def exists(image):
+        return os.path.exists(os.path.join(IMG_DIR, os.path.basename(image.image_path)))
+
+    async def lookup(self, session, prompts):
+        """Return an image per prompt and the new ones among them, whose image_path is still unset"""
+        keys = [prompt_hash(prompt) for prompt in prompts]
+        result = await session.execute(select(GeneratedImage).where(GeneratedImage.prompt_hash.in_(set(keys))))
+        found = {image.prompt_hash: image for image in result.scalars() if self.exists(image)}
+        if IMAGE_NEAR_DUPLICATES and self.signatures is None:
+            result = await session.execute(
+                select(GeneratedImage.simhash, GeneratedImage.prompt_hash).where(GeneratedImage.simhash.isnot(None))
+            )
+            self.signatures = result.all()
+
+        images, pending = [], []
+        for prompt, key in zip(prompts, keys):
+            image, kind = found.get(key), "exact"
+            signature = simhash(prompt)
+            if image is None and IMAGE_NEAR_DUPLICATES:
+                kind = "near"
+                image = next((queued for queued in pending if self.is_close(queued.simhash, signature)), None)
+                match = None if image else next(
+                    (stored for candidate, stored in self.signatures if self.is_close(candidate, signature)), None
+                )
+                if match:
+                    image = found.get(match) or await session.scalar(
+                        select(GeneratedImage).where(GeneratedImage.prompt_hash == match)
+                    )
+                    if image is not None and not self.exists(image):
+                        image = None
+
+            if image is None:
+                image = found[key] = GeneratedImage(prompt_hash=key, prompt=prompt, simhash=signature, hits=0)
+                pending.append(image)
+            elif image.image_path is None:
+                self.hits["import"] += 1
+            else:
+                self.hits[kind] += 1
+                image.hits = (image.hits or 0) + 1
+            images.append(image)
+        return images, pending
+
+    def add(self, session, image):
+        session.add(image)
+        if self.signatures is not None:
+            self.signatures.append((image.simhash, image.prompt_hash))
+
+
+def file_head_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read(HEAD_HASH_BYTES)).hexdigest()
+
+
+# Import one batch of articles in three short transactions: the duplicate check and image
+# cache lookup, the newly generated images, then the articles with the checkpoint. None is
+# open while images are generated, and images are kept even if the article insert fails.
+async def store_batch(batch, cache, checkpoint_id, advance=True):
+    """Import a batch of (record, offset) pairs; returns False if an article got no image.
+
+    The checkpoint then stops before that article, and stays there for the
+    rest of the run (advance=False), so a rerun retries it. The articles
+    after it are read again and skipped as duplicates.
+    """
+    articles = [(article, parse_published_at(article.get("published_at"))) for article, _ in batch]
+    async with get_db() as session:
+        # One set-based duplicate check per batch, served by ix_news_articles_title_published_at
+        result = await session.execute(
+            select(NewsArticle.title, NewsArticle.published_at).where(
+                tuple_(NewsArticle.title, NewsArticle.published_at).in_(
+                    [(article["title"], published_at) for article, published_at in articles]
+                )
+            )
+        )
+        seen = set(result.all())
+        new_articles = []
+        for index, (article, published_at) in enumerate(articles):
+            if (article["title"], published_at) in seen:
+                print(f"Skipping duplicate article: {article['title']}")
+                continue
+            seen.add((article["title"], published_at))
+            new_articles.append((index, article, published_at))
+
+        descriptions = [article.get("description", "No description provided.") for _, article, _ in new_articles]
+
+        # Reuse images already generated for the same (or a near-identical) prompt
+        images, pending = await cache.lookup(session, [description or DEFAULT_PROMPT for description in descriptions])
+
+    generated = await generate_images([image.prompt for image in pending], IMG_DIR)
+    async with get_db() as session:
+        for image, image_path in zip(pending, generated):
+            if image_path:
+                image.image_path = image_path
+                cache.add(session, image)
+
+    async with get_db() as session:
+        imported, failed = 0, None
+        for (index, article, published_at), description, image in zip(new_articles, descriptions, images):
+            if not image.image_path:
+                print(f"Skipping article {article['title']!r} due to image generation failure")
+                if failed is None:
+                    failed = index
+                continue
+
+            session.add(NewsArticle(
+                guid=str(uuid.uuid4()),
+                title=article["title"],
+                description=description,
+                content=article.get("content"),
+                link=article.get("link"),
+                image_url=image.image_path,
+                category=article.get("category", None),
+                published_at=published_at
+            ))
+            imported += 1
+
+        checkpoint = await session.get(ImportCheckpoint, checkpoint_id)
+        if advance:
+            done = batch if failed is None else batch[:failed]
+            if done:
+                checkpoint.position = done[-1][1]
+                checkpoint.articles += len(done)
+        checkpoint.imported += imported
+        checkpoint.skipped += len(batch) - imported
+        print(f"Committed batch: {imported} added, {len(batch) - imported} skipped "
+              f"({checkpoint.articles} articles checkpointed, {len(pending)} images generated)")
+    return failed is None
 
 
 # Function to store articles in the database
-async def store_articles_in_db(json_file_path):
+async def store_articles_in_db(json_file_path, batch_size=IMPORT_BATCH_SIZE):
+    """Import articles from a JSON array or NDJSON file in batches, resuming where a previous run stopped"""
     await init_db()
 
-    try:
-        with open(json_file_path, "r", encoding="utf-8") as file:
-            json_data = json.load(file)
-    except FileNotFoundError:
+    if not os.path.exists(json_file_path):
         print(f"Error: JSON file not found at {json_file_path}")
         return
-    except json.JSONDecodeError as e:
-        print(f"Error: Failed to parse JSON file: {e}")
-        return
 
+    source = os.path.abspath(json_file_path)
+    file_size = os.path.getsize(source)
+    head_hash = file_head_hash(source)
     async with get_db() as session:
-        try:
-            for article in json_data:
-
-                guid = str(uuid.uuid4())
-                published_at = parse_published_at(article.get("published_at"))
-                description = article.get("description", "No description provided.")
-                
-                existing_article = await session.execute(
-                    text("SELECT id FROM news_articles WHERE title = :title AND published_at = :published_at"),
-                    {"title": article["title"], "published_at": published_at}
-                )
-                if existing_article.fetchone():
-                    print(f"Skipping duplicate article: {article['title']}")
-                    continue
-
-
-                image_path = await generate_image_from_description(description, IMG_DIR)
-
-  
-                if not image_path:
-                    print(f"Skipping article {guid} due to image generation failure")
-                    continue
-
-                news_article = NewsArticle(
-                    guid=guid,
-                    title=article["title"],
-                    description=description,
-                    content=article.get("content"),
-                    link=article.get("link"),
-                    image_url=image_path,
-                    category=article.get("category", None),
-                    published_at=published_at
-                )
+        checkpoint = await session.scalar(select(ImportCheckpoint).where(ImportCheckpoint.source == source))
+        if checkpoint is None:
+            checkpoint = ImportCheckpoint(source=source, file_size=file_size)
+            session.add(checkpoint)
+        if checkpoint.file_size != file_size or checkpoint.head_hash != head_hash or checkpoint.position is None:
+            checkpoint.file_size, checkpoint.head_hash = file_size, head_hash
+            checkpoint.position = checkpoint.articles = checkpoint.imported = checkpoint.skipped = 0
+        await session.flush()
+        checkpoint_id, position = checkpoint.id, checkpoint.position
+        if position:
+            print(f"Resuming after {checkpoint.articles} articles (byte {position} of {file_size})")
 
-                try:
-                    session.add(news_article)
-                    print(f"Article added: {article['title']}")
-                except IntegrityError as e:
-                    print(f"Error inserting article {guid}: {e}")
-                    await session.rollback()
-
-            print("Committing articles to the database...")
-            await session.commit()
-            print("Articles saved successfully!")
+    cache = ImageCache()
+    records = iter_json_records(source, position)
+    started = time.perf_counter()
+    advance = True
+    try:
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            advance = await store_batch(batch, cache, checkpoint_id, advance) and advance
+    except json.JSONDecodeError as e:
+        print(f"Error: Failed to parse JSON file: {e}")
+        return
+    except SQLAlchemyError as e:
+        print(f"Database error, rerun to resume from the last committed batch: {e}")
+        return
+    except Exception as e:
+        print(f"Unexpected error, rerun to resume from the last committed batch: {e}")
+        return
 
-        except SQLAlchemyError as e:
-            print(f"Database error: {e}")
-            await session.rollback()
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            await session.rollback()
+    if not advance:
+        print("Some articles got no image; rerun to retry them")
+    reused = sum(cache.hits.values())
+    print(f"Import finished in {time.perf_counter() - started:.1f}s")
+    print(f"Image cache: {cache.hits['exact']} exact, {cache.hits['near']} near-duplicate and "
+          f"{cache.hits['import']} in-import hits, saving {reused} API calls")
 
 
 # Default file path
@@ -0,0 +1,40 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from app.images import FORMATS, create_derivatives, manifest_path
+
+IMG_DIR = os.path.join(os.path.dirname(__file__), "img")
+
+def derive(filename: str):
+    try:
+        create_derivatives(IMG_DIR, filename)
+        return filename, None
+    except Exception as e:
+        return filename, str(e)
+
+def generate_all_derivatives(force: bool = False):
+    """Create resized AVIF/WebP derivatives for images in img/ that don't have them yet"""
+    if not FORMATS:
+        print("Pillow with AVIF or WebP support is required to create derivatives")
+        return
+
+    filenames = sorted(
+        entry.name for entry in os.scandir(IMG_DIR)
+        if entry.is_file() and not entry.name.endswith(".part")
+        and (force or not os.path.exists(manifest_path(IMG_DIR, entry.name)))
+    )
+    print(f"Creating derivatives for {len(filenames)} images")
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor() as pool:
+        for filename, error in pool.map(derive, filenames):
+            if error:
+                print(f"Error creating derivatives for {filename}: {error}")
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=generate_all_derivatives.__doc__)
+    parser.add_argument("--force", action="store_true", help="recreate derivatives that already exist")
+    args = parser.parse_args()
+    generate_all_derivatives(force=args.force)
@@ -1,31 +1,87 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from pydantic import TypeAdapter
 from sqlalchemy import select, text
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Union
 from loguru import logger
 import uvicorn
 
-from app.database import init_db, get_db
-from app.models import NewsArticle, AudioFile
-from app.schemas import NewsResponse, HealthResponse, AudioFileResponse
+from app.database import init_db, get_db, get_read_db
+from app.models import NewsArticle
+from app.schemas import (
+    NewsResponse, NewsSummaryResponse, SearchResultResponse, HealthResponse, AudioFileResponse, AudioJobResponse
+)
 from app.feed_fetcher import FeedFetcher
 from app.scheduler import setup_scheduler
 from app.tts_service import TTSService
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from app.pagination import NEXT_CURSOR_HEADER, encode_cursor, after_cursor
+from app.search import search_articles
+from app.cache import news_cache
+from app.counters import article_counters
+from app.audio_jobs import AudioJobRunner
+from app.config import AUDIO_CACHE_CONTROL, IMAGE_CACHE_CONTROL, IMAGE_IMMUTABLE_CACHE_CONTROL
+from app.file_response import file_response, resolve_file
+from app.images import DERIVED_DIR, choose_variant, load_manifest
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+import mimetypes
 import os
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_db()
+    article_counters.start()
+    await audio_jobs.resume_pending()
+    yield
+    # Flush buffered view/share increments before the process exits
+    await article_counters.stop()
+    await audio_jobs.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 img_path = os.path.join(BASE_DIR, "img")
 
+@app.get("/img/derived/{filename}")
+async def get_image_derivative(filename: str, request: Request):
+    """Serve a resized image by its content-hashed name; the URL never changes content"""
+    try:
+        file_path = resolve_file(os.path.join(img_path, DERIVED_DIR), filename)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid filename")
+    if not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail="Image not found")
+    return file_response(
+        file_path,
+        request.headers,
+        media_type=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+        cache_control=IMAGE_IMMUTABLE_CACHE_CONTROL
+    )
 
-app.mount("/img", StaticFiles(directory=img_path), name="img")
+@app.get("/img/{filename}")
+async def get_image(filename: str, request: Request, w: Optional[int] = Query(None, ge=1)):
+    """Serve an article image, as the smallest AVIF/WebP derivative at least `w` px wide when the client accepts one"""
+    try:
+        file_path = resolve_file(img_path, filename)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid filename")
+    if not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    manifest = load_manifest(img_path, filename)
+    variant = choose_variant(manifest, request.headers.get("accept"), w) if manifest else None
+    if variant:
+        derived_name, media_type = variant
+        file_path = os.path.join(img_path, DERIVED_DIR, derived_name)
+    
+    response = file_response(file_path, request.headers, media_type=media_type, cache_control=IMAGE_CACHE_CONTROL)
+    response.headers["vary"] = "Accept"
+    return response
 
 
 # Configure CORS
@@ -35,6 +91,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "X-Cache"],
+)
+
+news_list_adapter = TypeAdapter(List[NewsResponse])
+news_summary_adapter = TypeAdapter(List[NewsSummaryResponse])
+search_results_adapter = TypeAdapter(List[SearchResultResponse])
+
+# Columns loaded for view=summary; content is never read from the database
+SUMMARY_COLUMNS = (
+    NewsArticle.id, NewsArticle.title, NewsArticle.description, NewsArticle.link,
+    NewsArticle.image_url, NewsArticle.category, NewsArticle.published_at,
+    NewsArticle.views, NewsArticle.shares
 )
 
 @app.get("/health", response_model=HealthResponse)
@@ -42,17 +110,34 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": datetime.utcnow()}
 
-@app.get("/api/news", response_model=List[NewsResponse])
+@app.get("/api/news", response_model=Union[List[NewsResponse], List[NewsSummaryResponse]])
 async def get_news(
     category: Optional[str] = None,
     days: Optional[int] = Query(None, ge=1, le=30),
     skip: int = Query(0, ge=0),
-    limit: int = Query(30, ge=1, le=100)
+    limit: int = Query(30, ge=1, le=100),
+    cursor: Optional[str] = None,
+    view: str = Query("full", pattern="^(full|summary)$")
 ):
-    """Get news articles with optional filtering"""
+    """Get news articles with optional filtering.
+    
+    Pass the X-Next-Cursor header of a page back as `cursor` to get the next
+    page; this stays fast and stable at any depth. `skip` is still supported
+    but ignored when a cursor is given. `view=summary` returns only the
+    fields feed cards need and skips loading article bodies.
+    
+    Pages are served from news_cache as pre-serialized JSON until the TTL
+    expires or an ingest invalidates them.
+    """
+    cache_key = (category, days, cursor, skip, limit, view)
+    cached = news_cache.get(cache_key)
+    if cached:
+        body, headers = cached
+        return Response(body, media_type="application/json", headers={**headers, "X-Cache": "HIT"})
+    
     try:
-        async with get_db() as db:
-            query = select(NewsArticle)
+        async with get_read_db() as db:
+            query = select(*SUMMARY_COLUMNS) if view == "summary" else select(NewsArticle)
             
             if category:
                 query = query.where(NewsArticle.category == category)
@@ -61,37 +146,91 @@ async def get_news(
                 date_threshold = datetime.utcnow() - timedelta(days=days)
                 query = query.where(NewsArticle.published_at >= date_threshold)
             
-            query = query.order_by(NewsArticle.published_at.desc()) \
-                        .offset(skip) \
+            if cursor:
+                try:
+                    query = after_cursor(query, cursor)
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+            elif skip:
+                query = query.offset(skip)
+            
+            query = query.order_by(NewsArticle.published_at.desc(), NewsArticle.id.desc()) \
                         .limit(limit)
             
             result = await db.execute(query)
-            articles = result.scalars().all()
+            articles = result.all() if view == "summary" else result.scalars().all()
+            
+            headers = {}
+            if len(articles) == limit:
+                headers[NEXT_CURSOR_HEADER] = encode_cursor(articles[-1])
             
-            return [
-                NewsResponse(
-                    id=article.id,
-                    title=article.title,
-                    description=article.description,
-                    content=article.content,
-                    link=article.link,
-                    image_url=article.image_url,
-                    category=article.category,
-                    published_at=article.published_at,
-                    views=article.views,
-                    shares=article.shares
-                )
-                for article in articles
-            ]
+            if view == "summary":
+                body = news_summary_adapter.dump_json([
+                    NewsSummaryResponse(**article._mapping) for article in articles
+                ])
+            else:
+                body = news_list_adapter.dump_json([
+                    NewsResponse(
+                        id=article.id,
+                        title=article.title,
+                        description=article.description,
+                        content=article.content,
+                        link=article.link,
+                        image_url=article.image_url,
+                        category=article.category,
+                        published_at=article.published_at,
+                        views=article.views,
+                        shares=article.shares
+                    )
+                    for article in articles
+                ])
+            news_cache.set(cache_key, (body, headers))
+            return Response(body, media_type="application/json", headers={**headers, "X-Cache": "MISS"})
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching news: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.get("/api/news/search", response_model=List[SearchResultResponse])
+async def search_news(
+    q: str = Query(..., min_length=1, max_length=200),
+    category: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None
+):
+    """Full-text search over article titles, descriptions and content.
+    
+    Words must all match; "quoted phrases" match in order. Results are
+    ranked best first and carry a `snippet` with the matched terms wrapped
+    in <mark>. Pass the X-Next-Cursor header back as `cursor` for the next page.
+    """
+    try:
+        async with get_read_db() as db:
+            try:
+                results, next_cursor = await search_articles(db, q, limit, cursor, category)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
+        headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+        body = search_results_adapter.dump_json([SearchResultResponse(**row) for row in results])
+        return Response(body, media_type="application/json", headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching news for {q!r}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Hit/miss counters for the /api/news response cache and the audio store"""
+    return {"news": news_cache.stats(), "audio": tts_service.store.stats()}
+
 @app.get("/news/{article_id}", response_model=NewsResponse)
 async def get_article(article_id: int):
     """Get a specific news article by ID"""
     try:
-        async with get_db() as db:
+        async with get_read_db() as db:
             result = await db.execute(
                 select(NewsArticle).filter(NewsArticle.id == article_id)
             )
@@ -122,19 +261,16 @@ async def get_article(article_id: int):
 async def increment_views(article_id: int):
     """Increment the view count for an article"""
     try:
-        async with get_db() as db:
+        async with get_read_db() as db:
             result = await db.execute(
-                select(NewsArticle).filter(NewsArticle.id == article_id)
+                select(NewsArticle.id).filter(NewsArticle.id == article_id)
             )
-            article = result.scalar_one_or_none()
-            
-            if not article:
+            if result.scalar_one_or_none() is None:
                 raise HTTPException(status_code=404, detail="Article not found")
-            
-            article.views += 1
-            await db.commit()
-            
-            return {"success": True}
+        
+        # Buffered and written in batches by article_counters
+        article_counters.increment(article_id, "views")
+        return {"success": True}
     except HTTPException:
         raise
     except Exception as e:
@@ -145,19 +281,16 @@ async def increment_views(article_id: int):
 async def increment_shares(article_id: int):
     """Increment the share count for an article"""
     try:
-        async with get_db() as db:
+        async with get_read_db() as db:
             result = await db.execute(
-                select(NewsArticle).filter(NewsArticle.id == article_id)
+                select(NewsArticle.id).filter(NewsArticle.id == article_id)
             )
-            article = result.scalar_one_or_none()
-            
-            if not article:
+            if result.scalar_one_or_none() is None:
                 raise HTTPException(status_code=404, detail="Article not found")
-            
-            article.shares += 1
-            await db.commit()
-            
-            return {"success": True}
+        
+        # Buffered and written in batches by article_counters
+        article_counters.increment(article_id, "shares")
+        return {"success": True}
     except HTTPException:
         raise
     except Exception as e:
@@ -176,79 +309,34 @@ async def fetch_news():
         raise HTTPException(status_code=500, detail="Feed fetch failed")
 
 
-@app.post("/generate-all-audio")
+# Initialize TTS service
+tts_service = TTSService(audio_dir=os.path.join(os.path.dirname(__file__), "..", "audio"))
+audio_jobs = AudioJobRunner(tts_service)
+
+@app.post("/generate-all-audio", response_model=AudioJobResponse, status_code=202)
 async def generate_all_audio():
-    """Generate audio for all articles that don't have audio yet"""
+    """Queue a background job generating audio for all articles that don't have it yet"""
     try:
-        async with get_db() as db:
-            # Get all articles
-            result = await db.execute(
-                select(NewsArticle)
-            )
-            articles = result.scalars().all()
-            
-            tts_service = TTSService()
-            generated_count = 0
-            
-            for article in articles:
-                try:
-                    # Check if description audio exists
-                    desc_result = await db.execute(
-                        select(AudioFile).filter(
-                            AudioFile.article_id == article.id,
-                            AudioFile.type == 'description'
-                        )
-                    )
-                    if not desc_result.scalar_one_or_none():
-                        # Generate description audio
-                        await tts_service.create_audio_for_article_description(db, article.id)
-                        generated_count += 1
-                        logger.info(f"Generated description audio for article {article.id}")
-                    
-                    # Check if full audio exists
-                    full_result = await db.execute(
-                        select(AudioFile).filter(
-                            AudioFile.article_id == article.id,
-                            AudioFile.type == 'full'
-                        )
-                    )
-                    if not full_result.scalar_one_or_none():
-                        # Generate full audio
-                        await tts_service.create_audio_for_article(db, article.id)
-                        generated_count += 1
-                        logger.info(f"Generated full audio for article {article.id}")
-                    
-                except Exception as e:
-                    logger.error(f"Error generating audio for article {article.id}: {str(e)}")
-                    continue
-            
-            return {
-                "success": True,
-                "message": f"Generated {generated_count} audio files",
-                "total_articles": len(articles)
-            }
-            
+        return await audio_jobs.submit()
     except Exception as e:
-        logger.error(f"Error during audio generation: {str(e)}")
+        logger.error(f"Error starting audio generation: {str(e)}")
         raise HTTPException(status_code=500, detail="Audio generation failed")
 
-# Initialize TTS service
-tts_service = TTSService(audio_dir=os.path.join(os.path.dirname(__file__), "..", "audio"))
+@app.get("/jobs/{job_id}", response_model=AudioJobResponse)
+async def get_job(job_id: int):
+    """Get the progress of an audio generation job"""
+    job = await audio_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 @app.post("/api/news/{article_id}/audio", response_model=AudioFileResponse)
 async def generate_audio(article_id: int):
     """Generate audio for a news article"""
     try:
         async with get_db() as db:
-            # Check if audio already exists
-            result = await db.execute(
-                select(AudioFile).filter(AudioFile.article_id == article_id)
-            )
-            existing_audio = result.scalar_one_or_none()
-            if existing_audio:
-                return existing_audio
-            
-            # Generate new audio file
+            # Audio for unchanged text is found in the store, so this only synthesizes
+            # when the article is new or its text was edited
             audio_file = await tts_service.create_audio_for_article(db, article_id)
             return audio_file
             
@@ -259,16 +347,21 @@ async def generate_audio(article_id: int):
         raise HTTPException(status_code=500, detail="Audio generation failed")
 
 @app.get("/api/audio/{filename}")
-async def get_audio_file(filename: str):
-    """Get audio file by filename"""
+async def get_audio_file(filename: str, request: Request):
+    """Get audio file by filename, with byte-range and conditional request support"""
     try:
-        file_path = os.path.join(tts_service.audio_dir, filename)
-        if not os.path.exists(file_path):
+        try:
+            file_path = resolve_file(tts_service.audio_dir, filename)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid filename")
+        if not tts_service.store.touch(filename):
             raise HTTPException(status_code=404, detail="Audio file not found")
         
-        return FileResponse(
+        return file_response(
             file_path,
+            request.headers,
             media_type="audio/mpeg",
+            cache_control=AUDIO_CACHE_CONTROL,
             filename=filename
         )
     except HTTPException:
@@ -277,13 +370,55 @@ async def get_audio_file(filename: str):
         logger.error(f"Error serving audio file {filename}: {str(e)}")
         raise HTTPException(status_code=500, detail="Error serving audio file")
 
+async def article_audio(article_id: int, audio_type: str):
+    """Audio metadata from a read-only session, writing only when the row is missing or stale.
+    
+    A stale row is repointed to a file that exists, and audio with no file
+    left (never made, or evicted from the store) is synthesized first.
+    """
+    async with get_read_db() as db:
+        audio = await tts_service.find_audio_for_article(db, article_id, audio_type)
+    if audio:
+        return audio
+    async with get_db() as db:
+        return await tts_service.get_audio_for_article(db, article_id, audio_type)
+
 @app.get("/api/news/{article_id}/audio", response_model=AudioFileResponse)
-async def get_article_audio(article_id: int):
-    """Get audio metadata for a news article"""
+async def get_article_audio(article_id: int, request: Request, stream: bool = False):
+    """Get audio metadata for a news article.
+    
+    With `stream=true` the MP3 itself is returned instead: straight from disk
+    if it was generated before, otherwise streamed sentence by sentence while
+    it is being synthesized, and stored for later requests.
+    """
     try:
-        async with get_db() as db:
-            audio = await tts_service.get_audio_for_article(db, article_id, "content")
-            return audio
+        if not stream:
+            return await article_audio(article_id, "content")
+        
+        async with get_read_db() as db:
+            result = await db.execute(
+                select(NewsArticle).filter(NewsArticle.id == article_id)
+            )
+            article = result.scalar_one_or_none()
+            if not article:
+                raise ValueError(f"Article with id {article_id} not found")
+        
+        text_content = tts_service.get_text_content(article, "content")
+        filename = tts_service.get_audio_filename(text_content)
+        if tts_service.store.lookup(filename):
+            return file_response(
+                tts_service.store.path_for(filename),
+                request.headers,
+                media_type="audio/mpeg",
+                cache_control=AUDIO_CACHE_CONTROL,
+                filename=filename
+            )
+        
+        return StreamingResponse(
+            tts_service.stream_audio(article_id, "content", text_content),
+            media_type="audio/mpeg",
+            headers={"Cache-Control": "no-store"}
+        )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -294,9 +429,7 @@ async def get_article_audio(article_id: int):
 async def get_article_description_audio(article_id: int):
     """Get audio metadata for a news article's description"""
     try:
-        async with get_db() as db:
-            audio = await tts_service.get_audio_for_article(db, article_id, "description")
-            return audio
+        return await article_audio(article_id, "description")
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -0,0 +1,139 @@
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import List
+
+import pytest
+
+# The app reads its configuration at import time, so point it at a scratch
+# database and the offline TTS engine before anything imports it
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='news-tests-')}/news.db"
+os.environ["TTS_ENGINE"] = "silent"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from app.tts_engines import SilentEngine  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def database(anyio_backend):
+    """Create the schema, and empty it again after the test"""
+    from app.cache import news_cache
+    from app.database import engine, init_db, read_engine
+    from app.models import Base
+
+    await init_db()
+    yield
+    async with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            await conn.execute(table.delete())
+    news_cache.invalidate()
+    # Pooled connections belong to this test's event loop
+    await engine.dispose()
+    await read_engine.dispose()
+
+
+@pytest.fixture
+async def client(database):
+    import httpx
+    from main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def tts(database, tmp_path, monkeypatch):
+    """Factory installing a TTS service with a DelayedEngine and a scratch audio directory in the app"""
+    import main
+    from app.tts_service import TTSService
+
+    def make(delay: float = 0.0) -> TTSService:
+        service = TTSService(str(tmp_path / "audio"), engine=DelayedEngine(delay))
+        monkeypatch.setattr(main, "tts_service", service)
+        return service
+
+    return make
+
+
+class DelayedEngine(SilentEngine):
+    """Silent engine blocking for `delay` seconds per call, like a remote TTS request, and counting its calls"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def synthesize(self, text: str, lang: str = "en") -> bytes:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return super().synthesize(text, lang)
+
+
+async def add_articles(count: int, **fields) -> List[int]:
+    """Insert synthetic articles and return their ids"""
+    from app.database import get_db
+    from app.models import NewsArticle
+
+    async with get_db() as db:
+        articles = [
+            NewsArticle(**{
+                "guid": f"test-{i}-{datetime.utcnow().timestamp()}",
+                "title": f"Test article {i}",
+                "description": f"Description of test article {i}.",
+                "content": f"Content of test article {i}.",
+                "link": f"https://example.com/{i}",
+                "category": "Technology",
+                "published_at": datetime.utcnow(),
+                **fields,
+            })
+            for i in range(count)
+        ]
+        db.add_all(articles)
+        await db.flush()
+        return [article.id for article in articles]
+
+
+class LoopLag:
+    """Measures how late the event loop wakes a task that sleeps in short steps.
+
+    Anything blocking the loop shows up as a sample as long as the block,
+    so max is the worst stall a request would have seen meanwhile.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(loop.time() - started - self.interval)
+
+    @property
+    def max(self) -> float:
+        return max(self.samples, default=0.0)
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._run())
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
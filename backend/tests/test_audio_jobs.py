@@ -0,0 +1,26 @@
+import pytest
+from sqlalchemy import select
+
+from conftest import add_articles
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_duplicate_rows_of_one_type_do_not_hide_a_missing_type(database):
+    from app.audio_jobs import missing_audio_condition
+    from app.database import get_db, get_read_db
+    from app.models import AudioFile, NewsArticle
+
+    complete, duplicated, bare = await add_articles(3)
+    async with get_db() as db:
+        db.add_all([
+            AudioFile(article_id=complete, type="description", filename="a.mp3", text_content="a"),
+            AudioFile(article_id=complete, type="content", filename="b.mp3", text_content="b"),
+            # Two rows of one type and none of the other still lack description audio
+            AudioFile(article_id=duplicated, type="content", filename="c.mp3", text_content="c"),
+            AudioFile(article_id=duplicated, type="content", filename="c.mp3", text_content="c"),
+        ])
+
+    async with get_read_db() as db:
+        missing = set((await db.execute(select(NewsArticle.id).where(missing_audio_condition()))).scalars())
+    assert missing == {duplicated, bare}
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from conftest import add_articles
+
+pytestmark = pytest.mark.anyio
+
+
+async def counts(article_ids):
+    from app.database import get_read_db
+    from app.models import NewsArticle
+
+    async with get_read_db() as db:
+        result = await db.execute(
+            select(NewsArticle.id, NewsArticle.views, NewsArticle.shares).where(NewsArticle.id.in_(article_ids))
+        )
+        return {article_id: (views or 0, shares or 0) for article_id, views, shares in result}
+
+
+async def test_concurrent_requests_lose_no_increments(client, monkeypatch):
+    from app.counters import article_counters
+
+    article_ids = await add_articles(3)
+    # Flush continuously while the requests come in, so increments land between flushes too
+    monkeypatch.setattr(article_counters, "interval", 0.01)
+    article_counters.start()
+    try:
+        requests = [
+            client.post(f"/news/{article_id}/{counter}")
+            for article_id in article_ids
+            for counter, n in (("view", 200), ("share", 50))
+            for _ in range(n)
+        ]
+        responses = await asyncio.gather(*requests)
+    finally:
+        await article_counters.stop()
+
+    assert all(response.status_code == 200 for response in responses)
+    assert await counts(article_ids) == {article_id: (200, 50) for article_id in article_ids}
+
+
+async def test_concurrent_flushes_from_separate_processes_add_up(database):
+    from app.counters import CounterAggregator
+
+    # Two aggregators stand in for two worker processes writing the same rows
+    article_ids = await add_articles(2, views=5)
+    workers = [CounterAggregator(), CounterAggregator()]
+
+    async def click(aggregator: CounterAggregator):
+        for i in range(500):
+            aggregator.increment(article_ids[i % 2], "views")
+            if i % 50 == 0:
+                await aggregator.flush()
+        await aggregator.flush()
+
+    await asyncio.gather(*(click(aggregator) for aggregator in workers))
+    assert await counts(article_ids) == {article_id: (505, 0) for article_id in article_ids}
+
+
+async def test_failed_flush_keeps_increments_for_the_next_one(database, monkeypatch):
+    from app import counters
+    from app.counters import CounterAggregator
+
+    article_ids = await add_articles(1)
+    aggregator = CounterAggregator()
+    for _ in range(3):
+        aggregator.increment(article_ids[0], "shares")
+
+    get_db = counters.get_db
+
+    def unavailable():
+        raise ConnectionError("database is down")
+
+    monkeypatch.setattr(counters, "get_db", unavailable)
+    with pytest.raises(ConnectionError):
+        await aggregator.flush()
+    aggregator.increment(article_ids[0], "shares")
+
+    monkeypatch.setattr(counters, "get_db", get_db)
+    assert await aggregator.flush() == 1
+    assert await counts(article_ids) == {article_ids[0]: (0, 4)}
+
+
+async def test_unknown_article_is_not_counted(client):
+    from app.counters import article_counters
+
+    response = await client.post("/news/999999/view")
+    assert response.status_code == 404
+    assert 999999 not in article_counters._pending
@@ -0,0 +1,108 @@
+import asyncio
+import gc
+import random
+import time
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+
+from conftest import LoopLag
+
+pytestmark = pytest.mark.anyio
+
+FEEDS = 4
+ITEMS = 400
+CHUNK_SIZE = 64 * 1024  # how much of a body arrives at a time, like a socket read
+
+
+def rss(feed: int, items: int = ITEMS) -> str:
+    """An RSS document of distinct items, with enough HTML to make parsing take a while"""
+    rng = random.Random(feed)
+    text = lambda n: " ".join(f"w{rng.randrange(5000)}" for _ in range(n))
+    entries = "".join(
+        f"""<item>
+  <title>{text(8)}</title>
+  <link>https://feed{feed}.example.com/{i}</link>
+  <guid>feed{feed}-{i}</guid>
+  <pubDate>Mon, 06 Jan 2025 10:{i % 60:02d}:00 GMT</pubDate>
+  <description><![CDATA[<p><img src="https://feed{feed}.example.com/{i}.jpg"/>{text(30)}</p>
+  {"".join(f"<p>{text(15)}, <b>{text(3)}</b> <a href='#'>{text(2)}</a>.</p>" for _ in range(20))}]]></description>
+</item>"""
+        for i in range(items)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Feed {feed}</title>{entries}</channel></rss>'
+
+
+@pytest.fixture
+async def fetcher(database):
+    from app.feed_fetcher import FeedFetcher
+
+    bodies = {f"https://feed{feed}.example.com/rss": rss(feed) for feed in range(FEEDS)}
+
+    async def chunks(body: bytes):
+        for start in range(0, len(body), CHUNK_SIZE):
+            yield body[start:start + CHUNK_SIZE]
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        body = bodies[str(request.url)].encode("utf-8")
+        return httpx.Response(200, content=chunks(body), headers={"Content-Type": "application/rss+xml"})
+
+    fetcher = FeedFetcher()
+    await fetcher.client.aclose()
+    fetcher.client = httpx.AsyncClient(transport=httpx.MockTransport(respond))
+    # One feed goes through the incremental parser instead of the process pool
+    fetcher.RSS_FEEDS = [
+        {"url": url, "category": "Technology", **({"stream": True} if feed == 0 else {})}
+        for feed, url in enumerate(bodies)
+    ]
+    # Full collections over the test's large heap pause every thread for tens of
+    # milliseconds; keep them out of the measurement, as a server would after startup
+    gc.freeze()
+    yield fetcher
+    gc.unfreeze()
+
+
+def inline_parse_seconds() -> float:
+    """How long one feed would stall the event loop if it were parsed there"""
+    from app.feed_fetcher import parse_feed
+
+    body = rss(0)
+    started = time.perf_counter()
+    parse_feed(body, "Technology")
+    return time.perf_counter() - started
+
+
+async def test_ingest_does_not_block_the_event_loop(fetcher):
+    from app.database import get_read_db
+    from app.models import NewsArticle
+
+    inline_parse = inline_parse_seconds()
+    async with LoopLag() as lag:
+        await fetcher.fetch_all()
+
+    async with get_read_db() as db:
+        stored = (await db.execute(select(func.count(NewsArticle.id)))).scalar()
+    assert stored == FEEDS * ITEMS
+    # Streamed chunks are still split on the loop and results handed over,
+    # so allow short stalls, but nothing near a whole feed's parse
+    assert lag.max < inline_parse / 10, f"event loop stalled for {lag.max * 1000:.0f} ms"
+
+
+async def test_api_stays_responsive_during_ingest(fetcher, client):
+    inline_parse = inline_parse_seconds()
+
+    async def poll(latencies: list):
+        while not ingest.done():
+            started = time.perf_counter()
+            response = await client.get("/api/news", params={"limit": 20})
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200
+            # Cached responses complete without yielding, so pace the client
+            await asyncio.sleep(0.01)
+
+    latencies: list = []
+    ingest = asyncio.create_task(fetcher.fetch_all())
+    await asyncio.gather(ingest, poll(latencies))
+    assert latencies
+    assert max(latencies) < inline_parse / 5, f"slowest /api/news during ingest took {max(latencies) * 1000:.0f} ms"
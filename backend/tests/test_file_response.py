@@ -0,0 +1,66 @@
+import pytest
+
+
+DATA = bytes(range(256)) * 600  # 150 KiB, more than two 64 KiB chunks
+
+
+@pytest.fixture
+async def audio(tmp_path):
+    import httpx
+    from starlette.applications import Starlette
+    from starlette.routing import Route
+    from app.file_response import file_response
+
+    (tmp_path / "clip.mp3").write_bytes(DATA)
+
+    async def serve(request):
+        return file_response(str(tmp_path / "clip.mp3"), request.headers, media_type="audio/mpeg",
+                             cache_control="public, max-age=60", filename="clip.mp3")
+
+    app = Starlette(routes=[Route("/clip.mp3", serve, methods=["GET", "HEAD"])])
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+def test_only_partial_and_bodyless_responses_use_range_file_response():
+    from starlette.datastructures import Headers
+    from starlette.responses import FileResponse
+    from app.file_response import RangeFileResponse, file_response
+
+    assert isinstance(file_response(__file__, Headers(), "text/plain", "no-cache"), FileResponse)
+    partial = file_response(__file__, Headers({"range": "bytes=0-9"}), "text/plain", "no-cache")
+    assert isinstance(partial, RangeFileResponse) and partial.status_code == 206
+
+
+@pytest.mark.anyio
+async def test_whole_file_is_served_with_validators(audio):
+    response = await audio.get("/clip.mp3")
+
+    assert response.status_code == 200
+    assert response.content == DATA
+    for name in ("content-length", "content-type", "etag", "last-modified"):
+        assert len(response.headers.get_list(name)) == 1, name
+    assert response.headers["content-length"] == str(len(DATA))
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["cache-control"] == "public, max-age=60"
+    assert response.headers["content-disposition"] == 'inline; filename="clip.mp3"'
+
+    head = await audio.head("/clip.mp3")
+    assert head.status_code == 200 and head.content == b""
+    assert head.headers["etag"] == response.headers["etag"]
+
+
+@pytest.mark.anyio
+async def test_ranges_and_conditional_requests(audio):
+    etag = (await audio.get("/clip.mp3")).headers["etag"]
+
+    response = await audio.get("/clip.mp3", headers={"Range": "bytes=100000-163839"})
+    assert response.status_code == 206
+    assert response.content == DATA[100000:]
+    assert response.headers["content-range"] == f"bytes 100000-{len(DATA) - 1}/{len(DATA)}"
+
+    assert (await audio.get("/clip.mp3", headers={"If-None-Match": etag})).status_code == 304
+    assert (await audio.get("/clip.mp3", headers={"Range": f"bytes={len(DATA)}-"})).status_code == 416
+    # A stale If-Range gets the whole file
+    stale = await audio.get("/clip.mp3", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert stale.status_code == 200 and stale.content == DATA
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from benchmark_common import StubImageAPI, noise_png
+
+pytestmark = pytest.mark.anyio
+
+PROMPTS = [f"A harbour at dawn, picture {n}" for n in range(12)]
+RETRY_AFTER = 0.3
+
+
+@pytest.fixture
+async def generator(tmp_path, monkeypatch):
+    """generate_db_from_json pointed at a stub API that rate-limits, fails and cuts off downloads"""
+    # The module reads its key and creates img/ in the working directory on import
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.chdir(tmp_path)
+    import generate_db_from_json
+
+    api = await StubImageAPI(
+        noise_png(64, 64), latency=0.05, rate_limited=0.25, server_errors=0.1, truncated=0.15,
+        retry_after=RETRY_AFTER, piece_size=1024
+    ).start()
+    monkeypatch.setattr(generate_db_from_json, "OPENAI_API_ENDPOINT", f"{api.url}/v1/images/generations")
+    yield generate_db_from_json, api
+    await api.stop()
+
+
+async def test_every_image_arrives_complete_despite_failures(generator, tmp_path):
+    module, api = generator
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+
+    paths = await module.generate_images(PROMPTS, str(output_dir), concurrency=4, rate_per_minute=6000)
+
+    # The stub really exercised every failure mode
+    kinds = {(kind, status) for _, kind, status, _, _ in api.log}
+    assert {("generate", 429), ("generate", 503), ("truncated", 200)} <= kinds
+
+    assert None not in paths and len(set(paths)) == len(PROMPTS)
+    for path in paths:
+        assert (output_dir / os.path.basename(path)).read_bytes() == api.image
+    assert not [name for name in os.listdir(output_dir) if name.endswith(".part")]
+
+
+async def test_rate_limited_requests_wait_for_retry_after(generator, tmp_path):
+    module, api = generator
+
+    await module.generate_images(PROMPTS, str(tmp_path), concurrency=4, rate_per_minute=6000)
+
+    waits = []
+    for prompt in PROMPTS:
+        requests = sorted((entry for entry in api.log if entry[0] == prompt and entry[1] == "generate"), key=lambda e: e[3])
+        waits += [
+            retry[3] - sent_at
+            for (_, _, status, _, sent_at), retry in zip(requests, requests[1:])
+            if status == 429
+        ]
+    assert waits
+    # Measured at the server, so only the client's own latency is added
+    assert min(waits) >= RETRY_AFTER
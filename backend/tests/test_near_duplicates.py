@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import select
+
+from benchmark_near_duplicates import Corpus, evaluate
+
+# Minimums for the default threshold on the synthetic corpus; it measures
+# ~1.0 precision and ~0.95 recall
+MIN_PRECISION = 0.98
+MIN_RECALL = 0.9
+
+
+def test_precision_and_recall_on_synthetic_corpus():
+    from app.config import NEAR_DUPLICATE_THRESHOLD
+
+    # Wire stories with up to 4 edited and truncated copies each, related
+    # follow-ups, summary-only stories and entries filled into one template
+    items = Corpus().generate(stories=200, max_copies=4, follow_up_rate=0.3, short_rate=0.2, templated=200)
+    result = evaluate(items, NEAR_DUPLICATE_THRESHOLD)
+
+    assert result["precision"] >= MIN_PRECISION, result
+    assert result["recall"] >= MIN_RECALL, result
+
+
+def entry(guid: str, article: dict) -> dict:
+    return {"id": guid, "link": f"https://example.com/{guid}", "title": article["title"],
+            "description": f"<p>{article['content']}</p>"}
+
+
+@pytest.mark.anyio
+async def test_persist_feed_records_copies_instead_of_inserting_them(database, monkeypatch):
+    from app import feed_fetcher
+    from app.database import get_read_db
+    from app.feed_fetcher import FeedFetcher
+    from app.models import ArticleDuplicate, NewsArticle
+    from app.near_duplicates import NearDuplicateIndex
+
+    # A fresh index, so articles other tests left in the shared one cannot match
+    monkeypatch.setattr(feed_fetcher, "near_duplicates", NearDuplicateIndex())
+    corpus = Corpus(seed=5)
+    first, second, third = (corpus.story() for _ in range(3))
+    as_text = lambda a: {"title": " ".join(a["title"]).capitalize(), "content": " ".join(a["content"])}
+
+    fetcher = FeedFetcher()
+    feeds = [
+        [entry("a-1", as_text(first)), entry("a-2", as_text(second))],
+        # A copy of an earlier feed's story, a new story, and a copy of that one in the same feed
+        [entry("b-1", as_text(corpus.copy(first))), entry("b-2", as_text(third)), entry("b-3", as_text(corpus.copy(third)))],
+    ]
+    results = []
+    for n, entries in enumerate(feeds):
+        rows = [FeedFetcher.entry_to_row(e, "Technology") for e in entries]
+        results.append(await fetcher.persist_feed({"url": f"https://example.com/feed/{n}"}, None, None, rows, len(rows)))
+    await fetcher.client.aclose()
+
+    assert results == [(2, 0, 0), (1, 2, 0)]
+    async with get_read_db() as db:
+        ids = dict((await db.execute(select(NewsArticle.guid, NewsArticle.id))).all())
+        copies = dict((await db.execute(select(ArticleDuplicate.guid, ArticleDuplicate.article_id))).all())
+    assert set(ids) == {"a-1", "a-2", "b-2"}
+    assert copies == {"b-1": ids["a-1"], "b-3": ids["b-2"]}
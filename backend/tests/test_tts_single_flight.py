@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from conftest import LoopLag, add_articles
+
+pytestmark = pytest.mark.anyio
+
+DELAY = 0.3
+
+
+async def test_concurrent_plays_share_one_synthesis(client, tts):
+    service = tts(delay=DELAY)
+    article_id, = await add_articles(1)
+
+    async with LoopLag() as lag:
+        responses = await asyncio.gather(*(client.get(f"/api/news/{article_id}/audio") for _ in range(50)))
+
+    assert [response.status_code for response in responses] == [200] * 50
+    assert len({response.json()["filename"] for response in responses}) == 1
+    assert service.engine.calls == 1
+    # Synthesis blocks for DELAY in its thread; on the loop it would stall it that long
+    assert lag.max < DELAY / 3, f"event loop stalled for {lag.max * 1000:.0f} ms"
+
+
+async def test_concurrent_generate_requests_store_one_row(client, tts):
+    from sqlalchemy import func, select
+    from app.database import get_read_db
+    from app.models import AudioFile
+
+    service = tts(delay=DELAY)
+    article_id, = await add_articles(1)
+
+    responses = await asyncio.gather(*(client.post(f"/api/news/{article_id}/audio") for _ in range(20)))
+
+    assert [response.status_code for response in responses] == [200] * 20
+    assert service.engine.calls == 1
+    async with get_read_db() as db:
+        assert (await db.execute(select(func.count(AudioFile.id)))).scalar() == 1
+
+
+async def test_same_text_for_different_articles_is_synthesized_once(tts):
+    service = tts(delay=DELAY)
+    article_ids = await add_articles(3)
+    text = "Shared wire story. The same text in every feed."
+
+    audio_files = await asyncio.gather(*(service.generate(article_id, "content", text) for article_id in article_ids))
+
+    assert service.engine.calls == 1
+    assert {audio_file.article_id for audio_file in audio_files} == set(article_ids)
+    assert len({audio_file.filename for audio_file in audio_files}) == 1
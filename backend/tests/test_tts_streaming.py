@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+import pytest
+
+from conftest import add_articles
+
+pytestmark = pytest.mark.anyio
+
+DELAY = 0.1
+CONTENT = " ".join(f"Sentence number {i} of a long article keeps going for a while." for i in range(60))
+
+
+async def test_first_audio_arrives_before_the_rest_is_synthesized(tts):
+    service = tts(delay=DELAY)
+    article_id, = await add_articles(1, content=CONTENT)
+    text = f"Test article 0. {CONTENT}"
+    chunks = service.split_text(text)
+
+    started = time.perf_counter()
+    received = []
+    async for data in service.stream_audio(article_id, "content", text):
+        received.append((time.perf_counter() - started, data))
+    total = time.perf_counter() - started
+
+    assert len(chunks) > 10
+    assert len(received) == len(chunks) == service.engine.calls
+    first_audio = received[0][0]
+    assert first_audio < 3 * DELAY
+    assert total > len(chunks) * DELAY / 3  # later chunks really were synthesized meanwhile
+    with open(service.store.path_for(service.get_audio_filename(text)), "rb") as f:
+        assert f.read() == b"".join(data for _, data in received)
+
+
+async def test_streamed_audio_is_stored_and_served_from_disk_afterwards(client, tts):
+    from app.database import get_read_db
+
+    service = tts(delay=DELAY)
+    article_id, = await add_articles(1, content=CONTENT)
+
+    streamed = await client.get(f"/api/news/{article_id}/audio", params={"stream": "true"})
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"] == "audio/mpeg"
+    assert streamed.headers["cache-control"] == "no-store"
+
+    async with get_read_db() as db:
+        audio_file = await service.find_audio_for_article(db, article_id, "content")
+    assert audio_file is not None
+    assert audio_file.duration_ms > 0
+
+    calls = service.engine.calls
+    stored = await client.get(f"/api/news/{article_id}/audio", params={"stream": "true"}, headers={"Range": "bytes=0-99"})
+    assert stored.status_code == 206
+    assert stored.content == streamed.content[:100]
+    assert service.engine.calls == calls
+
+
+async def test_concurrent_streams_share_one_synthesis(client, tts):
+    service = tts(delay=DELAY)
+    article_id, = await add_articles(1, content=CONTENT)
+    chunks = service.split_text(f"Test article 0. {CONTENT}")
+
+    async def late_listener():
+        await asyncio.sleep(2 * DELAY)
+        return await client.get(f"/api/news/{article_id}/audio", params={"stream": "true"})
+
+    responses = await asyncio.gather(
+        *(client.get(f"/api/news/{article_id}/audio", params={"stream": "true"}) for _ in range(4)),
+        late_listener()
+    )
+
+    assert [response.status_code for response in responses] == [200] * 5
+    assert len({response.content for response in responses}) == 1
+    assert service.engine.calls == len(chunks)
+
+
+async def test_synthesis_completes_when_the_listener_leaves(tts):
+    service = tts(delay=DELAY)
+    article_id, = await add_articles(1, content=CONTENT)
+    text = f"Test article 0. {CONTENT}"
+    filename = service.get_audio_filename(text)
+
+    stream = service.stream_audio(article_id, "content", text)
+    await stream.__anext__()
+    await stream.aclose()
+    synthesis = service._inflight.get(filename)
+    if synthesis is not None:
+        await asyncio.wait_for(asyncio.shield(synthesis), timeout=60)
+
+    assert service.store.exists(filename)
+    assert service.engine.calls == len(service.split_text(text))
@@ -21,7 +21,7 @@ const NewsCard: React.FC<NewsCardProps> = ({ news, onPlayClick }) => {
         {news.image_url && (
           <div className="relative h-48">
             <img
-              src={`${API_BASE_URL}${news.image_url}`}
+              src={`${API_BASE_URL}${news.image_url}?w=640`}
               alt={news.title}
               className="w-full h-full object-cover"
             />
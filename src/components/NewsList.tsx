@@ -31,7 +31,7 @@ export default function NewsList({ articles, onArticleClick }: NewsListProps) {
             <div className="flex gap-6">
               <div className="h-32 w-48 flex-shrink-0 overflow-hidden rounded-lg relative">
                 <img
-                  src={`${API_BASE_URL}${article.image_url}`}
+                  src={`${API_BASE_URL}${article.image_url}?w=320`}
                   // src={article.image_url}
                   alt={article.title}
                   className="h-full w-full object-cover transition-transform duration-300 group-hover:scale-110"